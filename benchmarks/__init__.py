@@ -0,0 +1,13 @@
+"""
+Benchmarks for Korone's hot paths.
+
+Run every suite and store the results as JSON, which can be compared
+across releases:
+
+.. code-block:: sh
+
+    python -m benchmarks --output results.json
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
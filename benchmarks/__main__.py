@@ -0,0 +1,64 @@
+"""
+Runs the benchmark suites.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import argparse
+import json
+import platform
+import sys
+from importlib import import_module
+
+import korone
+
+SUITES: tuple[str, ...] = ("query", "table", "locale", "commands")
+
+parser = argparse.ArgumentParser(prog="benchmarks")
+parser.add_argument(
+    "suites",
+    nargs="*",
+    default=SUITES,
+    help=f"suites to run, out of {', '.join(SUITES)}",
+)
+parser.add_argument(
+    "--rows",
+    nargs="+",
+    type=int,
+    default=[1_000, 100_000],
+    help="table sizes used by the table suite",
+)
+parser.add_argument("--output", help="file the JSON results are written to")
+
+args = parser.parse_args()
+
+results: list[dict] = []
+
+for suite in args.suites:
+    module = import_module(f"benchmarks.bench_{suite}")
+
+    for result in module.run(args):
+        print(
+            f"{result.name:<20} {str(result.params):<36}"
+            f" {result.ns_per_op:>14,.0f} ns/op"
+            f" {result.ops_per_sec:>14,.0f} ops/s",
+            file=sys.stderr,
+        )
+        results.append(result.asdict())
+
+report: str = json.dumps(
+    {
+        "korone": korone.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    },
+    indent=2,
+)
+
+if args.output:
+    with open(args.output, "w", encoding="utf-8") as output:
+        output.write(report)
+else:
+    print(report)
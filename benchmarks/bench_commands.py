@@ -0,0 +1,71 @@
+"""
+Benchmarks command parsing and the togglable filter.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from typing import Any, Coroutine
+
+from pyrogram.enums import ChatType
+from pyrogram.types import Chat, Message
+
+from benchmarks.common import Result, measure
+from korone.utils.misc import get_command_name
+
+TEXTS: dict[str, str] = {
+    "command": "/disable greet",
+    "bare": "/ping",
+    "mention": "/ping@KoroneBot now",
+    "text": "just chatting in a busy group " * 4,
+}
+
+
+def message(text: str, chat_id: int = -1001) -> Message:
+    """Creates a synthetic message."""
+    return Message(id=0, text=text, chat=Chat(id=chat_id, type=ChatType.GROUP))
+
+
+def complete(coro: Coroutine) -> Any:
+    """Runs a coroutine which never suspends, without an event loop, so
+    only the coroutine itself is measured."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+    raise RuntimeError("Coroutine suspended.")
+
+
+def run(_) -> list[Result]:
+    """Runs the suite."""
+    results: list[Result] = []
+
+    for case, text in TEXTS.items():
+        msg: Message = message(text)
+        results.append(
+            measure(
+                "get_command_name",
+                lambda msg=msg: get_command_name(msg),
+                100_000,
+                case=case,
+            )
+        )
+
+    # pylint: disable=import-outside-toplevel
+    from korone.modules.core import COMMANDS, togglable
+
+    COMMANDS["greet"] = {"chat": {-1001: False}, "children": []}
+
+    for case, text in TEXTS.items():
+        msg = message(text.replace("disable ", ""))
+        results.append(
+            measure(
+                "togglable",
+                lambda msg=msg: complete(togglable(None, None, msg)),
+                100_000,
+                case=case,
+            )
+        )
+
+    return results
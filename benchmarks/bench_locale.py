@@ -0,0 +1,31 @@
+"""
+Benchmarks :meth:`korone.locale.StringResource.get`.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from benchmarks.common import Result, measure
+from korone.locale import StringResource
+
+
+def run(_) -> list[Result]:
+    """Runs the suite."""
+    # the first lookup loads the language pack
+    StringResource.get("en", "strings/greet/message")
+    StringResource.get("pt", "strings/greet/message")
+
+    return [
+        measure(
+            "locale.get",
+            lambda: StringResource.get("en", "strings/greet/message"),
+            100_000,
+            case="hit",
+        ),
+        measure(
+            "locale.get",
+            lambda: StringResource.get("pt", "strings/nonexistent", "x"),
+            100_000,
+            case="fallback",
+        ),
+    ]
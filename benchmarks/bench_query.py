@@ -0,0 +1,40 @@
+"""
+Benchmarks :meth:`korone.database.query.Query.compile`.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from benchmarks.common import Result, measure
+from korone.database.query import Query
+
+DEPTHS: tuple[int, ...] = (1, 8, 64, 256)
+
+
+def build(depth: int) -> Query:
+    """Builds a query tree with the given amount of comparisons."""
+    user = Query()
+    query: Query = user.c0 == 0
+
+    for i in range(1, depth):
+        query = query & (user[f"c{i}"] == i)
+
+    return query
+
+
+def run(_) -> list[Result]:
+    """Runs the suite."""
+    results: list[Result] = []
+
+    for depth in DEPTHS:
+        query: Query = build(depth)
+        results.append(
+            measure(
+                "query.compile",
+                query.compile,
+                number=max(10_000 // depth, 10),
+                depth=depth,
+            )
+        )
+
+    return results
@@ -0,0 +1,76 @@
+"""
+Benchmarks :class:`korone.database.impl.sqlite3_impl.SQLite3Table`.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import os
+import tempfile
+
+from benchmarks.common import Result, measure, measure_once
+from korone.database.impl.sqlite3_impl import SQLite3Connection
+from korone.database.query import Query
+from korone.database.table import Document
+
+SCHEMA: str = """\
+CREATE TABLE Commands (
+    chat_uuid INTEGER,
+    command TEXT,
+    state BIT
+);
+"""
+
+
+def run(args) -> list[Result]:
+    """Runs the suite once for each amount of rows."""
+    results: list[Result] = []
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            conn = SQLite3Connection(path=os.path.join(tmpdir, "bench.db"))
+
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL;")
+                conn.execute(SCHEMA)
+                results.extend(run_table(conn, rows))
+
+    return results
+
+
+def run_table(conn: SQLite3Connection, rows: int) -> list[Result]:
+    """Runs the suite on an empty table."""
+    table = conn.table("Commands")
+    command = Query()
+
+    # a commit per row would measure the disk rather than the table
+    def insert():
+        with conn.transaction():
+            for i in range(rows):
+                table.insert(
+                    Document(
+                        chat_uuid=i % 1000, command=f"cmd{i % 50}", state=1
+                    )
+                )
+
+    results: list[Result] = [
+        measure_once("table.insert", insert, rows, rows=rows),
+    ]
+
+    query = (command.chat_uuid == 7) & (command.command == "cmd7")
+    results.append(
+        measure("table.query", lambda: table.query(query), 10, rows=rows)
+    )
+
+    conn.execute("CREATE INDEX CommandsIndex ON Commands (chat_uuid);")
+    results.append(
+        measure(
+            "table.query",
+            lambda: table.query(query),
+            100,
+            rows=rows,
+            index=True,
+        )
+    )
+
+    return results
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the benchmark suites.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import time
+import timeit
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class Result:
+    """Result of a single benchmark."""
+
+    name: str
+    """Benchmark name."""
+
+    operations: int
+    """Amount of operations measured."""
+
+    seconds: float
+    """Best time, in seconds, taken by all operations."""
+
+    params: dict[str, Any] = field(default_factory=dict)
+    """Parameters the benchmark ran with."""
+
+    @property
+    def ns_per_op(self) -> float:
+        """Nanoseconds per operation."""
+        return self.seconds / self.operations * 1e9
+
+    @property
+    def ops_per_sec(self) -> float:
+        """Operations per second."""
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    def asdict(self) -> dict[str, Any]:
+        """Returns the result as a JSON serializable dictionary."""
+        result: dict[str, Any] = asdict(self)
+        result["ns_per_op"] = self.ns_per_op
+        result["ops_per_sec"] = self.ops_per_sec
+        return result
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    number: int,
+    repeat: int = 5,
+    **params: Any,
+) -> Result:
+    """Measures a function called many times, keeping the best run.
+
+    Args:
+        name (:obj:`str`): Benchmark name.
+        func (:obj:`~typing.Callable`): Function to be measured.
+        number (:obj:`int`): Calls per run.
+        repeat (:obj:`int`, *optional*): Amount of runs. Defaults to 5.
+
+    Returns:
+        :obj:`Result`: The best run.
+    """
+    best: float = min(timeit.repeat(func, number=number, repeat=repeat))
+    return Result(name, number, best, params)
+
+
+def measure_once(
+    name: str, func: Callable[[], Any], operations: int, **params: Any
+) -> Result:
+    """Measures a single call which performs many operations, such as a
+    bulk insertion.
+
+    Args:
+        name (:obj:`str`): Benchmark name.
+        func (:obj:`~typing.Callable`): Function to be measured.
+        operations (:obj:`int`): Operations performed by the call.
+
+    Returns:
+        :obj:`Result`: The measured call.
+    """
+    start: float = time.perf_counter()
+    func()
+    return Result(name, operations, time.perf_counter() - start, params)
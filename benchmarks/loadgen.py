@@ -0,0 +1,369 @@
+"""
+Synthetic load generator.
+
+Replays fake updates through Pyrogram's dispatcher and every module
+loaded by :func:`korone.modules.core.load_all`, without connecting to
+Telegram. Replies and edits are stubbed out, optionally with a fake
+round trip time, and the time each update takes from being queued to
+being fully handled is reported as percentiles.
+
+Replies go through a send scheduler without rate limits unless
+``--send-rate`` or ``--chat-send-rate`` are given, so the dispatch and
+handlers are measured rather than Telegram's limits.
+
+.. code-block:: sh
+
+    python -m benchmarks.loadgen --updates 50000 --chats 500 --rtt 50
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from faker import Faker
+from pyrogram import Client, raw, types
+from pyrogram.enums import ChatType
+
+from korone.database import Database
+from korone.metrics import Window
+from korone import constants
+from korone.modules import core
+from korone.modules.gate import Gate
+from korone.utils.scheduler import SendScheduler
+
+UNLIMITED: float = 1e9
+"""Send rate high enough to never be reached."""
+
+COMMANDS: dict[str, float] = {
+    "/ping": 1.0,
+    "/greet": 4.0,
+    "/farewell": 2.0,
+    "/disable farewell": 0.5,
+    "/enable farewell": 0.5,
+}
+"""Default commands sent, along with their relative weights."""
+
+
+class TimedQueue(asyncio.Queue):
+    """Dispatcher queue which measures how long each update takes.
+
+    Pyrogram's handler workers fetch the next update only once they are
+    done with the current one, so fetching marks the end of the previous
+    update handled by the same worker.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.queued: dict[int, int] = {}
+        self.current: dict[Any, int] = {}
+        self.latencies: list[int] = []
+        self.finished: asyncio.Event = asyncio.Event()
+        self.expected: int = 0
+
+    def put_nowait(self, item):
+        if item is not None:
+            self.queued[id(item[0])] = time.perf_counter_ns()
+        super().put_nowait(item)
+
+    async def get(self):
+        worker = asyncio.current_task()
+        queued: int | None = self.current.pop(worker, None)
+
+        if queued is not None:
+            self.latencies.append(time.perf_counter_ns() - queued)
+            if len(self.latencies) >= self.expected:
+                self.finished.set()
+
+        item = await super().get()
+
+        if item is not None:
+            self.current[worker] = self.queued.pop(id(item[0]))
+
+        return item
+
+
+def weighted(count: int, skew: float) -> list[float]:
+    """Zipf-like weights, so a few chats and users are much busier."""
+    return [1 / (rank**skew) for rank in range(1, count + 1)]
+
+
+def generate(args: argparse.Namespace) -> list[tuple[Any, dict, dict]]:
+    """Generates the raw updates, along with their users and chats."""
+    Faker.seed(args.seed)
+    fake = Faker()
+    rand = random.Random(args.seed)
+
+    chats: list[Any] = [
+        raw.types.Chat(
+            id=1000 + i,
+            title=fake.company(),
+            photo=raw.types.ChatPhotoEmpty(),
+            participants_count=rand.randint(2, 200),
+            date=0,
+            version=0,
+        )
+        for i in range(args.chats)
+    ]
+    users: list[Any] = [
+        raw.types.User(
+            id=10_000 + i,
+            first_name=fake.first_name(),
+            username=fake.user_name(),
+            lang_code=rand.choice(("en", "pt")),
+            restriction_reason=[],
+            usernames=[],
+        )
+        for i in range(args.users)
+    ]
+
+    chat_weights: list[float] = weighted(args.chats, args.skew)
+    user_weights: list[float] = weighted(args.users, args.skew)
+    commands: list[str] = list(COMMANDS)
+    command_weights: list[float] = list(COMMANDS.values())
+    sentences: list[str] = [fake.sentence() for _ in range(1000)]
+
+    updates: list[tuple[Any, dict, dict]] = []
+
+    for i in range(1, args.updates + 1):
+        chat = rand.choices(chats, chat_weights)[0]
+        user = rand.choices(users, user_weights)[0]
+
+        entities: list[Any] = []
+
+        if rand.random() < args.command_ratio:
+            text = rand.choices(commands, command_weights)[0]
+            entities.append(
+                raw.types.MessageEntityBotCommand(
+                    offset=0, length=len(text.split(" ", 1)[0])
+                )
+            )
+        else:
+            text = rand.choice(sentences)
+
+        message = raw.types.Message(
+            id=i,
+            peer_id=raw.types.PeerChat(chat_id=chat.id),
+            from_id=raw.types.PeerUser(user_id=user.id),
+            date=int(time.time()),
+            message=text,
+            entities=entities,
+        )
+        update = raw.types.UpdateNewMessage(message=message, pts=i, pts_count=1)
+        updates.append((update, {user.id: user}, {chat.id: chat}))
+
+    return updates
+
+
+def stub(client: Client, rtt: float) -> itertools.count:
+    """Replaces the requests used by the modules with local stubs.
+
+    Returns:
+        :obj:`itertools.count`: Counter whose next value is the amount of
+        requests made plus one.
+    """
+    ids = itertools.count(1)
+
+    async def respond(chat_id: int, text: str, **_) -> types.Message:
+        if rtt > 0:
+            await asyncio.sleep(rtt)
+
+        return types.Message(
+            id=next(ids),
+            chat=types.Chat(id=chat_id, type=ChatType.GROUP, client=client),
+            text=text,
+            client=client,
+        )
+
+    async def send_message(chat_id: int, text: str, **kwargs):
+        return await respond(chat_id, text, **kwargs)
+
+    async def edit_message_text(chat_id: int, message_id: int, text: str, **_):
+        return await respond(chat_id, text)
+
+    client.send_message = send_message  # type: ignore
+    client.edit_message_text = edit_message_text  # type: ignore
+    client.me = types.User(id=1, is_bot=True, username="KoroneBot")
+
+    return ids
+
+
+@contextmanager
+def scheduler(rate: float, chat_rate: float) -> Iterator[SendScheduler]:
+    """Replaces the shared send scheduler, including the references the
+    modules imported, restoring it afterwards."""
+    import korone.utils.scheduler  # pylint: disable=import-outside-toplevel
+
+    old: SendScheduler = korone.utils.scheduler.SCHEDULER
+    new: SendScheduler = SendScheduler(
+        rate or UNLIMITED, chat_rate or UNLIMITED
+    )
+
+    holders: list = [
+        module
+        for name, module in list(sys.modules.items())
+        if name.startswith("korone.")
+        and getattr(module, "SCHEDULER", None) is old
+    ]
+
+    for module in holders:
+        module.SCHEDULER = new
+
+    try:
+        yield new
+    finally:
+        for module in holders:
+            module.SCHEDULER = old
+
+
+async def replay(args: argparse.Namespace) -> dict[str, Any]:
+    """Replays the updates and reports the results."""
+    with scheduler(args.send_rate, args.chat_send_rate):
+        return await _replay(args)
+
+
+async def _replay(args: argparse.Namespace) -> dict[str, Any]:
+    client: Client = Client(
+        "loadgen",
+        api_id=0,
+        api_hash="",
+        in_memory=True,
+        workers=args.workers,
+    )
+    requests: itertools.count = stub(client, args.rtt / 1e3)
+
+    core.load_all(client)
+    Gate(client, constants.GATE_GROUP).install()
+
+    # add_handler schedules the registration on the loop
+    await asyncio.sleep(0)
+
+    updates: list[tuple[Any, dict, dict]] = generate(args)
+
+    dispatcher = client.dispatcher
+    queue: TimedQueue = TimedQueue()
+    queue.expected = len(updates)
+    dispatcher.updates_queue = queue
+
+    for _ in range(args.workers):
+        dispatcher.locks_list.append(asyncio.Lock())
+        dispatcher.handler_worker_tasks.append(
+            asyncio.create_task(
+                dispatcher.handler_worker(dispatcher.locks_list[-1])
+            )
+        )
+
+    start: int = time.perf_counter_ns()
+
+    # paces the updates when a rate is given, otherwise sends a burst
+    for i, update in enumerate(updates):
+        if args.rate > 0:
+            delay: float = start / 1e9 + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        queue.put_nowait(update)
+
+    # workers only report an update once they fetch the next one
+    for _ in range(args.workers):
+        queue.put_nowait(None)
+
+    await asyncio.gather(*dispatcher.handler_worker_tasks)
+    elapsed: float = (time.perf_counter_ns() - start) / 1e9
+
+    window: Window = Window(len(queue.latencies))
+    for latency in queue.latencies:
+        window.add(latency / 1e6)
+
+    return {
+        "updates": len(updates),
+        "requests": next(requests) - 1,
+        "workers": args.workers,
+        "seconds": elapsed,
+        "updates_per_sec": len(updates) / elapsed,
+        "latency_ms": {
+            f"p{q}": window.percentile(q) for q in (50, 90, 99, 99.9, 100)
+        },
+    }
+
+
+def main() -> None:
+    """Parses the arguments and runs the load generator."""
+    parser = argparse.ArgumentParser(prog="benchmarks.loadgen")
+    parser.add_argument("--updates", type=int, default=10_000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.0,
+        help="Zipf exponent of the chat and user activity, 0 is uniform",
+    )
+    parser.add_argument(
+        "--command-ratio",
+        type=float,
+        default=0.2,
+        help="fraction of updates which are commands",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="updates per second, 0 sends every update at once",
+    )
+    parser.add_argument(
+        "--send-rate",
+        type=float,
+        default=0.0,
+        help="replies per second overall, 0 does not limit them",
+    )
+    parser.add_argument(
+        "--chat-send-rate",
+        type=float,
+        default=0.0,
+        help="replies per second per chat, 0 does not limit them",
+    )
+    parser.add_argument("--workers", type=int, default=24)
+    parser.add_argument(
+        "--rtt", type=float, default=0.0, help="fake request time, in ms"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file the JSON results are written to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        Database.connect(os.path.join(tmpdir, "loadgen.db"))
+        Database.setup()
+
+        try:
+            report: dict[str, Any] = asyncio.run(replay(args))
+        finally:
+            Database.close()
+
+    print(
+        f"{report['updates']} updates in {report['seconds']:.2f}s"
+        f" ({report['updates_per_sec']:,.0f} updates/s)",
+        file=sys.stderr,
+    )
+
+    result: str = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(result)
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,25 @@ Starts logging system.
 import logging
 import sys
 
-from korone import constants
-from korone.main import main
+from korone import logger
+from korone.utils.profiling import PROFILER
+
+PROFILER.enabled = "--profile-startup" in sys.argv
+
+with PROFILER.phase("imports"):
+    from korone.main import main
 
 LEVEL = logging.DEBUG if "--debug" in sys.argv else logging.INFO
-logging.basicConfig(
-    format=constants.LOGGER_FORMAT_OUTPUT,
+LISTENER = logger.setup(
     level=LEVEL,
+    queued="--log-queue" in sys.argv,
+    structured="--log-json" in sys.argv,
 )
 
-sys.exit(main(sys.argv))
+try:
+    STATUS = main(sys.argv)
+finally:
+    if LISTENER is not None:
+        LISTENER.stop()
+
+sys.exit(STATUS)
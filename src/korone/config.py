@@ -18,12 +18,50 @@ log = logging.getLogger(__name__)
 
 config: ConfigParser = ConfigParser()
 
+filepath: str = ""
+"""Path to the configuration file in use."""
+
 config["pyrogram"] = {
     "API_ID": "",
     "API_HASH": "",
     "BOT_TOKEN": "",
     "USE_IPV6": "no",
     "WORKERS": "24",
+    "IN_MEMORY": "yes",
+    "SESSION_DIR": constants.DEFAULT_SESSION_DIR,
+}
+
+config["concurrency"] = {
+    "MAX_WORKERS": str(constants.DEFAULT_MAX_WORKERS),
+    "BLOCKING_WORKERS": str(constants.DEFAULT_BLOCKING_WORKERS),
+}
+
+config["sharding"] = {
+    "SHARDS": "0",
+}
+
+config["shutdown"] = {
+    "TIMEOUT": str(constants.DEFAULT_SHUTDOWN_TIMEOUT),
+}
+
+config["database"] = {
+    "QUERY_CACHE_SIZE": "0",
+    "MAINTENANCE": "no",
+}
+
+config["backup"] = {
+    "DIRECTORY": constants.DEFAULT_BACKUP_DIR,
+    "KEEP": str(constants.DEFAULT_BACKUP_KEEP),
+    "INTERVAL": "0",
+}
+
+config["metrics"] = {
+    "ENABLED": "no",
+    "ADMINS": "",
+}
+
+config["watchdog"] = {
+    "THRESHOLD": str(constants.DEFAULT_WATCHDOG_THRESHOLD),
 }
 
 
@@ -38,9 +76,13 @@ def init(cfgpath: str = "") -> None:
         cfgpath (:obj:`str`, *optional*): Specify a custom path to the config
             file. Defaults to "".
     """
+    global filepath  # pylint: disable=global-statement
+
     if not cfgpath:
         cfgpath = constants.DEFAULT_CONFIG_PATH
 
+    filepath = cfgpath
+
     dirname: str = path.dirname(cfgpath)
 
     log.info("Initializing configuration module")
@@ -84,3 +126,71 @@ def get(section: str, option: str, fallback: str = "") -> str:
         :obj:`str`: The value of the option in the given section.
     """
     return config.get(section, option, fallback=fallback)
+
+
+def getbool(section: str, option: str, fallback: bool = False) -> bool:
+    """The getbool function is a helper function that retrieves the value of
+    an option in a given section as a boolean. Values such as "yes", "true",
+    "on" and "1" are considered :obj:`True`. If no such option exists, or if
+    its value is not a boolean, it returns the fallback instead.
+
+    Args:
+        section (:obj:`str`): Specify the section of the config file to read
+            from.
+        option (:obj:`str`): Specify which option in the section you want to
+            get.
+        fallback (:obj:`bool`, *optional*): Set a default value if the option
+            is not found in the config file. Defaults to :obj:`False`.
+
+    Returns:
+        :obj:`bool`: The value of the option in the given section.
+    """
+    try:
+        return config.getboolean(section, option, fallback=fallback)
+    except ValueError:
+        return fallback
+
+
+def getfloat(section: str, option: str, fallback: float = 0.0) -> float:
+    """The getfloat function is a helper function that retrieves the value of
+    an option in a given section as a floating point number. If no such
+    option exists, or if its value is not a number, it returns the fallback
+    instead.
+
+    Args:
+        section (:obj:`str`): Specify the section of the config file to read
+            from.
+        option (:obj:`str`): Specify which option in the section you want to
+            get.
+        fallback (:obj:`float`, *optional*): Set a default value if the option
+            is not found in the config file. Defaults to 0.0.
+
+    Returns:
+        :obj:`float`: The value of the option in the given section.
+    """
+    try:
+        return config.getfloat(section, option, fallback=fallback)
+    except ValueError:
+        return fallback
+
+
+def getint(section: str, option: str, fallback: int = 0) -> int:
+    """The getint function is a helper function that retrieves the value of
+    an option in a given section as an integer. If no such option exists, or
+    if its value is not an integer, it returns the fallback instead.
+
+    Args:
+        section (:obj:`str`): Specify the section of the config file to read
+            from.
+        option (:obj:`str`): Specify which option in the section you want to
+            get.
+        fallback (:obj:`int`, *optional*): Set a default value if the option
+            is not found in the config file. Defaults to 0.
+
+    Returns:
+        :obj:`int`: The value of the option in the given section.
+    """
+    try:
+        return config.getint(section, option, fallback=fallback)
+    except ValueError:
+        return fallback
@@ -23,6 +23,15 @@ LOGGER_FORMAT_OUTPUT: str = (
 )
 """The format to be used in the logger."""
 
+LOGGER_FAST_FORMAT_OUTPUT: str = (
+    "%(name)s"
+    "|%(levelname)s"
+    "|%(message)s"
+    "|%(created)i"
+)
+"""The format to be used in the logger when caller information is not
+collected."""
+
 XDG_CONFIG_HOME: str = os.environ.get("XDG_CONFIG_HOME", "~/.config")
 """
 The XDG_CONFIG_HOME environment variable.
@@ -41,12 +50,80 @@ DEFAULT_CONFIG_PATH: str = f"{XDG_CONFIG_HOME}/korone/korone.conf"
 DEFAULT_DBFILE_PATH: str = f"{XDG_DATA_HOME}/korone/korone.db"
 """The default path to the database file."""
 
+DEFAULT_SESSION_DIR: str = f"{XDG_DATA_HOME}/korone/sessions"
+"""The default directory where persistent Pyrogram sessions are stored."""
+
 DEFAULT_WORKERS: int = 24
 """The default number of workers to be used when no number is provided."""
 
+DEFAULT_WORKERS_PER_CPU: int = 4
+"""The default number of workers per CPU when workers are set to auto."""
+
+DEFAULT_MAX_WORKERS: int = 256
+"""The default upper bound on workers when workers are set to auto."""
+
+DEFAULT_TUNER_INTERVAL: float = 30.0
+"""The default amount of seconds between adjustments of the workers."""
+
+DEFAULT_BLOCKING_WORKERS: int = 4
+"""The default number of threads available to blocking work."""
+
 DEFAULT_NAME: str = "korone"
 """The default Pyrogram client name to be used when no name is provided."""
 
+DEFAULT_SEND_RATE: float = 30.0
+"""The default amount of messages per second the bot sends in total."""
+
+DEFAULT_CHAT_SEND_RATE: float = 1.0
+"""The default amount of messages per second the bot sends to a single chat."""
+
+DEFAULT_CHAT_SEND_BURST: int = 3
+"""The default amount of messages which can be sent at once to a single chat."""
+
+DEFAULT_SEND_RETRIES: int = 3
+"""The default amount of times a message is resent after a FloodWait."""
+
+DEFAULT_PING_WINDOW: int = 100
+"""The default amount of latency samples kept by the ping command."""
+
+DEFAULT_WATCHDOG_THRESHOLD: float = 0.5
+"""The default amount of seconds the event loop may be blocked before the
+watchdog reports it."""
+
+DEFAULT_WATCHDOG_INTERVAL: float = 0.1
+"""The default amount of seconds between event loop lag measurements."""
+
+DEFAULT_BACKUP_DIR: str = f"{XDG_DATA_HOME}/korone/backups"
+"""The default directory database snapshots are stored in."""
+
+DEFAULT_BACKUP_KEEP: int = 7
+"""The default amount of database snapshots kept."""
+
+DEFAULT_BACKUP_PAGES: int = 256
+"""The default amount of database pages copied per backup step."""
+
+DEFAULT_BACKUP_PAUSE: float = 0.01
+"""The default amount of seconds to wait between backup steps."""
+
+DEFAULT_MEDIA_CACHE_SIZE: int = 1024
+"""The default amount of media file IDs kept in memory."""
+
+DEFAULT_QUERY_CACHE_SIZE: int = 4096
+"""The default amount of query results kept in memory, when enabled."""
+
+DEFAULT_SHUTDOWN_TIMEOUT: float = 30.0
+"""The default amount of seconds to wait for running handlers and queued
+messages on shutdown."""
+
+MESSAGE_LIMIT: int = 4096
+"""The maximum amount of characters of a message."""
+
+COMMAND_PREFIXES: list[str] = ["/", "!"]
+"""The prefixes which start a command."""
+
+GATE_GROUP: int = -10
+"""The handler group of the message gate, which runs before any other."""
+
 DATABASE_SETUP: str = """\
 CREATE TABLE IF NOT EXISTS Users (
     uuid INTEGER PRIMARY KEY,
@@ -68,6 +145,7 @@ CREATE TABLE IF NOT EXISTS DisabledCommands (
 );
 
 CREATE TABLE IF NOT EXISTS Filters (
+    id INTEGER PRIMARY KEY,
     chat_uuid INTEGER,
     handler TEXT,
     data TEXT,
@@ -75,11 +153,93 @@ CREATE TABLE IF NOT EXISTS Filters (
     filter_type TEXT
 );
 
-VACUUM;
+CREATE INDEX IF NOT EXISTS FiltersChat ON Filters (chat_uuid);
+
+CREATE TABLE IF NOT EXISTS Media (
+    file_unique_id TEXT NOT NULL,
+    bot_id INTEGER NOT NULL,
+    file_id TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    PRIMARY KEY (file_unique_id, bot_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS FiltersSearch USING fts5 (
+    handler,
+    data,
+    content = 'Filters',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS FiltersSearchInsert AFTER INSERT ON Filters
+BEGIN
+    INSERT INTO FiltersSearch (rowid, handler, data)
+    VALUES (new.id, new.handler, new.data);
+END;
+
+CREATE TRIGGER IF NOT EXISTS FiltersSearchDelete AFTER DELETE ON Filters
+BEGIN
+    INSERT INTO FiltersSearch (FiltersSearch, rowid, handler, data)
+    VALUES ('delete', old.id, old.handler, old.data);
+END;
+
+CREATE TRIGGER IF NOT EXISTS FiltersSearchUpdate AFTER UPDATE ON Filters
+BEGIN
+    INSERT INTO FiltersSearch (FiltersSearch, rowid, handler, data)
+    VALUES ('delete', old.id, old.handler, old.data);
+    INSERT INTO FiltersSearch (rowid, handler, data)
+    VALUES (new.id, new.handler, new.data);
+END;
+
+-- keywords weigh more than the replies
+INSERT INTO FiltersSearch (FiltersSearch, rank)
+VALUES ('rank', 'bm25(10.0, 1.0)');
 
 PRAGMA journal_mode="WAL";
 """
-"""The database setup to be used."""
+"""The database setup to be used. Full-text indexes created by it are
+filled from their tables right after."""
+
+DATABASE_MIGRATION: str = """\
+BEGIN;
+
+-- the full-text index referred to implicit rowids, which VACUUM renumbers
+DROP TRIGGER IF EXISTS FiltersSearchInsert;
+DROP TRIGGER IF EXISTS FiltersSearchDelete;
+DROP TRIGGER IF EXISTS FiltersSearchUpdate;
+DROP TABLE IF EXISTS FiltersSearch;
+DROP INDEX IF EXISTS FiltersChat;
+
+ALTER TABLE Filters RENAME TO FiltersWithoutId;
+
+CREATE TABLE Filters (
+    id INTEGER PRIMARY KEY,
+    chat_uuid INTEGER,
+    handler TEXT,
+    data TEXT,
+    file_id TEXT,
+    filter_type TEXT
+);
+
+INSERT INTO Filters (chat_uuid, handler, data, file_id, filter_type)
+SELECT chat_uuid, handler, data, file_id, filter_type FROM FiltersWithoutId;
+
+DROP TABLE FiltersWithoutId;
+
+COMMIT;
+"""
+"""The migration of databases whose ``Filters`` table has no ``id``
+column, run before the setup."""
+
+DATABASE_MAINTENANCE: str = """\
+VACUUM;
+"""
+"""The database maintenance to be run once Korone is online, if enabled
+and enough of the database is free pages."""
+
+DATABASE_VACUUM_RATIO: float = 0.25
+"""The least fraction of free pages worth rewriting the database for,
+since VACUUM holds the write lock for as long as it runs."""
 
 MODULES_PACKAGE_NAME: str = "korone.modules"
 """The package that contains all the commands modules."""
@@ -7,9 +7,19 @@ The ``korone.database`` package is responsible for all database operations.
 
 import logging
 import sqlite3
+import threading
+import time
 from sqlite3 import Connection, Cursor
+from typing import AsyncContextManager, ContextManager
 
 from korone import constants
+from korone.database.cache import QueryCache
+from korone.database.impl.sqlite3_impl import (
+    SQLite3Table,
+    SQLite3Transactions,
+)
+from korone.database.table import Table
+from korone.metrics import Metrics
 
 log = logging.getLogger(__name__)
 
@@ -27,6 +37,14 @@ class Database:
     conn: Connection
     """Database connection."""
 
+    cache: QueryCache | None = None
+    """Cache of the results of table queries, disabled by default."""
+
+    _transactions: SQLite3Transactions
+    _maintenance: Connection | None = None
+    _maintenance_lock: threading.Lock = threading.Lock()
+    _json_columns: dict[str, frozenset[str]] = {}
+
     @classmethod
     def isopen(cls) -> bool:
         """
@@ -64,6 +82,15 @@ class Database:
         cls.conn = sqlite3.connect(cls.path)
         log.info("Successfully connected to database")
 
+        # Creates a "Dictionary Cursor"
+        # Refer to https://stackoverflow.com/questions/44009452
+        # /what-is-the-purpose-of-the-row-factory-method-of-an
+        # -sqlite3-connection-object
+        cls.conn.row_factory = sqlite3.Row
+
+        cls._transactions = SQLite3Transactions(cls.conn)
+        cls._json_columns = {}
+
     @classmethod
     def setup(cls) -> None:
         """
@@ -78,16 +105,94 @@ class Database:
 
         log.info("Setting up database")
 
+        columns: set[str] = {
+            row["name"]
+            for row in cls.conn.execute("PRAGMA table_info(Filters)")
+        }
+
+        if columns and "id" not in columns:
+            log.info("Migrating filters to stable IDs")
+            cls.conn.executescript(constants.DATABASE_MIGRATION)
+
+        indexes: set[str] = cls._search_indexes()
+
         with cls.conn:
             cls.conn.executescript(constants.DATABASE_SETUP)
 
+            # only new indexes are filled, as triggers keep them up to date
+            for index in cls._search_indexes() - indexes:
+                log.info("Building full-text index %s", index)
+                cls.conn.execute(
+                    f"INSERT INTO {index} ({index}) VALUES ('rebuild')"
+                )
+
         log.info("Committing initial setup changes to database")
 
-        # Creates a "Dictionary Cursor"
-        # Refer to https://stackoverflow.com/questions/44009452
-        # /what-is-the-purpose-of-the-row-factory-method-of-an
-        # -sqlite3-connection-object
-        cls.conn.row_factory = sqlite3.Row
+    @classmethod
+    def _search_indexes(cls) -> set[str]:
+        """Returns the names of the full-text indexes in the database."""
+        return {
+            row["name"]
+            for row in cls.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND sql LIKE 'CREATE VIRTUAL TABLE % USING fts5%'"
+            )
+        }
+
+    @classmethod
+    def maintain(cls) -> None:
+        """
+        Runs the database maintenance, such as VACUUM, which is not needed
+        to start up. It uses a connection of its own, thus it may be called
+        from another thread.
+
+        VACUUM blocks every write for as long as it runs, so it only runs
+        once at least :obj:`korone.constants.DATABASE_VACUUM_RATIO` of the
+        pages are free, and it may be cut short by :meth:`interrupt`.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        log.info("Running database maintenance")
+
+        conn: Connection = sqlite3.connect(cls.path, timeout=30.0)
+        cls._maintenance = conn
+
+        try:
+            free: int = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            pages: int = conn.execute("PRAGMA page_count").fetchone()[0]
+
+            if pages and free / pages >= constants.DATABASE_VACUUM_RATIO:
+                conn.executescript(constants.DATABASE_MAINTENANCE)
+            else:
+                log.info(
+                    "Skipping VACUUM, %d of %d pages are free", free, pages
+                )
+
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error as err:
+            log.error("Could not run database maintenance: %s", err)
+            return
+        finally:
+            with cls._maintenance_lock:
+                cls._maintenance = None
+                conn.close()
+
+        log.info("Database maintenance finished")
+
+    @classmethod
+    def interrupt(cls) -> None:
+        """
+        Interrupts the running maintenance, if any, which then rolls back
+        whatever it did not finish. It may be called from any thread.
+        """
+        with cls._maintenance_lock:
+            if cls._maintenance is not None:
+                log.warning("Interrupting database maintenance")
+                cls._maintenance.interrupt()
 
     @classmethod
     def execute(cls, sql: str, parameters: tuple = (), /) -> Cursor:
@@ -104,6 +209,7 @@ class Database:
 
         Raises:
             DatabaseError: If the database is not connected.
+            RuntimeError: If another task has an async transaction open.
 
         Returns:
             :class:`~sqlite3.Cursor`: The cursor object.
@@ -112,9 +218,147 @@ class Database:
         if not cls.isopen():
             raise DatabaseError("Database is not yet connected!")
 
-        log.debug("Executing '%s' with '%s' arguments", sql, parameters)
-        with cls.conn:
-            return cls.conn.execute(sql, parameters)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Executing '%s' with '%s' arguments", sql, parameters)
+
+        if not Metrics.enabled:
+            return cls._transactions.execute(sql, parameters)
+
+        start: float = time.perf_counter()
+        error: bool = True
+
+        try:
+            cursor: Cursor = cls._transactions.execute(sql, parameters)
+            error = False
+            return cursor
+        finally:
+            Metrics.observe_query(sql, time.perf_counter() - start, error)
+
+    @classmethod
+    def transaction(cls) -> ContextManager[None]:
+        """
+        Runs the statements of the block in a single transaction, which
+        is committed once the block ends, or rolled back if it raises.
+        Nested transactions become savepoints of the outermost one.
+
+        Example:
+            .. code-block:: python
+
+                >>> with Database.transaction():
+                ...     Database.execute("DELETE FROM Filters WHERE ...")
+                ...     Database.execute("INSERT INTO Filters ...")
+
+        Raises:
+            DatabaseError: If the database is not connected.
+
+        Returns:
+            :obj:`~typing.ContextManager`: The transaction.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        return cls._transactions.transaction()
+
+    @classmethod
+    def savepoint(cls) -> ContextManager[None]:
+        """
+        Runs the statements of the block in a savepoint, which is rolled
+        back on its own if the block raises.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+            RuntimeError: If no transaction is open.
+
+        Returns:
+            :obj:`~typing.ContextManager`: The savepoint.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        return cls._transactions.savepoint()
+
+    @classmethod
+    def atransaction(cls) -> AsyncContextManager[None]:
+        """
+        Async version of :meth:`transaction`, which waits for the
+        transactions of other tasks to end before starting.
+
+        Until it ends, only its task, and the tasks started within it,
+        may use the database, so statements from other tasks never
+        become part of it.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+            RuntimeError: If it is nested in a task started within the
+                transaction of another task.
+
+        Returns:
+            :obj:`~typing.AsyncContextManager`: The transaction.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        return cls._transactions.atransaction()
+
+    @classmethod
+    def asavepoint(cls) -> AsyncContextManager[None]:
+        """
+        Async version of :meth:`savepoint`.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+            RuntimeError: If the task has no transaction open.
+
+        Returns:
+            :obj:`~typing.AsyncContextManager`: The savepoint.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        return cls._transactions.asavepoint()
+
+    @classmethod
+    def _execute(cls, sql: str, parameters: tuple = (), /) -> Cursor:
+        # lets the tables of the SQLite3 implementation use this
+        # connection, as they do with SQLite3Connection
+        return cls.execute(sql, parameters)
+
+    @classmethod
+    def table(cls, name: str) -> Table:
+        """
+        Returns a Table of the open database, which can be used for
+        database related operations without writing SQL.
+
+        Args:
+            name (:obj:`str`): SQL Table name to operate on.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+
+        Returns:
+            :class:`~korone.database.table.Table`: Table object.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        return SQLite3Table(conn=cls, table=name)  # type: ignore
+
+    @classmethod
+    def checkpoint(cls) -> None:
+        """
+        Moves every change in the write-ahead log into the database file
+        and truncates the log, so nothing is left to recover on the next
+        start.
+
+        Raises:
+            DatabaseError: If the database is not connected.
+        """
+        if not cls.isopen():
+            raise DatabaseError("Database is not yet connected!")
+
+        log.info("Checkpointing database")
+        cls.conn.commit()
+        cls.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
 
     @classmethod
     def close(cls) -> None:
@@ -129,3 +373,6 @@ class Database:
 
         log.info("Closing database")
         cls.conn.close()
+
+        if cls.cache is not None:
+            cls.cache.clear()
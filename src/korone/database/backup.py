@@ -0,0 +1,185 @@
+"""
+Online backups of the database.
+
+Snapshots are taken with SQLite's backup API a few pages at a time,
+from a connection of their own running on a separate thread, so the bot
+keeps handling updates while a backup runs. The source connection holds
+a read transaction for the whole backup: in WAL mode, this pins the
+snapshot being copied, whereas otherwise every write made meanwhile
+would restart the backup from scratch.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import glob
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from korone import constants
+
+log = logging.getLogger(__name__)
+
+
+class BackupAborted(Exception):
+    """The backup was stopped before it finished."""
+
+
+class Backup:
+    """Takes and rotates database snapshots.
+
+    Example:
+        .. code-block:: python
+
+            >>> backup = Backup("/srv/backups", keep=3)
+            >>> backup.run("korone.db")
+            '/srv/backups/korone-20221001-120000.db'
+
+    Args:
+        directory (:obj:`str`, *optional*): Directory the snapshots are
+            stored in. Defaults to
+            :obj:`korone.constants.DEFAULT_BACKUP_DIR`.
+        keep (:obj:`int`, *optional*): Amount of snapshots kept. Defaults
+            to :obj:`korone.constants.DEFAULT_BACKUP_KEEP`.
+        pages (:obj:`int`, *optional*): Pages copied per step. Defaults
+            to :obj:`korone.constants.DEFAULT_BACKUP_PAGES`.
+        pause (:obj:`float`, *optional*): Seconds to wait between steps.
+            Defaults to :obj:`korone.constants.DEFAULT_BACKUP_PAUSE`.
+    """
+
+    prefix: str = "korone-"
+    """Prefix of the snapshot file names."""
+
+    def __init__(
+        self,
+        directory: str = constants.DEFAULT_BACKUP_DIR,
+        keep: int = constants.DEFAULT_BACKUP_KEEP,
+        pages: int = constants.DEFAULT_BACKUP_PAGES,
+        pause: float = constants.DEFAULT_BACKUP_PAUSE,
+    ):
+        self.directory: str = directory
+        self.keep: int = keep
+        self.pages: int = pages
+        self.pause: float = pause
+
+        self.interval: float = 0.0
+        """Seconds between scheduled backups, 0 disables them."""
+
+        self._aborted: threading.Event = threading.Event()
+        self._task: asyncio.Task | None = None
+
+    def snapshots(self) -> list[str]:
+        """Returns the stored snapshots.
+
+        Returns:
+            :obj:`list`\\[:obj:`str`]: Snapshot paths, oldest first.
+        """
+        pattern: str = os.path.join(
+            os.path.expanduser(self.directory), f"{self.prefix}*.db"
+        )
+
+        # the timestamp in the names sorts them chronologically
+        return sorted(glob.glob(pattern))
+
+    def rotate(self) -> None:
+        """Deletes the oldest snapshots, keeping only ``keep`` of them."""
+        for path in self.snapshots()[:-max(self.keep, 1)]:
+            log.info("Removing old backup %s", path)
+            os.remove(path)
+
+    def run(self, path: str) -> str:
+        """Backs the database up, blocking until it is done.
+
+        Args:
+            path (:obj:`str`): Path to the database file.
+
+        Raises:
+            BackupAborted: If :meth:`stop` was called meanwhile.
+
+        Returns:
+            :obj:`str`: Path to the new snapshot.
+        """
+        directory: str = os.path.expanduser(self.directory)
+        os.makedirs(directory, exist_ok=True)
+
+        name: str = time.strftime(f"{self.prefix}%Y%m%d-%H%M%S.db")
+        snapshot: str = os.path.join(directory, name)
+
+        # an interrupted backup must never look like a snapshot
+        partial: str = f"{snapshot}.part"
+
+        log.info("Backing up %s to %s", path, snapshot)
+        start: float = time.perf_counter()
+
+        def progress(_, remaining: int, total: int) -> None:
+            if self._aborted.is_set():
+                raise BackupAborted(f"Stopped with {remaining} pages left")
+
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Backed up %d of %d pages", total - remaining, total)
+
+        source = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        target = sqlite3.connect(partial)
+
+        try:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            source.backup(
+                target, pages=self.pages, progress=progress, sleep=self.pause
+            )
+
+            source.execute("COMMIT")
+        except BaseException:
+            target.close()
+            os.remove(partial)
+            raise
+        finally:
+            source.close()
+            target.close()
+
+        os.replace(partial, snapshot)
+
+        log.info("Backup finished in %.2fs", time.perf_counter() - start)
+
+        self.rotate()
+        return snapshot
+
+    async def _schedule(self, path: str) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await asyncio.to_thread(self.run, path)
+            except (sqlite3.Error, OSError) as err:
+                log.error("Could not back up the database: %s", err)
+
+    def start(self, path: str) -> None:
+        """Starts backing the database up every ``interval`` seconds.
+
+        Args:
+            path (:obj:`str`): Path to the database file.
+        """
+        if self.interval <= 0 or self._task is not None:
+            return
+
+        self._aborted.clear()
+        self._task = asyncio.get_running_loop().create_task(
+            self._schedule(path)
+        )
+
+    def stop(self) -> None:
+        """Stops the scheduled backups, aborting the one running."""
+        self._aborted.set()
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+BACKUP: Backup = Backup()
+"""Backup shared by the whole application."""
@@ -0,0 +1,147 @@
+"""
+Caches the results of table queries.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import copy
+from collections import OrderedDict
+
+from korone import constants
+from korone.database.query import CompiledQuery
+from korone.database.table import Document, Documents, Record
+
+
+class QueryCache:
+    """Least recently used cache of query results.
+
+    Results are indexed by their table and compiled query, and every
+    result of a table is dropped at once whenever the table is written
+    to, so a cached result is never stale as long as all writes go
+    through the :class:`~korone.database.table.Table` interface.
+
+    Example:
+        .. code-block:: python
+
+            >>> conn = SQLite3Connection(path="korone.db", cache=QueryCache())
+            >>> table = conn.table("Chats")
+            >>> table.query(chat.uuid == 1)  # reads the database
+            >>> table.query(chat.uuid == 1)  # reads the cache
+            >>> table.update(Document(language="pt"), chat.uuid == 1)
+            >>> table.query(chat.uuid == 1)  # reads the database again
+
+    Args:
+        size (:obj:`int`, *optional*): Amount of results kept. Defaults
+            to :obj:`korone.constants.DEFAULT_QUERY_CACHE_SIZE`.
+    """
+
+    def __init__(self, size: int = constants.DEFAULT_QUERY_CACHE_SIZE):
+        self.size: int = size
+
+        self._results: OrderedDict[
+            tuple[str, CompiledQuery], list[Document]
+        ] = OrderedDict()
+        self._tables: dict[str, set[CompiledQuery]] = {}
+
+        self.hits: int = 0
+        """Number of queries answered from the cache."""
+
+        self.misses: int = 0
+        """Number of queries which reached the database."""
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, table: str, query: CompiledQuery) -> Documents | None:
+        """Returns the cached result of a query.
+
+        Args:
+            table (:obj:`str`): Table name.
+            query (:obj:`~korone.database.query.CompiledQuery`): Compiled
+                query.
+
+        Returns:
+            :obj:`~korone.database.table.Documents`, *optional*: A deep copy
+            of the result, made of :class:`~korone.database.table.Record`
+            objects the caller may change freely, or :obj:`None` if it is
+            not cached.
+        """
+        key: tuple[str, CompiledQuery] = (table, query)
+
+        try:
+            documents: list[Document] | None = self._results.get(key)
+        except TypeError:
+            # bound data which cannot be hashed is never cached
+            documents = None
+
+        if documents is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._results.move_to_end(key)
+
+        # nested values are copied too, as callers may change them in place
+        return Documents(
+            [Record(copy.deepcopy(document)) for document in documents]
+        )
+
+    def put(
+        self, table: str, query: CompiledQuery, documents: Documents
+    ) -> None:
+        """Caches the result of a query.
+
+        Args:
+            table (:obj:`str`): Table name.
+            query (:obj:`~korone.database.query.CompiledQuery`): Compiled
+                query.
+            documents (:obj:`~korone.database.table.Documents`): Result,
+                which is copied, nested values included, so the caller
+                may change it freely.
+        """
+        key: tuple[str, CompiledQuery] = (table, query)
+
+        try:
+            hash(key)
+        except TypeError:
+            return
+
+        self._results[key] = [
+            Document(copy.deepcopy(dict(document))) for document in documents
+        ]
+        self._results.move_to_end(key)
+        self._tables.setdefault(table, set()).add(query)
+
+        while len(self._results) > self.size:
+            (evicted, old), _ = self._results.popitem(last=False)
+            self._tables[evicted].discard(old)
+
+    def invalidate(self, table: str) -> None:
+        """Drops every cached result of a table.
+
+        Args:
+            table (:obj:`str`): Table name.
+        """
+        for query in self._tables.pop(table, ()):
+            del self._results[(table, query)]
+
+    def clear(self) -> None:
+        """Drops every cached result."""
+        self._results.clear()
+        self._tables.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Returns the cache metrics.
+
+        Returns:
+            :obj:`dict`\\[:obj:`str`, :obj:`float`]: Cache metrics.
+        """
+        lookups: int = self.hits + self.misses
+
+        return {
+            "cached": len(self._results),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
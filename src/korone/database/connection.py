@@ -2,7 +2,7 @@
 Represents connections to databases.
 """
 
-from typing import Protocol
+from typing import AsyncContextManager, ContextManager, Protocol
 
 from korone.database.table import Table
 
@@ -47,6 +47,51 @@ class Connection(Protocol):
     def execute(self, sql: str, parameters: tuple = (), /):
         """Execute SQL operations."""
 
+    def transaction(self) -> ContextManager[None]:
+        """Runs the statements of the block in a single transaction.
+
+        Statements are committed together once the block ends, or rolled
+        back if it raises. Nested transactions become savepoints of the
+        outermost one.
+
+        For example:
+
+            .. code-block:: python
+
+                >>> with conn.transaction():
+                ...     conn.table("Users").insert(user)
+                ...     conn.table("Chats").insert(chat)
+        """
+
+    def savepoint(self) -> ContextManager[None]:
+        """Runs the statements of the block in a savepoint, which is
+        rolled back on its own if the block raises, leaving the rest of
+        the transaction intact.
+
+        Raises:
+            RuntimeError: If no transaction is open.
+        """
+
+    def atransaction(self) -> AsyncContextManager[None]:
+        """Async version of :meth:`transaction`, which waits for the
+        transactions of other tasks to end before starting. Until it
+        ends, statements from other tasks raise :exc:`RuntimeError`.
+
+        For example:
+
+            .. code-block:: python
+
+                >>> async with conn.atransaction():
+                ...     conn.table("Users").insert(user)
+        """
+
+    def asavepoint(self) -> AsyncContextManager[None]:
+        """Async version of :meth:`savepoint`.
+
+        Raises:
+            RuntimeError: If the task has no transaction open.
+        """
+
     def table(self, name: str) -> Table:
         """Returns a Table, which can be used for
         database related operations.
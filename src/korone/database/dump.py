@@ -0,0 +1,256 @@
+"""
+Exports and imports the whole database as JSON lines.
+
+A dump holds every table of :obj:`korone.constants.DATABASE_SETUP`, one
+after the other, as lines of up to :obj:`BATCH_SIZE` rows each. Every
+line names its table and columns, so it stands on its own:
+
+.. code-block:: json
+
+    {"table": "Users", "columns": ["uuid", "language", "registrydate"],
+     "rows": [[1000, "en", 1664625600], [1001, "pt", 1664625601]]}
+
+Rows are streamed through cursors and written, or inserted, a line at a
+time, so memory use does not grow with the size of the database, while
+encoding and decoding whole lines keeps the per row overhead of the
+:mod:`json` module low. Dumps ending
+in ``.gz`` are compressed with gzip, and those ending in ``.zst`` with
+zstd, which needs the ``zstandard`` package.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import gzip
+import json
+import logging
+import re
+import sqlite3
+import time
+from typing import IO, Any
+
+from korone import constants
+from korone.database import DatabaseError
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE: int = 1000
+"""Rows per line of a dump."""
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def tables(script: str = constants.DATABASE_SETUP) -> list[str]:
+    """Returns the tables a setup script creates.
+
+    Virtual tables, such as full-text indexes, are left out, since the
+    triggers of the tables they index fill them on import.
+
+    Args:
+        script (:obj:`str`, *optional*): Setup script. Defaults to
+            :obj:`korone.constants.DATABASE_SETUP`.
+
+    Returns:
+        :obj:`list`\\[:obj:`str`]: Table names, in creation order.
+    """
+    return re.findall(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)", script)
+
+
+def open_dump(path: str, mode: str) -> IO[str]:
+    """Opens a dump for reading or writing, compressed according to its
+    extension.
+
+    Args:
+        path (:obj:`str`): Path to the dump.
+        mode (:obj:`str`): Either ``r`` or ``w``.
+
+    Raises:
+        DatabaseError: If zstd is needed but not installed.
+
+    Returns:
+        :obj:`~typing.IO`\\[:obj:`str`]: Text stream.
+    """
+    if path.endswith(".gz"):
+        # beyond this level, gzip gets much slower for little gain
+        return gzip.open(path, f"{mode}t", compresslevel=6, encoding="utf-8")
+
+    if path.endswith((".zst", ".zstd")):
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise DatabaseError(
+                "zstd dumps need the zstandard package"
+            ) from err
+
+        return zstandard.open(path, f"{mode}t", encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
+
+
+def dump(database: str, path: str) -> dict[str, int]:
+    """Exports every table of the database.
+
+    The database is read within a single transaction, so the dump is
+    consistent even if the bot writes to it meanwhile.
+
+    Args:
+        database (:obj:`str`): Path to the database file.
+        path (:obj:`str`): Path to the dump.
+
+    Returns:
+        :obj:`dict`\\[:obj:`str`, :obj:`int`]: Rows exported per table.
+    """
+    counts: dict[str, int] = {}
+    start: float = time.perf_counter()
+
+    conn = sqlite3.connect(database, timeout=30.0, isolation_level=None)
+
+    try:
+        conn.execute("BEGIN")
+
+        with open_dump(path, "w") as stream:
+            for table in tables():
+                cursor = conn.execute(f"SELECT * FROM {table}")
+                columns: list[str] = [
+                    column[0] for column in cursor.description
+                ]
+
+                counts[table] = 0
+                rows: list[tuple] = cursor.fetchmany(BATCH_SIZE)
+
+                # empty tables are written too, so importing empties them
+                while True:
+                    chunk: dict[str, Any] = {
+                        "table": table,
+                        "columns": columns,
+                        "rows": rows,
+                    }
+                    stream.write(_encode(chunk) + "\n")
+                    counts[table] += len(rows)
+
+                    rows = cursor.fetchmany(BATCH_SIZE)
+                    if not rows:
+                        break
+
+                log.info("Exported %d rows from %s", counts[table], table)
+
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    log.info(
+        "Exported %d rows in %.2fs",
+        sum(counts.values()),
+        time.perf_counter() - start,
+    )
+
+    return counts
+
+
+def _prepare(conn: sqlite3.Connection, table: Any, columns: Any) -> str:
+    """Empties a table, and returns the statement inserting its rows."""
+    # names are spliced into SQL, so only those of the schema are trusted
+    if table not in tables():
+        raise DatabaseError(f"Unknown table {table!r}")
+
+    existing: set[str] = {
+        row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+    }
+    if not set(columns) <= existing:
+        raise DatabaseError(
+            f"Unknown columns in {table}: "
+            f"{', '.join(sorted(set(columns) - existing))}"
+        )
+
+    conn.execute(f"DELETE FROM {table}")
+
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+
+
+def load(database: str, path: str) -> dict[str, int]:
+    """Imports a dump, replacing the contents of the tables it holds.
+
+    The database is set up first if needed, and the whole import runs in
+    a single transaction, so it either fully succeeds or changes nothing.
+
+    Args:
+        database (:obj:`str`): Path to the database file.
+        path (:obj:`str`): Path to the dump.
+
+    Raises:
+        DatabaseError: If the dump is malformed or names an unknown table
+            or column.
+
+    Returns:
+        :obj:`dict`\\[:obj:`str`, :obj:`int`]: Rows imported per table.
+    """
+    counts: dict[str, int] = {}
+    statements: dict[tuple, str] = {}
+    start: float = time.perf_counter()
+
+    conn = sqlite3.connect(database, timeout=30.0, isolation_level=None)
+
+    try:
+        conn.executescript(constants.DATABASE_SETUP)
+        conn.execute("BEGIN IMMEDIATE")
+
+        # rows are inserted much faster without the triggers keeping the
+        # full-text indexes up to date, which are instead rebuilt at once
+        triggers: list[tuple[str, str]] = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"
+        ).fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+
+        with open_dump(path, "r") as stream:
+            for number, line in enumerate(stream, start=1):
+                try:
+                    chunk: dict[str, Any] = json.loads(line)
+                    table: str = chunk["table"]
+                    columns: tuple[str, ...] = tuple(chunk["columns"])
+                    rows: list[list] = chunk["rows"]
+                except (ValueError, TypeError, KeyError) as err:
+                    raise DatabaseError(
+                        f"Malformed line {number}: {err}"
+                    ) from err
+
+                key: tuple = (table, columns)
+                if key not in statements:
+                    if table in counts:
+                        raise DatabaseError(
+                            f"Columns of {table} change on line {number}"
+                        )
+
+                    statements[key] = _prepare(conn, table, columns)
+                    counts[table] = 0
+
+                conn.executemany(statements[key], rows)
+                counts[table] += len(rows)
+
+        for _, sql in triggers:
+            conn.execute(sql)
+
+        for index in re.findall(
+            r"CREATE VIRTUAL TABLE (?:IF NOT EXISTS )?(\w+) USING fts5",
+            constants.DATABASE_SETUP,
+        ):
+            conn.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    log.info(
+        "Imported %d rows in %.2fs",
+        sum(counts.values()),
+        time.perf_counter() - start,
+    )
+
+    return counts
@@ -5,11 +5,41 @@ SQLite3 implementation of the Connection and Table.
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
+import asyncio
+import json
 import sqlite3
-from typing import Any, Protocol
-
-from korone.database.table import Document, Documents, Table
-from korone.database.query import Query
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, Token
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Protocol,
+)
+
+from korone.database.cache import QueryCache
+from korone.database.table import Document, Documents, Record, Table
+from korone.database.query import Criteria, Field
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _adapt(values: Iterable[Any]) -> tuple:
+    # nested values are stored as JSON, which tables decode when read
+    # from columns declared as JSON, without touching sqlite3's global
+    # adapters and converters, which every other connection shares
+    return tuple(
+        _dumps(value) if isinstance(value, (list, dict)) else value
+        for value in values
+    )
+
+# identifies the async transaction a task runs within, if any
+_TRANSACTION: ContextVar[object | None] = ContextVar(
+    "_TRANSACTION", default=None
+)
 
 
 class _Conn(Protocol):
@@ -18,6 +48,9 @@ class _Conn(Protocol):
     _args: tuple
     _kwargs: dict
     _conn: sqlite3.Connection | None = None
+    _transactions: "SQLite3Transactions"
+    _json_columns: dict[str, frozenset[str]]
+    cache: QueryCache | None
 
     def _is_open(self):
         """Checks whether Database is open."""
@@ -39,49 +72,349 @@ class SQLite3Table:
         self._conn = conn
         self._table = table
 
+    @staticmethod
+    def _document(fields: Any | Document) -> Document:
+        if isinstance(fields, Document):
+            return fields
+
+        # keys starting with _ are ignored, as documented in Table
+        return Document(
+            (key, value)
+            for key, value in vars(fields).items()
+            if not key.startswith("_")
+        )
+
     def insert(self, fields: Any | Document):
         """Insert a row on the table."""
-        msg = "Insertion has not been implemented yet."
-        raise NotImplementedError(msg)
+        document: Document = self._document(fields)
+
+        if not document:
+            return
+
+        keys: str = ", ".join(document.keys())
+        placeholders: str = ", ".join("?" * len(document))
+
+        sql: str = f"INSERT INTO {self._table} ({keys}) VALUES ({placeholders})"
+        self._invalidate()
+        self._conn._execute(sql, _adapt(document.values()))
+
+    def _invalidate(self) -> None:
+        if self._conn.cache is not None:
+            self._conn.cache.invalidate(self._table)
+
+    def _records(self, cursor: sqlite3.Cursor) -> Documents:
+        columns: frozenset[str] | None = self._conn._json_columns.get(
+            self._table
+        )
+
+        if columns is None:
+            info: list = self._conn._execute(
+                f"PRAGMA table_info({self._table})"
+            ).fetchall()
+            columns = frozenset(
+                name for _, name, kind, *_ in info if kind.upper() == "JSON"
+            )
+
+            # tables which do not exist yet are looked up again
+            if info:
+                self._conn._json_columns[self._table] = columns
+
+        records: list[Document] = []
+
+        for row in cursor.fetchall():
+            document: dict[str, Any] = dict(row)
+
+            for key in columns:
+                if isinstance(document.get(key), str):
+                    document[key] = json.loads(document[key])
+
+            records.append(Record(document))
+
+        return Documents(records)
+
+    def query(self, query: Criteria) -> Documents:
+        """Query rows that match the criteria.
+
+        If the connection has a cache, results are read from and stored
+        in it, except that results read within a transaction are not
+        stored, since the transaction may still be rolled back.
+        """
+        clause, data = query.compile()
+        cache: QueryCache | None = self._conn.cache
 
-        if not isinstance(fields, Document):
-            msg = "Types other than Document have not yet been implemented."
-            raise NotImplementedError(msg)
+        if cache is not None:
+            cached: Documents | None = cache.get(self._table, (clause, data))
+            if cached is not None:
+                return cached
+
+        sql: str = f"SELECT * FROM {self._table} WHERE {clause}"
+        cursor: sqlite3.Cursor = self._conn._execute(sql, _adapt(data))
+
+        documents: Documents = self._records(cursor)
+
+        if cache is not None and not self._conn._transactions.depth:
+            cache.put(self._table, (clause, data), documents)
+
+        return documents
+
+    @staticmethod
+    def _match(text: str) -> str:
+        # every word is quoted, so it is never taken as FTS5 syntax
+        words: list[str] = []
+
+        for word in text.split():
+            prefix: bool = word.endswith("*")
+            word = word.rstrip("*").replace('"', '""')
+
+            if word:
+                words.append(f'"{word}"*' if prefix else f'"{word}"')
+
+        return " ".join(words)
+
+    def search(
+        self, text: str, query: Criteria | None = None, limit: int = 10
+    ) -> Documents:
+        """Full-text search rows, best matches first.
+
+        The full-text index must be an FTS5 table named after this one
+        with a ``Search`` suffix, such as ``FiltersSearch`` for
+        ``Filters``, whose rowids are the rowids of this table.
+        """
+        match: str = self._match(text)
+
+        if not match:
+            return Documents([])
+
+        clause, data = ("1", ()) if query is None else query.compile()
+        index: str = f"{self._table}Search"
+
+        # the index is only reached through a subquery, so the columns
+        # it shares with the table do not make the clause ambiguous
+        sql: str = (
+            f"SELECT {self._table}.* FROM {self._table} "
+            f"JOIN (SELECT rowid AS _rowid, rank AS _rank FROM {index} "
+            f"WHERE {index} MATCH ?) ON {self._table}.rowid = _rowid "
+            f"WHERE {clause} ORDER BY _rank LIMIT ?"
+        )
+        cursor: sqlite3.Cursor = self._conn._execute(
+            sql, (match, *_adapt(data), limit)
+        )
+
+        return self._records(cursor)
+
+    def update(self, fields: Any | Document, query: Criteria):
+        """Update fields on rows that match the criteria.
+
+        Records only have their changed fields written.
+        """
+        document: Document = (
+            fields.changes()
+            if isinstance(fields, Record)
+            else self._document(fields)
+        )
 
-    def query(self, query: Query) -> Documents:
-        """Query rows that match the criteria."""
+        if not document:
+            return
 
-        msg = "Querying has not been implemented yet."
-        raise NotImplementedError(msg)
+        clause, data = query.compile()
+        assignments: str = ", ".join(f"{key} = ?" for key in document.keys())
 
-    def update(self, fields: Any | Document, query: Query):
-        """Update fields on rows that match the criteria."""
+        sql: str = f"UPDATE {self._table} SET {assignments} WHERE {clause}"
+        self._invalidate()
+        self._conn._execute(sql, _adapt((*document.values(), *data)))
 
-        msg = "Updating has not been implemented yet."
-        raise NotImplementedError(msg)
+        if isinstance(fields, Record):
+            fields.clean()
 
-    def delete(self, query: Query):
+    def delete(self, query: Criteria):
         """Delete rows that match the criteria."""
+        clause, data = query.compile()
 
-        msg = "Deleting has not been implemented yet."
-        raise NotImplementedError(msg)
+        sql: str = f"DELETE FROM {self._table} WHERE {clause}"
+        self._invalidate()
+        self._conn._execute(sql, _adapt(data))
+
+    def index(self, name: str, *keys: str | Field):
+        """Create an index on keys or JSON paths, unless it exists."""
+        expressions: str = ", ".join(
+            key.name if isinstance(key, Field) else key for key in keys
+        )
+
+        sql: str = (
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON {self._table} ({expressions})"
+        )
+        self._conn._execute(sql)
+
+
+class SQLite3Transactions:
+    """Transactions and savepoints of a SQLite3 connection.
+
+    Outside of a transaction, every statement is committed on its own.
+    Within one, statements are only committed, all at once, when the
+    outermost transaction ends, or rolled back if it raises.
+
+    Async transactions are serialized, so the transactions of two tasks
+    sharing the connection never interleave. While a task has an async
+    transaction open, only that task, and the tasks it starts within the
+    transaction, may use the connection: the async transactions of other
+    tasks wait for it to end, and their statements raise
+    :exc:`RuntimeError`, since they would otherwise become part of it.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn: sqlite3.Connection = conn
+
+        self.depth: int = 0
+        """Number of open transactions and savepoints."""
+
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._owner: asyncio.Task | None = None
+        self._token: object | None = None
+
+    def _within(self) -> bool:
+        # tasks started within the transaction inherit its token
+        return self._token is None or _TRANSACTION.get() is self._token
+
+    def _check(self) -> None:
+        if not self._within():
+            raise RuntimeError(
+                "The connection is within the transaction of another task."
+            )
+
+    def execute(self, sql: str, parameters: tuple = (), /):
+        """Executes a statement, committing it unless a transaction is
+        open."""
+        self._check()
+
+        if self.depth:
+            return self._conn.execute(sql, parameters)
+
+        with self._conn:
+            return self._conn.execute(sql, parameters)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Runs the statements of the block in a transaction, which
+        becomes a savepoint if another transaction is already open."""
+        self._check()
+
+        if self.depth:
+            with self.savepoint():
+                yield
+            return
+
+        self._conn.execute("BEGIN")
+        self.depth += 1
+
+        try:
+            yield
+        except BaseException:
+            self._conn.rollback()
+            raise
+        else:
+            self._conn.commit()
+        finally:
+            self.depth -= 1
+
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        """Runs the statements of the block in a savepoint, so they can
+        be rolled back without rolling back the whole transaction."""
+        self._check()
+
+        if not self.depth:
+            raise RuntimeError("Savepoints must be within a transaction.")
+
+        name: str = f"savepoint{self.depth}"
+
+        self._conn.execute(f"SAVEPOINT {name}")
+        self.depth += 1
+
+        try:
+            yield
+        except BaseException:
+            self._conn.execute(f"ROLLBACK TO {name}")
+            self._conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            self._conn.execute(f"RELEASE {name}")
+        finally:
+            self.depth -= 1
+
+    def _nested(self) -> bool:
+        if self._token is None or not self._within():
+            return False
+
+        # savepoints of concurrent tasks could be released out of order
+        if self._owner is not asyncio.current_task():
+            raise RuntimeError(
+                "Async transactions cannot be nested in other tasks."
+            )
+
+        return True
+
+    @asynccontextmanager
+    async def atransaction(self) -> AsyncIterator[None]:
+        """Async version of :meth:`transaction`, which waits for the
+        transactions of other tasks to end."""
+        if self._nested():
+            with self.savepoint():
+                yield
+            return
+
+        async with self._lock:
+            self._owner = asyncio.current_task()
+            self._token = object()
+            reset: Token = _TRANSACTION.set(self._token)
+
+            try:
+                with self.transaction():
+                    yield
+            finally:
+                _TRANSACTION.reset(reset)
+                self._owner = None
+                self._token = None
+
+    @asynccontextmanager
+    async def asavepoint(self) -> AsyncIterator[None]:
+        """Async version of :meth:`savepoint`."""
+        if not self._nested():
+            raise RuntimeError("Savepoints must be within a transaction.")
+
+        with self.savepoint():
+            yield
 
 
 class SQLite3Connection:
-    """SQLite3 Database Connection."""
+    """SQLite3 Database Connection.
+
+    Passing a :class:`~korone.database.cache.QueryCache` as ``cache``
+    caches the results of table queries.
+    """
 
     _path: str
     _args: tuple
     _kwargs: dict
     _conn: sqlite3.Connection | None = None
-
-    def __init__(self, *args, path: str = ":memory", **kwargs):
+    _transactions: SQLite3Transactions
+    _json_columns: dict[str, frozenset[str]]
+
+    def __init__(
+        self,
+        *args,
+        path: str = ":memory",
+        cache: QueryCache | None = None,
+        **kwargs,
+    ):
         self._path: str = path
         self._args = args
         self._kwargs = kwargs
+        self.cache: QueryCache | None = cache
 
     def __enter__(self):
         self.connect()
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
@@ -93,11 +426,7 @@ class SQLite3Connection:
         # this method should only be called
         # internally, thereby we can afford to not check
         # its nullity
-        conn: sqlite3.Connection = self._conn  # type: ignore
-
-        # for readability, we shorten self._conn to conn
-        with conn:
-            return conn.execute(sql, parameters)
+        return self._transactions.execute(sql, parameters)
 
     def connect(self):
         """Connect to the SQLite3 Database."""
@@ -110,6 +439,12 @@ class SQLite3Connection:
             **self._kwargs
         )
 
+        # rows are turned into Documents, which requires their keys
+        self._conn.row_factory = sqlite3.Row
+
+        self._transactions = SQLite3Transactions(self._conn)
+        self._json_columns = {}
+
     def table(self, name: str) -> Table:
         """Return a Table which can be operated upon."""
         return SQLite3Table(conn=self, table=name)
@@ -119,11 +454,43 @@ class SQLite3Connection:
         if not self._is_open():
             raise RuntimeError("Connection is not yet open.")
 
-        self._execute(sql, parameters)
+        return self._execute(sql, parameters)
+
+    def transaction(self) -> ContextManager[None]:
+        """Run the statements of the block in a single transaction."""
+        if not self._is_open():
+            raise RuntimeError("Connection is not yet open.")
+
+        return self._transactions.transaction()
+
+    def savepoint(self) -> ContextManager[None]:
+        """Run the statements of the block in a nested savepoint."""
+        if not self._is_open():
+            raise RuntimeError("Connection is not yet open.")
+
+        return self._transactions.savepoint()
+
+    def atransaction(self) -> AsyncContextManager[None]:
+        """Async version of transaction."""
+        if not self._is_open():
+            raise RuntimeError("Connection is not yet open.")
+
+        return self._transactions.atransaction()
+
+    def asavepoint(self) -> AsyncContextManager[None]:
+        """Async version of savepoint."""
+        if not self._is_open():
+            raise RuntimeError("Connection is not yet open.")
+
+        return self._transactions.asavepoint()
 
     def close(self):
         """Close the SQLite3 Connection."""
         if not self._is_open():
             raise RuntimeError("Connection is not yet open.")
 
-        self._conn.close()
+        self._conn.close()  # type: ignore
+        self._conn = None
+
+        if self.cache is not None:
+            self.cache.clear()
@@ -0,0 +1,186 @@
+"""
+Registry of the media Korone sends.
+
+Telegram identifies a file's content by its ``file_unique_id``, which is
+the same for every bot and every chat, whereas a ``file_id``, needed to
+send the file again without uploading it, is only valid for the bot that
+received it. The registry stores each file's ``file_id`` once per bot,
+in the ``Media`` table, so everything else, such as the filters of every
+chat, refers to the file by its unique ID.
+
+Recently used entries are kept in memory, so most replies do not touch
+the database at all.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from pyrogram.types import Message
+
+from korone import constants
+from korone.database import Database
+
+log = logging.getLogger(__name__)
+
+
+def media_of(message: Message) -> Any | None:
+    """Returns the file of a message, if it has one.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
+
+    Returns:
+        :obj:`~typing.Any`, *optional*: The photo, sticker, document or
+        any other media holding a ``file_id``, or :obj:`None`.
+    """
+    if message.media is None:
+        return None
+
+    media: Any = getattr(message, message.media.value, None)
+
+    if getattr(media, "file_id", None) is None:
+        return None
+
+    return media
+
+
+class MediaRegistry:
+    """Maps the unique IDs of files to the ``file_id`` of each bot.
+
+    Example:
+        .. code-block:: python
+
+            >>> unique_id = MEDIA.register(client.me.id, message)
+            >>> file_id = MEDIA.resolve(client.me.id, unique_id)
+            >>> await message.reply_cached_media(file_id)
+
+    Args:
+        size (:obj:`int`, *optional*): Amount of entries kept in memory.
+            Defaults to :obj:`korone.constants.DEFAULT_MEDIA_CACHE_SIZE`.
+    """
+
+    def __init__(self, size: int = constants.DEFAULT_MEDIA_CACHE_SIZE):
+        self.size: int = size
+        self._hot: OrderedDict[tuple[int, str], str] = OrderedDict()
+
+        self.hits: int = 0
+        """Number of lookups answered from memory."""
+
+        self.misses: int = 0
+        """Number of lookups which reached the database."""
+
+    def _remember(self, key: tuple[int, str], file_id: str) -> None:
+        self._hot[key] = file_id
+        self._hot.move_to_end(key)
+
+        if len(self._hot) > self.size:
+            self._hot.popitem(last=False)
+
+    def register(self, bot_id: int, message: Message) -> str | None:
+        """Registers the file of a message.
+
+        Registering a file already known only refreshes its ``file_id``,
+        which Telegram may change over time.
+
+        Args:
+            bot_id (:obj:`int`): ID of the bot which received the message.
+            message (:obj:`~pyrogram.types.Message`): Message holding the
+                file.
+
+        Returns:
+            :obj:`str`, *optional*: Unique ID of the file, or :obj:`None`
+            if the message has no file.
+        """
+        media: Any | None = media_of(message)
+
+        if media is None:
+            return None
+
+        unique_id: str = media.file_unique_id
+        key: tuple[int, str] = (bot_id, unique_id)
+
+        if self._hot.get(key) == media.file_id:
+            self._hot.move_to_end(key)
+            return unique_id
+
+        Database.execute(
+            "INSERT INTO Media (file_unique_id, bot_id, file_id, media_type) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (file_unique_id, bot_id) "
+            "DO UPDATE SET file_id = excluded.file_id",
+            (unique_id, bot_id, media.file_id, message.media.value),
+        )
+
+        self._remember(key, media.file_id)
+        return unique_id
+
+    def resolve(self, bot_id: int, unique_id: str) -> str | None:
+        """Returns the ``file_id`` a bot can send a file with.
+
+        Args:
+            bot_id (:obj:`int`): ID of the bot sending the file.
+            unique_id (:obj:`str`): Unique ID of the file.
+
+        Returns:
+            :obj:`str`, *optional*: The ``file_id``, or :obj:`None` if the
+            bot has never seen the file.
+        """
+        key: tuple[int, str] = (bot_id, unique_id)
+        file_id: str | None = self._hot.get(key)
+
+        if file_id is not None:
+            self.hits += 1
+            self._hot.move_to_end(key)
+            return file_id
+
+        self.misses += 1
+
+        row = Database.execute(
+            "SELECT file_id FROM Media "
+            "WHERE file_unique_id = ? AND bot_id = ?",
+            (unique_id, bot_id),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self._remember(key, row["file_id"])
+        return row["file_id"]
+
+    def known(self, unique_id: str) -> bool:
+        """Checks whether any bot has registered a file.
+
+        Args:
+            unique_id (:obj:`str`): Unique ID of the file.
+
+        Returns:
+            :obj:`bool`: :obj:`True` if the file is in the registry,
+            :obj:`False` otherwise.
+        """
+        # the unique ID leads the primary key, so this is a single lookup
+        row = Database.execute(
+            "SELECT 1 FROM Media WHERE file_unique_id = ? LIMIT 1",
+            (unique_id,),
+        ).fetchone()
+
+        return row is not None
+
+    def stats(self) -> dict[str, int]:
+        """Returns the registry metrics.
+
+        Returns:
+            :obj:`dict`\\[:obj:`str`, :obj:`int`]: Registry metrics.
+        """
+        return {
+            "cached": len(self._hot),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+MEDIA: MediaRegistry = MediaRegistry()
+"""Registry shared by all modules."""
@@ -6,6 +6,8 @@ Database queries.
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
 from copy import copy
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Any
 
 
@@ -33,6 +35,39 @@ class MalformedQuery(Exception):
     """Malformed Query."""
 
 
+def json_path(key: str, path: str) -> str:
+    """Returns the SQL expression reading a path of a JSON key.
+
+    The path is written into the expression, rather than bound, so that
+    indexes on the same expression can be used by queries.
+
+    Example:
+        .. code-block:: python
+
+            >>> json_path("settings", "$.admins[0]")
+            "json_extract(settings, '$.admins[0]')"
+
+    Args:
+        key (:obj:`str`): Key holding JSON.
+        path (:obj:`str`): JSON path, starting with ``$``.
+
+    Raises:
+        MalformedQuery: If the key is not a plain name, or the path does
+            not start with ``$``.
+
+    Returns:
+        :obj:`str`: The SQL expression.
+    """
+    if not isinstance(key, str) or not key.isidentifier():
+        raise MalformedQuery("JSON paths must follow a plain key.")
+
+    if not path.startswith("$"):
+        raise MalformedQuery("JSON paths must start with $.")
+
+    quoted: str = path.replace("'", "''")
+    return f"json_extract({key}, '{quoted}')"
+
+
 class Query:
     """Queries allows you to specify what element or
     elements to fetch from the database.
@@ -66,6 +101,24 @@ class Query:
     def __copy__(self):
         return Query(lhs=self.lhs, operator=self.operator, rhs=self.rhs)
 
+    def json(self, path: str) -> 'Query':
+        """Compares a path of the JSON key instead of the whole key.
+
+        Example:
+            .. code-block:: python
+
+                >>> chat = Query()
+                >>> table.query(chat.settings.json("$.language") == "pt")
+
+        Args:
+            path (:obj:`str`): JSON path, starting with ``$``.
+
+        Returns:
+            Query: This query.
+        """
+        self.lhs = json_path(self.lhs, path)
+        return self
+
     def __and__(self, other):
         return self._new_node(lhs=self, operator="AND", rhs=other)
 
@@ -149,3 +202,164 @@ class Query:
             return f"({lhsstr} {obj.operator} {rhsstr})", (*lhsph, *rhsph)
 
         return visit(self)
+
+
+class Condition:
+    """Immutable query expression.
+
+    Unlike :class:`Query`, conditions are never changed once built, so
+    they can be built once, shared between coroutines and used as
+    dictionary keys. Two conditions are equal, and hash alike, whenever
+    they have the same structure and values. They are built from the
+    fields of a :class:`Row`.
+
+    Example:
+        .. code-block:: python
+
+            >>> row = Row()
+            >>> english = (row.language == "en") & ~(row.uuid < 0)
+            >>> english.compile()
+            ('((language == ?) AND (NOT (uuid < ?)))', ('en', 0))
+            >>> english == (row.language == "en") & ~(row.uuid < 0)
+            True
+    """
+
+    def __and__(self, other: "Condition") -> "Condition":
+        return Logical(lhs=self, operator="AND", rhs=other)
+
+    def __or__(self, other: "Condition") -> "Condition":
+        return Logical(lhs=self, operator="OR", rhs=other)
+
+    def __invert__(self) -> "Condition":
+        return Negation(condition=self)
+
+    def compile(self) -> CompiledQuery:
+        """Compiles Condition to SQL Clause and its Bound Data, once.
+
+        Returns:
+            CompiledQuery: A SQL Clause with Bound Data.
+        """
+        return self._compiled
+
+    @cached_property
+    def _compiled(self) -> CompiledQuery:
+        raise MalformedQuery("Cannot compile an empty condition.")
+
+
+@dataclass(frozen=True)
+class Comparison(Condition):
+    """Compares a field with a value."""
+
+    field: str
+    operator: str
+    value: Any
+
+    @cached_property
+    def _compiled(self) -> CompiledQuery:
+        return f"({self.field} {self.operator} ?)", (self.value,)
+
+
+@dataclass(frozen=True)
+class Logical(Condition):
+    """Joins two conditions with either ``AND`` or ``OR``."""
+
+    lhs: Condition
+    operator: str
+    rhs: Condition
+
+    def __post_init__(self):
+        if not isinstance(self.lhs, Condition):
+            raise MalformedQuery("Key cannot be a non-condition type.")
+
+        if not isinstance(self.rhs, Condition):
+            raise MalformedQuery("Value cannot be a non-condition type.")
+
+    @cached_property
+    def _compiled(self) -> CompiledQuery:
+        lhsstr, lhsph = self.lhs.compile()
+        rhsstr, rhsph = self.rhs.compile()
+
+        return f"({lhsstr} {self.operator} {rhsstr})", (*lhsph, *rhsph)
+
+
+@dataclass(frozen=True)
+class Negation(Condition):
+    """Negates a condition."""
+
+    condition: Condition
+
+    @cached_property
+    def _compiled(self) -> CompiledQuery:
+        clause, data = self.condition.compile()
+
+        return f"(NOT {clause})", data
+
+
+@dataclass(frozen=True, eq=False)
+class Field:
+    """Field of a :class:`Row`, whose comparisons build a
+    :class:`Comparison`."""
+
+    name: str
+
+    def __hash__(self) -> int:
+        return hash((Field, self.name))
+
+    def json(self, path: str) -> "Field":
+        """Returns a path of this JSON field, as a field of its own.
+
+        Args:
+            path (:obj:`str`): JSON path, starting with ``$``.
+
+        Returns:
+            Field: The path.
+        """
+        return Field(json_path(self.name, path))
+
+    def __eq__(self, other: Any) -> Comparison:  # type: ignore[override]
+        return Comparison(self.name, "==", other)
+
+    def __ne__(self, other: Any) -> Comparison:  # type: ignore[override]
+        return Comparison(self.name, "!=", other)
+
+    def __lt__(self, other: Any) -> Comparison:
+        return Comparison(self.name, "<", other)
+
+    def __le__(self, other: Any) -> Comparison:
+        return Comparison(self.name, "<=", other)
+
+    def __gt__(self, other: Any) -> Comparison:
+        return Comparison(self.name, ">", other)
+
+    def __ge__(self, other: Any) -> Comparison:
+        return Comparison(self.name, ">=", other)
+
+
+class Row:
+    """Stateless factory of :class:`Field` objects, the immutable
+    counterpart of :class:`Query`.
+
+    Example:
+        .. code-block:: python
+
+            >>> row = Row()
+            >>> table.query(row.name == "Kazimierz Kuratowski")
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Field:
+        # keeps copy, pickle and other protocols working
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return Field(name)
+
+    def __getitem__(self, item: str) -> Field:
+        return Field(item)
+
+
+# Represents anything a Table accepts as criteria.
+# For example:
+# >>> criteria: Criteria = Row().user == "Oliver"
+Criteria = Query | Condition
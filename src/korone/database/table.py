@@ -7,7 +7,7 @@ the implementation details and preventing bugs.
 
 from typing import Any, NewType, Protocol
 
-from korone.database.query import Query
+from korone.database.query import Criteria, Field
 
 
 class Document(dict[str, Any]):
@@ -15,18 +15,105 @@ class Document(dict[str, Any]):
     Document represents a single row on the SQL Database
     Table.
 
-    One should note that, due to the limitation of Table
-    Rows, one cannot use a Collection or Mapping as a
-    Document Value.
+    Whether a Collection or Mapping can be used as a
+    Document Value is up to the implementation. The SQLite3
+    one stores them as JSON, and reads them back from the
+    columns declared as JSON.
 
     For example:
 
     .. code-block:: python
 
-        >>> invaliddoc: Document = {"key": [1, 2, 3, 4, 5, 6]}
+        >>> doc: Document = {"uuid": 1, "admins": [1, 2, 3]}
     """
 
 
+_MISSING: Any = object()
+
+
+class Record(Document):
+    """
+    Record is a Document read from a table, which keeps track of
+    the keys changed since, so that updating its row only writes
+    those.
+
+    Only assignments are tracked, so nested values changed in
+    place must be assigned anew, as copies, to be written. Keys
+    cannot be deleted, since the columns of a row always remain.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> record = table.query(chat.uuid == 1000)[0]
+        >>> record["language"] = "pt"
+        >>> record.changes()
+        {'language': 'pt'}
+        >>> # only sets the language column
+        >>> table.update(record, chat.uuid == 1000)
+        >>> record.changes()
+        {}
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._original: dict[str, Any] = {}
+
+    def __setitem__(self, key: str, value: Any):
+        original: Any = self._original.setdefault(
+            key, self.get(key, _MISSING)
+        )
+
+        # setting a key back to its original value undoes the change
+        if original is not _MISSING and original == value:
+            del self._original[key]
+
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs):  # type: ignore[override]
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+
+        return self[key]
+
+    def __ior__(self, other: Any) -> "Record":
+        self.update(other)
+        return self
+
+    def _deleting(self, *_, **__):
+        raise TypeError("Keys cannot be deleted from a Record.")
+
+    __delitem__ = pop = popitem = clear = _deleting
+
+    def __copy__(self) -> "Record":
+        record: Record = type(self)(self)
+        record._original = dict(self._original)
+        return record
+
+    def __reduce__(self):
+        # the keys are restored as read, and then the changes
+        return (type(self), (dict(self),), {"_original": self._original})
+
+    def changes(self) -> Document:
+        """Returns the keys changed since the record was read or
+        last saved, along with their new values.
+
+        Returns:
+            Document: Changed keys and values.
+        """
+        return Document(
+            (key, self[key]) for key in self._original if key in self
+        )
+
+    def clean(self):
+        """Forgets the changes, as done once they are saved."""
+        self._original.clear()
+
+
 Documents = NewType("Documents", list[Document])
 """
 A list of Documents.
@@ -69,8 +156,8 @@ class Table(Protocol):
 
         .. warning::
 
-            Document values *cannot* have nested values, due to the
-            limitation of database rows. Refer to the Document type
+            Document values may only have nested values if the
+            implementation supports them. Refer to the Document type
             for more information.
 
 
@@ -78,31 +165,87 @@ class Table(Protocol):
             fields (Any | Document): fields to insert.
         """
 
-    def query(self, query: Query) -> Documents:
+    def query(self, query: Criteria) -> Documents:
         """Query rows that match the criteria.
 
+        The rows are returned as Records, which keep track
+        of the keys changed afterwards.
+
         Args:
-            query (Query): matching criteria.
+            query (Criteria): matching criteria.
 
         Returns:
             Documents: List of Documents of rows that matched
             the criteria.
         """
 
-    def update(self, fields: Any | Document, query: Query):
+    def search(
+        self, text: str, query: Criteria | None = None, limit: int = 10
+    ) -> Documents:
+        """Full-text search rows, best matches first.
+
+        Every word in `text` must appear in the row, in any order and
+        regardless of case. A word ending with `*` matches any word it
+        prefixes.
+
+        The table must have a full-text index, whose layout is up to
+        the implementation.
+
+        For example:
+
+            .. code-block:: python
+
+                >>> table.search("good morn*", Query().chat_uuid == 1000)
+                [{'chat_uuid': 1000, 'handler': 'gm', 'data': 'Good morning!',
+                  'file_id': None, 'filter_type': 'text'}]
+
+        Args:
+            text (str): words to search for.
+            query (Criteria, optional): matching criteria the rows must
+                also meet. Defaults to None.
+            limit (int, optional): maximum amount of rows. Defaults to 10.
+
+        Returns:
+            Documents: List of Documents of the best matching rows.
+        """
+
+    def update(self, fields: Any | Document, query: Criteria):
         """Update fields on rows that match the criteria.
 
         The fields has a special behavior. You should check
         the method `insert` for more information.
 
+        If `fields` is a Record, only the keys changed since
+        it was read are written, and nothing at all if none
+        changed. The Record is then marked as saved.
+
         Args:
             fields (Any | Document): fields to update.
-            query (Query): matching criteria.
+            query (Criteria): matching criteria.
         """
 
-    def delete(self, query: Query):
+    def delete(self, query: Criteria):
         """Delete rows that match the criteria.
 
         Args:
-            query (Query): matching criteria.
+            query (Criteria): matching criteria.
+        """
+
+    def index(self, name: str, *keys: str | Field):
+        """Create an index on keys of the table, unless it exists.
+
+        Keys may also be paths of JSON keys, so that queries
+        comparing the same paths are indexed.
+
+        For example:
+
+            .. code-block:: python
+
+                >>> row = Row()
+                >>> table.index("ChatsLanguage", row.settings.json("$.lang"))
+                >>> table.query(row.settings.json("$.lang") == "pt")
+
+        Args:
+            name (str): index name.
+            keys (str | Field): keys or JSON paths to index.
         """
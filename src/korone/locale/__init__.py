@@ -10,8 +10,6 @@ from io import TextIOWrapper
 from os import path
 from typing import Any
 
-import yaml
-
 from korone.utils.traverse import traverse
 
 log = logging.getLogger(__name__)
@@ -48,6 +46,9 @@ class StringResource:
         if not path.isfile(langpack):
             return cls.load("en")
 
+        # PyYAML is only needed once a language is first used
+        import yaml  # pylint: disable=import-outside-toplevel
+
         try:
             langfile: TextIOWrapper
             with open(langpack, "r", encoding="utf-8") as langfile:
@@ -0,0 +1,95 @@
+"""
+Configures Korone's logging system.
+
+By default, records are formatted and written by the thread which emits
+them. In queued mode, emitting a record only puts it on a queue, while a
+background listener thread formats and writes it, so handlers never
+block on the output stream.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from korone import constants
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as a single line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict = {
+            "time": record.created,
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup(
+    level: int = logging.INFO,
+    queued: bool = False,
+    structured: bool = False,
+) -> QueueListener | None:
+    """Sets up the root logger.
+
+    In queued mode, the caller information (file name, function name and
+    line number) is not collected, since doing so requires inspecting the
+    caller's stack frame for every record.
+
+    Args:
+        level (:obj:`int`, *optional*): Logging level. Defaults to
+            :obj:`logging.INFO`.
+        queued (:obj:`bool`, *optional*): :obj:`True` if records should be
+            written by a background thread. Defaults to :obj:`False`.
+        structured (:obj:`bool`, *optional*): :obj:`True` if records should
+            be written as JSON objects. Defaults to :obj:`False`.
+
+    Returns:
+        :obj:`~logging.handlers.QueueListener` | :obj:`None`: The started
+        listener in queued mode, which must be stopped on exit, otherwise
+        :obj:`None`.
+    """
+    formatter: logging.Formatter
+
+    if structured:
+        formatter = JSONFormatter()
+    elif queued:
+        formatter = logging.Formatter(constants.LOGGER_FAST_FORMAT_OUTPUT)
+    else:
+        formatter = logging.Formatter(constants.LOGGER_FORMAT_OUTPUT)
+
+    stream: logging.Handler = logging.StreamHandler()
+    stream.setFormatter(formatter)
+
+    root: logging.Logger = logging.getLogger()
+    root.setLevel(level)
+
+    if not queued:
+        root.addHandler(stream)
+        return None
+
+    # See "Optimization" in the Python Logging HOWTO
+    logging._srcfile = None  # pylint: disable=protected-access
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+
+    listener: QueueListener = QueueListener(
+        records, stream, respect_handler_level=True
+    )
+    listener.start()
+
+    return listener
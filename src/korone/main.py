@@ -5,14 +5,93 @@ Entry point of the Korone.
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
+import dataclasses
 import logging
+import sqlite3
+from typing import Callable
 
-from korone import config
+from korone import config, constants
+from korone.metrics import Metrics
 from korone.modules import App, AppParameters
-from korone.database import Database
+from korone.modules.workers import EXECUTOR, resolve_workers
+from korone.utils.profiling import PROFILER
+from korone.database import Database, DatabaseError
+from korone.database.backup import BACKUP
+from korone.database.cache import QueryCache
+from korone.database.dump import dump, load
 
 log = logging.getLogger(__name__)
 
+DATABASE_PATH: str = "korone.db"
+"""Path to the database file."""
+
+
+def backup(_: list[str]) -> int:
+    """Takes a database snapshot while the bot may be running.
+
+    Usage: ``python -m korone backup``
+
+    Returns:
+        :obj:`int`: Exit status.
+    """
+    try:
+        print(BACKUP.run(DATABASE_PATH))
+    except (sqlite3.Error, OSError) as err:
+        log.error("Could not back up the database: %s", err)
+        return 1
+
+    return 0
+
+
+def export(args: list[str]) -> int:
+    """Exports the database to a dump.
+
+    Usage: ``python -m korone export <file>[.gz|.zst]``
+
+    Returns:
+        :obj:`int`: Exit status.
+    """
+    if len(args) != 1:
+        log.error("Usage: python -m korone export <file>")
+        return 2
+
+    try:
+        dump(DATABASE_PATH, args[0])
+    except (sqlite3.Error, OSError, DatabaseError) as err:
+        log.error("Could not export the database: %s", err)
+        return 1
+
+    return 0
+
+
+def import_(args: list[str]) -> int:
+    """Imports a dump into the database, replacing the tables it holds.
+
+    Usage: ``python -m korone import <file>[.gz|.zst]``
+
+    Returns:
+        :obj:`int`: Exit status.
+    """
+    if len(args) != 1:
+        log.error("Usage: python -m korone import <file>")
+        return 2
+
+    try:
+        load(DATABASE_PATH, args[0])
+    except (sqlite3.Error, OSError, ValueError, DatabaseError) as err:
+        log.error("Could not import the dump: %s", err)
+        return 1
+
+    return 0
+
+
+COMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "backup": backup,
+    "export": export,
+    "import": import_,
+}
+"""Commands run instead of the bot, along with their arguments."""
+
 
 def main(argv: list[str]) -> int:
     """The main function is the entry point for the program.
@@ -27,24 +106,98 @@ def main(argv: list[str]) -> int:
     """
     log.info("Program started")
 
-    config.init("korone.conf")
+    with PROFILER.phase("config"):
+        config.init("korone.conf")
+
+    BACKUP.directory = config.get(
+        "backup", "DIRECTORY", constants.DEFAULT_BACKUP_DIR
+    )
+    BACKUP.keep = config.getint(
+        "backup", "KEEP", constants.DEFAULT_BACKUP_KEEP
+    )
+    BACKUP.interval = config.getfloat("backup", "INTERVAL") * 3600
+
+    # flags, such as --debug, are not arguments of the commands
+    args: list[str] = [arg for arg in argv[1:] if not arg.startswith("--")]
+
+    if args:
+        if args[0] not in COMMANDS:
+            log.error("Unknown command: %s", args[0])
+            return 2
+
+        return COMMANDS[args[0]](args[1:])
 
     ipv6 = config.get("pyrogram", "USE_IPV6").lower() in ("yes", "true", "1")
 
-    Database.connect("korone.db")
-    Database.setup()
+    Metrics.enabled = config.getbool("metrics", "ENABLED")
+
+    workers: str = config.get("pyrogram", "WORKERS")
+
+    EXECUTOR.resize(
+        config.getint(
+            "concurrency",
+            "BLOCKING_WORKERS",
+            constants.DEFAULT_BLOCKING_WORKERS,
+        )
+    )
+
+    # BOT_TOKEN may hold several comma separated tokens, one per bot
+    tokens: list[str] = [
+        token.strip()
+        for token in config.get("pyrogram", "BOT_TOKEN").split(",")
+        if token.strip()
+    ] or [""]
 
     param: AppParameters = AppParameters(
         api_id=config.get("pyrogram", "API_ID"),
         api_hash=config.get("pyrogram", "API_HASH"),
-        bot_token=config.get("pyrogram", "BOT_TOKEN"),
+        bot_token=tokens[0],
         ipv6=ipv6,
+        in_memory=config.getbool("pyrogram", "IN_MEMORY", True),
+        workdir=config.get(
+            "pyrogram", "SESSION_DIR", constants.DEFAULT_SESSION_DIR
+        ),
+        workers=resolve_workers(workers),
+        autotune=workers.strip().lower() == "auto",
+        max_workers=config.getint(
+            "concurrency", "MAX_WORKERS", constants.DEFAULT_MAX_WORKERS
+        ),
+        shards=config.getint("sharding", "SHARDS"),
+        shutdown_timeout=config.getfloat(
+            "shutdown", "TIMEOUT", constants.DEFAULT_SHUTDOWN_TIMEOUT
+        ),
+        maintenance=config.getbool("database", "MAINTENANCE"),
+        watchdog_threshold=config.getfloat(
+            "watchdog", "THRESHOLD", constants.DEFAULT_WATCHDOG_THRESHOLD
+        ),
     )
 
-    app: App = App(param)
-    app.setup()
-    app.run()
+    others: list[AppParameters] = [
+        dataclasses.replace(param, bot_token=token, name=f"{param.name}-{i}")
+        for i, token in enumerate(tokens[1:], start=1)
+    ]
+
+    with PROFILER.phase("database connect"):
+        Database.connect(DATABASE_PATH)
+
+    # the write-ahead log is folded back even if startup or run fails
+    try:
+        cache_size: int = config.getint("database", "QUERY_CACHE_SIZE")
+        if cache_size > 0:
+            Database.cache = QueryCache(cache_size)
+
+        with PROFILER.phase("database setup"):
+            Database.setup()
+
+        app: App = App(param, *others)
+
+        with PROFILER.phase("module import"):
+            app.setup()
 
-    Database.close()
+        app.run()
+    finally:
+        EXECUTOR.shutdown()
+        Database.checkpoint()
+        Database.close()
 
     return len(argv) - 1
@@ -0,0 +1,279 @@
+"""
+Collects Korone's runtime metrics.
+
+Metrics are disabled by default. While disabled, handlers are registered
+without any wrapper and database statements are executed directly, so
+the only cost left is checking :attr:`Metrics.enabled`.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import functools
+import inspect
+import logging
+import math
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+"""Default histogram upper bounds, in seconds."""
+
+
+class Histogram:
+    """Cumulative latency histogram, as used by Prometheus.
+
+    Args:
+        buckets (:obj:`tuple`\\[:obj:`float`, ...], *optional*): Sorted
+            bucket upper bounds. Defaults to :obj:`DEFAULT_BUCKETS`.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.errors: int = 0
+
+    def observe(self, value: float, error: bool = False) -> None:
+        """Records a single observation.
+
+        Args:
+            value (:obj:`float`): Observed value, in seconds.
+            error (:obj:`bool`, *optional*): :obj:`True` if the observed
+                call raised an exception. Defaults to :obj:`False`.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile from the bucket counts.
+
+        Args:
+            q (:obj:`float`): Quantile, between 0 and 1.
+
+        Returns:
+            :obj:`float`: Upper bound of the bucket holding the quantile,
+            or ``inf`` if it lies past the last bucket.
+        """
+        rank: float = q * self.count
+        seen: int = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and seen > 0:
+                return bound
+
+        return float("inf")
+
+
+class Window:
+    """Rolling window holding the latest samples.
+
+    Args:
+        size (:obj:`int`): Maximum amount of samples kept.
+    """
+
+    def __init__(self, size: int):
+        self.samples: deque = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, value: float) -> None:
+        """Adds a sample, discarding the oldest one if the window is full.
+
+        Args:
+            value (:obj:`float`): Sample value.
+        """
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        """Computes a percentile of the samples using the nearest-rank
+        method.
+
+        Args:
+            q (:obj:`float`): Percentile, between 0 and 100.
+
+        Returns:
+            :obj:`float`: The percentile, or ``nan`` if there are no
+            samples.
+        """
+        if not self.samples:
+            return float("nan")
+
+        ordered: list[float] = sorted(self.samples)
+        rank: int = max(math.ceil(q / 100 * len(ordered)), 1)
+
+        return ordered[rank - 1]
+
+
+class Metrics:
+    """Metrics registry."""
+
+    enabled: bool = False
+    """:obj:`True` if metrics should be collected, otherwise :obj:`False`."""
+
+    handlers: dict[str, Histogram] = {}
+    """Handler latencies, indexed by handler name."""
+
+    queries: dict[str, Histogram] = {}
+    """Database statement latencies, indexed by statement kind."""
+
+    gauges: dict[str, float] = {}
+    """Arbitrary gauges, indexed by metric name."""
+
+    counters: dict[str, float] = {}
+    """Arbitrary counters, indexed by metric name."""
+
+    @classmethod
+    def increment(cls, metric: str, amount: float = 1) -> None:
+        """Increments a counter.
+
+        Args:
+            metric (:obj:`str`): Metric name, which may carry labels,
+                such as ``name{label="value"}``.
+            amount (:obj:`float`, *optional*): Amount added. Defaults
+                to 1.
+        """
+        cls.counters[metric] = cls.counters.get(metric, 0) + amount
+
+    @classmethod
+    def observe_handler(cls, name: str, value: float, error: bool) -> None:
+        """Records a handler call.
+
+        Args:
+            name (:obj:`str`): Handler name.
+            value (:obj:`float`): Elapsed time, in seconds.
+            error (:obj:`bool`): :obj:`True` if the handler raised.
+        """
+        if name not in cls.handlers:
+            cls.handlers[name] = Histogram()
+
+        cls.handlers[name].observe(value, error)
+
+    @classmethod
+    def observe_query(cls, sql: str, value: float, error: bool) -> None:
+        """Records a database statement.
+
+        Statements are grouped by their leading keyword (``SELECT``,
+        ``INSERT``, and so on), which keeps the amount of series bounded.
+
+        Args:
+            sql (:obj:`str`): SQL Statement.
+            value (:obj:`float`): Elapsed time, in seconds.
+            error (:obj:`bool`): :obj:`True` if the statement raised.
+        """
+        kind: str = sql.lstrip().split(None, 1)[0].upper() if sql else ""
+
+        if kind not in cls.queries:
+            cls.queries[kind] = Histogram()
+
+        cls.queries[kind].observe(value, error)
+
+    @classmethod
+    def instrument(cls, callback: Callable, name: str) -> Callable:
+        """Wraps a Pyrogram handler callback so its calls are recorded.
+
+        Callbacks are returned untouched if metrics are disabled or if
+        they are not coroutine functions, since Pyrogram relies on that
+        to decide whether to run them on its executor.
+
+        Args:
+            callback (:obj:`~typing.Callable`): Handler callback.
+            name (:obj:`str`): Name the calls are recorded under.
+
+        Returns:
+            :obj:`~typing.Callable`: The wrapped callback.
+        """
+        if not cls.enabled or not inspect.iscoroutinefunction(callback):
+            return callback
+
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs) -> Any:
+            start: float = time.perf_counter()
+            error: bool = True
+
+            try:
+                result = await callback(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                cls.observe_handler(name, time.perf_counter() - start, error)
+
+        return wrapper
+
+    @classmethod
+    def reset(cls) -> None:
+        """Discards every recorded metric."""
+        cls.handlers.clear()
+        cls.queries.clear()
+        cls.gauges.clear()
+        cls.counters.clear()
+
+    @classmethod
+    def render(cls) -> str:
+        """Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            :obj:`str`: Rendered metrics.
+        """
+        lines: list[str] = []
+
+        def histogram(metric: str, label: str, series: dict[str, Histogram]):
+            lines.append(f"# TYPE {metric}_seconds histogram")
+
+            for key, hist in sorted(series.items()):
+                seen: int = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    seen += count
+                    lines.append(
+                        f'{metric}_seconds_bucket{{{label}="{key}",'
+                        f'le="{bound}"}} {seen}'
+                    )
+                lines.append(
+                    f'{metric}_seconds_bucket{{{label}="{key}",le="+Inf"}} '
+                    f"{hist.count}"
+                )
+                lines.append(
+                    f'{metric}_seconds_sum{{{label}="{key}"}} {hist.total}'
+                )
+                lines.append(
+                    f'{metric}_seconds_count{{{label}="{key}"}} {hist.count}'
+                )
+
+            lines.append(f"# TYPE {metric}_errors_total counter")
+            for key, hist in sorted(series.items()):
+                lines.append(
+                    f'{metric}_errors_total{{{label}="{key}"}} {hist.errors}'
+                )
+
+        histogram("korone_handler", "handler", cls.handlers)
+        histogram("korone_database", "statement", cls.queries)
+
+        typed: set[str] = set()
+
+        for kind, series in (("counter", cls.counters), ("gauge", cls.gauges)):
+            for metric, value in sorted(series.items()):
+                # metrics may carry labels, such as name{label="value"}
+                name: str = metric.split("{", 1)[0]
+
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+
+                lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
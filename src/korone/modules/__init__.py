@@ -6,13 +6,27 @@ Pyrogram's Client and handling with all the commands modules.
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
+import asyncio
+import contextlib
 import logging
+import os
 from dataclasses import dataclass
 
-from pyrogram import Client
+from pyrogram import Client, idle
+from pyrogram.errors import Unauthorized
+from pyrogram.handlers import RawUpdateHandler
 
-from korone import constants
+from korone import config, constants
+from korone.database import Database
+from korone.database.backup import BACKUP
 from korone.modules import core
+from korone.modules.gate import Gate
+from korone.utils.scheduler import SCHEDULER
+from korone.modules.shard import ShardPool
+from korone.modules.shutdown import COORDINATOR
+from korone.modules.watchdog import WATCHDOG
+from korone.modules.workers import EXECUTOR, WorkerTuner
+from korone.utils.profiling import PROFILER
 
 log = logging.getLogger(__name__)
 
@@ -34,6 +48,9 @@ class AppParameters:
     """:obj:`True` if the Pyrogram session
     should be in memory, otherwise :obj:`False`."""
 
+    workdir: str = constants.DEFAULT_SESSION_DIR
+    """Directory where the session is stored when it is not in memory."""
+
     ipv6: bool = False
     """:obj:`True` if the client should use IPv6, otherwise :obj:`False`."""
 
@@ -43,32 +60,109 @@ class AppParameters:
     workers: int = constants.DEFAULT_WORKERS
     """Number of workers to be used by the client."""
 
+    autotune: bool = False
+    """:obj:`True` if workers should be added as handler latency is
+    observed, otherwise :obj:`False`."""
+
+    max_workers: int = constants.DEFAULT_MAX_WORKERS
+    """Upper bound on workers when they are tuned automatically."""
+
+    no_updates: bool = False
+    """:obj:`True` if the client should not receive updates, otherwise
+    :obj:`False`."""
+
+    shards: int = 0
+    """Number of processes handling updates. If it is not positive,
+    updates are handled by the client process itself."""
+
+    watchdog_threshold: float = constants.DEFAULT_WATCHDOG_THRESHOLD
+    """Seconds the event loop may be blocked before the watchdog reports
+    it. The watchdog is disabled if it is not positive."""
+
+    shutdown_timeout: float = constants.DEFAULT_SHUTDOWN_TIMEOUT
+    """Seconds to wait for running handlers, and then for queued
+    messages, once the client is asked to stop."""
+
+    maintenance: bool = False
+    """:obj:`True` if the database maintenance should run once the
+    clients are online, otherwise :obj:`False`."""
+
 
 class App:
-    """Handles :obj:`~pyrogram.Client` and :obj:`~korone.database.Database`."""
+    """Handles :obj:`~pyrogram.Client` and :obj:`~korone.database.Database`.
+
+    Several bots may be run at once, by passing the parameters of each
+    one of them. Their clients share the same event loop, the same
+    modules and therefore the same command table, locale tables and
+    database connection.
+
+    Example:
+        .. code-block:: python
 
-    def __init__(self, parameters: AppParameters):
+            >>> app = App(AppParameters(...), AppParameters(...))
+            >>> app.setup()
+            >>> app.run()
+    """
+
+    def __init__(self, parameters: AppParameters, *others: AppParameters):
         self.app: Client | None = None
         self.parameters: AppParameters = parameters
+        self.others: tuple[AppParameters, ...] = others
+        self.clients: list[Client] = []
+        self.pools: list[ShardPool] = []
 
-    def setup(self) -> None:
-        """The setup function is called when the module is loaded.
-        It creates a new :obj:`~pyrogram.Client` object and stores
-        it in self.app for later use.
-        """
-        log.debug("Creating Pyrogram Client object")
-        self.app = Client(
-            api_hash=self.parameters.api_hash,
-            api_id=self.parameters.api_id,
-            bot_token=self.parameters.bot_token,
-            in_memory=self.parameters.in_memory,
-            ipv6=self.parameters.ipv6,
-            name=self.parameters.name,
-            workers=self.parameters.workers,
+    def _client(self, parameters: AppParameters) -> Client:
+        name: str = parameters.name
+        workdir: str = os.path.expanduser(parameters.workdir)
+
+        if not parameters.in_memory:
+            # a session belongs to a single bot, so changing the token to
+            # another bot must not reuse it; the bot ID prefixes the token
+            name = f"{name}-{parameters.bot_token.split(':', 1)[0]}"
+            os.makedirs(workdir, exist_ok=True)
+
+        log.debug("Creating Pyrogram Client object %s", name)
+        client: Client = Client(
+            api_hash=parameters.api_hash,
+            api_id=parameters.api_id,
+            bot_token=parameters.bot_token,
+            in_memory=parameters.in_memory,
+            ipv6=parameters.ipv6,
+            name=name,
+            no_updates=parameters.no_updates,
+            workdir=workdir,
+            workers=parameters.workers,
         )
 
+        if parameters.shards > 0:
+            log.debug("Forwarding updates to shards")
+            pool: ShardPool = ShardPool(
+                parameters,
+                parameters.shards,
+                config.filepath,
+                Database.path,
+            )
+            client.add_handler(RawUpdateHandler(pool.handler), -1)
+            self.pools.append(pool)
+            return client
+
         log.debug("Loading modules")
-        core.load_all(self.app)
+        core.load_all(client)
+        Gate(client, constants.GATE_GROUP).install()
+
+        return client
+
+    def setup(self) -> None:
+        """The setup function is called when the module is loaded.
+        It creates a new :obj:`~pyrogram.Client` object for each bot and
+        stores them in self.clients for later use. The first one is also
+        stored in self.app.
+        """
+        self.clients = [
+            self._client(parameters)
+            for parameters in (self.parameters, *self.others)
+        ]
+        self.app = self.clients[0]
 
     def run(self) -> None:
         """The run function is the main entry point for the client.
@@ -82,5 +176,94 @@ class App:
         if self.app is None:
             raise RuntimeError("App is not initialized!")
 
-        log.info("Running client")
-        self.app.run()
+        for pool in self.pools:
+            pool.start()
+
+        log.info("Running %d client(s)", len(self.clients))
+        try:
+            self.app.run(self._run())
+        finally:
+            for pool in self.pools:
+                pool.stop()
+
+    async def _run(self) -> None:
+        if self.parameters.watchdog_threshold > 0:
+            WATCHDOG.threshold = self.parameters.watchdog_threshold
+            WATCHDOG.start()
+
+        tuners: list[WorkerTuner] = [
+            WorkerTuner(client, parameters.max_workers)
+            for client, parameters in zip(
+                self.clients, (self.parameters, *self.others)
+            )
+            if parameters.autotune
+        ]
+
+        try:
+            with PROFILER.phase("client start"):
+                for client in self.clients:
+                    await self._start(client)
+
+            PROFILER.report()
+
+            # nonessential work only starts once every client is online
+            maintenance: asyncio.Task | None = None
+            if Database.isopen():
+                if self.parameters.maintenance:
+                    maintenance = asyncio.create_task(
+                        EXECUTOR.run(Database.maintain)
+                    )
+                BACKUP.start(Database.path)
+
+            for tuner in tuners:
+                tuner.start()
+
+            # returns on SIGINT, SIGTERM or SIGABRT
+            await idle()
+
+            log.info("Shutting down")
+            BACKUP.stop()
+
+            await COORDINATOR.drain(self.parameters.shutdown_timeout)
+            await SCHEDULER.drain(self.parameters.shutdown_timeout)
+
+            if maintenance is not None:
+                await self._finish(maintenance)
+
+            for tuner in tuners:
+                tuner.stop()
+
+            for client in self.clients:
+                await client.stop()
+        finally:
+            WATCHDOG.stop()
+
+    async def _finish(self, maintenance: asyncio.Task) -> None:
+        # the maintenance runs on a thread, which cannot be cancelled,
+        # thus it is interrupted instead if it does not finish in time
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(maintenance), self.parameters.shutdown_timeout
+            )
+        except asyncio.TimeoutError:
+            Database.interrupt()
+            await maintenance
+
+    @staticmethod
+    async def _start(client: Client) -> None:
+        # a stored session already holds the auth key and the peers,
+        # thus starting from it skips the whole authorization
+        try:
+            await client.start()
+        except Unauthorized as err:
+            if client.in_memory:
+                raise
+
+            log.warning("Stored session was rejected: %s", err)
+            log.warning("Authorizing %s from scratch", client.name)
+
+            with contextlib.suppress(Exception):
+                await client.storage.close()
+
+            await client.storage.delete()
+            await client.start()
@@ -19,6 +19,9 @@ from pyrogram.types import Message
 from korone import constants
 from korone.database import Database
 from korone.database.manager import Clause, Column, Command, CommandManager
+from korone.metrics import Metrics
+from korone.modules.shutdown import COORDINATOR
+from korone.modules.watchdog import WATCHDOG
 from korone.utils.traverse import bfs_attr_search
 from korone.utils.misc import get_command_name
 
@@ -38,8 +41,10 @@ class Module:
 
 # global module table which gets loaded on boot
 MODULES: list[Module] = [
+    Module(name="filters", author="Korone Devs"),
     Module(name="hello", author="Korone Devs"),
     Module(name="ping", author="Korone Devs"),
+    Module(name="stats", author="Korone Devs"),
     Module(name="toggle", author="Korone Devs"),
 ]
 
@@ -73,6 +78,10 @@ Example:
 """
 
 
+HANDLERS: set[Handler] = set()
+"""Handlers which have already been registered by any client."""
+
+
 async def togglable(_, __, update: Message) -> bool:
     """Filter to handle state of command for Pyrogram's Handlers.
 
@@ -88,7 +97,8 @@ async def togglable(_, __, update: Message) -> bool:
 
     command: str = get_command_name(update)
 
-    log.debug("command: %s", command)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("command: %s", command)
 
     if command not in COMMANDS:
         return False
@@ -147,12 +157,27 @@ def register_command(app: Client, command: FunctionType) -> bool:
 
     for handler, group in command.handlers:  # type: ignore
         if isinstance(handler, Handler) and isinstance(group, int):
-            log.info("Registering command %s", command)
-            log.info("\thandler: %s", handler)
-            log.info("\tgroup:   %d", group)
+            log.info("Registering command %s", command.__name__)
+
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("\thandler: %s", handler)
+                log.debug("\tgroup:   %d", group)
 
             successful = True
 
+            # handlers are shared by every client, yet they must be
+            # instrumented and indexed only once
+            if handler in HANDLERS:
+                app.add_handler(handler, group)
+                continue
+
+            HANDLERS.add(handler)
+
+            WATCHDOG.register(handler.callback, command.__name__)
+            handler.callback = COORDINATOR.track(
+                Metrics.instrument(handler.callback, command.__name__)
+            )
+
             app.add_handler(handler, group)
 
             log.debug("Checking for command filters.")
@@ -183,15 +208,19 @@ def register_command(app: Client, command: FunctionType) -> bool:
 
             cmdmgr = CommandManager(Database())
 
+            debug: bool = log.isEnabledFor(logging.DEBUG)
+
             for each in cmdmgr.query(Clause(Column.COMMAND, parent)):
-                log.debug(
-                    "Fetched chat state from the database: %s => %s",
-                    each.chat_id,
-                    str(each.state),
-                )
+                if debug:
+                    log.debug(
+                        "Fetched chat state from the database: %s => %s",
+                        each.chat_id,
+                        each.state,
+                    )
                 COMMANDS[parent]["chat"][each.chat_id] = each.state
 
-            log.debug("New command node: %s", COMMANDS[parent])
+            if debug:
+                log.debug("New command node: %s", COMMANDS[parent])
 
     return successful
 
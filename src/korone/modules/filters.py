@@ -0,0 +1,500 @@
+"""
+The filters module replies to keywords on a per chat basis.
+
+Each chat's keywords are compiled into a single
+:class:`~korone.utils.automaton.Automaton`, so a message is scanned once
+no matter how many filters its chat has. The automaton of a chat is read
+from the ``Filters`` table the first time a message arrives there, and
+is then kept up to date as filters are added and removed. Only chats
+which have filters get an automaton, so chats without any cost neither
+memory nor database queries.
+
+Filters are added and removed by chat administrators only.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import logging
+from dataclasses import dataclass
+from html import escape
+
+from pyrogram import Client, filters
+from pyrogram.enums import ChatMemberStatus, ChatType
+from pyrogram.errors import RPCError
+from pyrogram.types import ChatMember, Message
+
+from korone import constants
+from korone.database import Database
+from korone.database.media import MEDIA
+from korone.database.query import Row
+from korone.database.table import Documents
+from korone.locale import StringResource
+from korone.utils.kinds import Kind, kinds
+from korone.utils.scheduler import SCHEDULER, reply
+from korone.utils.automaton import Automaton
+from korone.utils.misc import get_command_arg, get_language_code
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatFilter:
+    """Reply sent when a keyword is found."""
+
+    keyword: str
+    """Case folded keyword."""
+
+    data: str
+    """Text of the reply, or the caption of its media."""
+
+    file_id: str | None = None
+    """Unique ID of the media sent as the reply, if any, which
+    :obj:`~korone.database.media.MEDIA` maps to a ``file_id``."""
+
+    filter_type: str = "text"
+    """Kind of the reply, either ``text`` or a Pyrogram media type."""
+
+
+ROW: Row = Row()
+"""Fields of the ``Filters`` table, shared by every query."""
+
+AUTOMATA: dict[int, Automaton[ChatFilter]] = {}
+"""Loaded keyword automata, indexed by chat ID."""
+
+_CHATS: set[int] | None = None
+"""IDs of the chats which have filters, read on first use."""
+
+
+def chats_with_filters() -> set[int]:
+    """Returns the IDs of the chats which have filters, reading them from
+    the database on first use.
+
+    Returns:
+        :obj:`set`\\[:obj:`int`]: Chat IDs.
+    """
+    global _CHATS  # pylint: disable=global-statement
+
+    if _CHATS is None:
+        _CHATS = {
+            row["chat_uuid"]
+            for row in Database.execute(
+                "SELECT DISTINCT chat_uuid FROM Filters"
+            )
+        }
+
+    return _CHATS
+
+
+def automaton_of(chat_id: int) -> Automaton[ChatFilter]:
+    """Returns the automaton of a chat, reading it from the database on
+    first use.
+
+    Chats without filters get a new empty automaton every time, which is
+    not kept, so they do not fill :obj:`AUTOMATA`.
+
+    Args:
+        chat_id (:obj:`int`): Chat ID.
+
+    Returns:
+        :obj:`~korone.utils.automaton.Automaton`: The chat's automaton.
+    """
+    automaton: Automaton[ChatFilter] | None = AUTOMATA.get(chat_id)
+
+    if automaton is not None:
+        return automaton
+
+    automaton = Automaton()
+
+    if chat_id not in chats_with_filters():
+        return automaton
+
+    for row in Database.execute(
+        "SELECT handler, data, file_id, filter_type FROM Filters "
+        "WHERE chat_uuid = ?",
+        (chat_id,),
+    ):
+        automaton.add(
+            row["handler"],
+            ChatFilter(
+                row["handler"].casefold(),
+                row["data"] or "",
+                row["file_id"],
+                row["filter_type"] or "text",
+            ),
+        )
+
+    AUTOMATA[chat_id] = automaton
+    return automaton
+
+
+def add_filter(chat_id: int, chat_filter: ChatFilter) -> None:
+    """Saves a filter, replacing any other with the same keyword.
+
+    Args:
+        chat_id (:obj:`int`): Chat ID.
+        chat_filter (:obj:`ChatFilter`): Filter.
+    """
+    automaton: Automaton[ChatFilter] = automaton_of(chat_id)
+
+    with Database.transaction():
+        Database.execute(
+            "DELETE FROM Filters WHERE chat_uuid = ? AND handler = ?",
+            (chat_id, chat_filter.keyword),
+        )
+        Database.execute(
+            "INSERT INTO Filters "
+            "(chat_uuid, handler, data, file_id, filter_type) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                chat_id,
+                chat_filter.keyword,
+                chat_filter.data,
+                chat_filter.file_id,
+                chat_filter.filter_type,
+            ),
+        )
+
+    automaton.add(chat_filter.keyword, chat_filter)
+    AUTOMATA[chat_id] = automaton
+    chats_with_filters().add(chat_id)
+
+
+def remove_filter(chat_id: int, keyword: str) -> bool:
+    """Deletes a filter.
+
+    Args:
+        chat_id (:obj:`int`): Chat ID.
+        keyword (:obj:`str`): Keyword of the filter.
+
+    Returns:
+        :obj:`bool`: :obj:`True` if the filter was deleted, :obj:`False`
+        if there was no such filter.
+    """
+    keyword = keyword.casefold()
+    automaton: Automaton[ChatFilter] = automaton_of(chat_id)
+
+    with Database.transaction():
+        deleted: int = Database.execute(
+            "DELETE FROM Filters WHERE chat_uuid = ? AND handler = ?",
+            (chat_id, keyword),
+        ).rowcount
+
+    # the automaton only changes once the filter is gone for good
+    if not automaton.remove(keyword) and deleted == 0:
+        return False
+
+    if len(automaton) == 0:
+        AUTOMATA.pop(chat_id, None)
+        chats_with_filters().discard(chat_id)
+
+    return True
+
+
+async def isadmin(client: Client, message: Message) -> bool:
+    """Checks whether the sender of a message administers its chat.
+
+    Everyone administers their own private chat, and messages sent on
+    behalf of the chat itself come from its anonymous administrators.
+
+    Args:
+        client (:obj:`~pyrogram.Client`): Client.
+        message (:obj:`~pyrogram.types.Message`): Message.
+
+    Returns:
+        :obj:`bool`: :obj:`True` if the sender is an owner or
+        administrator of the chat, :obj:`False` otherwise, or if Telegram
+        could not tell.
+    """
+    if message.chat.type == ChatType.PRIVATE:
+        return True
+
+    if message.sender_chat is not None:
+        return message.sender_chat.id == message.chat.id
+
+    if message.from_user is None:
+        return False
+
+    try:
+        member: ChatMember = await client.get_chat_member(
+            message.chat.id, message.from_user.id
+        )
+    except RPCError as error:
+        log.warning("Could not check for admin rights: %s", error)
+        return False
+
+    return member.status in (
+        ChatMemberStatus.OWNER,
+        ChatMemberStatus.ADMINISTRATOR,
+    )
+
+
+def search_filters(chat_id: int, text: str, limit: int = 10) -> list[str]:
+    """Searches the keywords and replies of a chat's filters.
+
+    Args:
+        chat_id (:obj:`int`): Chat ID.
+        text (:obj:`str`): Words to search for, as accepted by
+            :meth:`~korone.database.table.Table.search`.
+        limit (:obj:`int`, *optional*): Maximum amount of filters.
+            Defaults to 10.
+
+    Returns:
+        :obj:`list`\\[:obj:`str`]: Keywords of the best matching filters.
+    """
+    documents: Documents = Database.table("Filters").search(
+        text, ROW.chat_uuid == chat_id, limit
+    )
+
+    return [document["handler"] for document in documents]
+
+
+def split_keyword(args: str) -> tuple[str, str]:
+    """Splits the arguments of ``/filter`` into the keyword and the rest.
+
+    Keywords with spaces must be quoted.
+
+    Example:
+        .. code-block:: python
+
+            >>> split_keyword('"good morning" Morning!')
+            ("good morning", "Morning!")
+
+    Args:
+        args (:obj:`str`): Command arguments.
+
+    Returns:
+        :obj:`tuple`\\[:obj:`str`, :obj:`str`]: The keyword and the text
+        after it, either of which may be empty.
+    """
+    args = args.strip()
+
+    if args[:1] in ('"', "'"):
+        end: int = args.find(args[0], 1)
+        if end != -1:
+            return args[1:end].strip(), args[end + 1:].strip()
+
+    keyword, _, rest = args.partition(" ")
+    return keyword, rest.strip()
+
+
+@Client.on_message(filters.command("filter", constants.COMMAND_PREFIXES))
+async def command_filter(client: Client, message: Message) -> None:
+    """Adds a filter to the current chat.
+
+    Send `/filter <keyword> <reply>` in the chat, or send
+    `/filter <keyword>` as a reply to a message, to have Korone reply
+    whenever the keyword is mentioned. Keywords with spaces must be
+    quoted. Only administrators of the chat may add filters.
+    """
+    if message.chat is None or message.chat.id is None:
+        return
+
+    language_code: str = get_language_code(message)
+
+    if not await isadmin(client, message):
+        await reply(
+            message,
+            StringResource.get(
+                language_code, "strings/filter/message/failure/notadmin"
+            ),
+        )
+        return
+
+    keyword, data = split_keyword(get_command_arg(message))
+
+    file_id: str | None = None
+    filter_type: str = "text"
+
+    source: Message | None = message.reply_to_message
+    if source is not None:
+        data = data or source.text or source.caption or ""
+
+        file_id = MEDIA.register(client.me.id, source)  # type: ignore
+        if file_id is not None:
+            filter_type = source.media.value  # type: ignore
+
+    if not keyword or (not data and file_id is None):
+        await reply(
+            message,
+            StringResource.get(
+                language_code, "strings/filter/message/failure/empty"
+            ),
+        )
+        return
+
+    add_filter(
+        message.chat.id,
+        ChatFilter(keyword.casefold(), data, file_id, filter_type),
+    )
+
+    await reply(
+        message,
+        StringResource.get(
+            language_code, "strings/filter/message/success"
+        ).format(escape(keyword)),
+    )
+
+
+@Client.on_message(filters.command("stop", constants.COMMAND_PREFIXES))
+async def command_stop(client: Client, message: Message) -> None:
+    """Removes a filter from the current chat.
+
+    Send `/stop <keyword>` in the chat to remove a filter. Only
+    administrators of the chat may remove filters.
+    """
+    if message.chat is None or message.chat.id is None:
+        return
+
+    language_code: str = get_language_code(message)
+
+    if not await isadmin(client, message):
+        await reply(
+            message,
+            StringResource.get(
+                language_code, "strings/stop/message/failure/notadmin"
+            ),
+        )
+        return
+
+    keyword, _ = split_keyword(get_command_arg(message))
+
+    if not remove_filter(message.chat.id, keyword):
+        await reply(
+            message,
+            StringResource.get(
+                language_code, "strings/stop/message/failure/invalidfilter"
+            ).format(escape(keyword)),
+        )
+        return
+
+    await reply(
+        message,
+        StringResource.get(
+            language_code, "strings/stop/message/success"
+        ).format(escape(keyword)),
+    )
+
+
+@Client.on_message(filters.command("filters", constants.COMMAND_PREFIXES))
+async def command_filters(_, message: Message) -> None:
+    """Lists the filters of the current chat.
+
+    Send `/filters` in the chat to get the list, or `/filters <words>` to
+    search the keywords and replies of the filters for those words.
+    """
+    if message.chat is None or message.chat.id is None:
+        return
+
+    language_code: str = get_language_code(message)
+    text: str = get_command_arg(message).strip()
+
+    if text:
+        await reply_search(message, language_code, text)
+        return
+
+    keywords: list[str] = sorted(automaton_of(message.chat.id))
+
+    if not keywords:
+        await reply(
+            message,
+            StringResource.get(language_code, "strings/filters/message/empty"),
+        )
+        return
+
+    lines: list[str] = [
+        StringResource.get(language_code, "strings/filters/message/list")
+    ]
+    lines.extend(f"- <code>{escape(keyword)}</code>" for keyword in keywords)
+
+    await reply(message, "\n".join(lines))
+
+
+async def reply_search(message: Message, language_code: str, text: str):
+    """Replies with the filters of the chat matching the words."""
+    keywords: list[str] = search_filters(message.chat.id, text)
+
+    if not keywords:
+        await reply(
+            message,
+            StringResource.get(
+                language_code, "strings/filters/message/noresults"
+            ).format(escape(text)),
+        )
+        return
+
+    lines: list[str] = [
+        StringResource.get(
+            language_code, "strings/filters/message/results"
+        ).format(escape(text))
+    ]
+    lines.extend(f"- <code>{escape(keyword)}</code>" for keyword in keywords)
+
+    await reply(message, "\n".join(lines))
+
+
+def hasfilters(message: Message) -> bool:
+    """Checks whether a message comes from a chat which has filters.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Message.
+
+    Returns:
+        :obj:`bool`: :obj:`True` if the chat has any filter,
+        :obj:`False` otherwise.
+    """
+    if message.chat is None or message.chat.id is None:
+        return False
+
+    return message.chat.id in chats_with_filters()
+
+
+@Client.on_message(kinds(Kind.TEXT | Kind.MEDIA, hasfilters), group=2)
+async def handle_filters(client: Client, message: Message) -> None:
+    """Replies to the first keyword found in a message."""
+    text: str | None = message.text or message.caption
+
+    if not text:
+        return
+
+    found = automaton_of(message.chat.id).find(text)
+
+    if found is None:
+        return
+
+    _, chat_filter = found
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Filter %s matched", chat_filter.keyword)
+
+    if chat_filter.file_id is None:
+        await reply(message, chat_filter.data)
+        return
+
+    bot_id: int = client.me.id  # type: ignore
+
+    file_id: str | None = MEDIA.resolve(bot_id, chat_filter.file_id)
+
+    if file_id is None:
+        if MEDIA.known(chat_filter.file_id):
+            # another bot saved the filter, so this one cannot send it
+            log.warning(
+                "No file_id of %s for bot %d", chat_filter.file_id, bot_id
+            )
+            if chat_filter.data:
+                await reply(message, chat_filter.data)
+            return
+
+        # filters saved before the registry existed hold the file_id itself
+        file_id = chat_filter.file_id
+
+    sent: Message = await SCHEDULER.send(
+        message.chat.id,
+        lambda: message.reply_cached_media(
+            file_id, caption=chat_filter.data  # type: ignore
+        ),
+        bot_id,
+    )
+
+    # Telegram may hand out a newer file_id for the same file
+    MEDIA.register(bot_id, sent)
@@ -0,0 +1,113 @@
+"""
+First stage filter for incoming messages.
+
+Pyrogram checks every message against every handler group, even in busy
+groups where nearly all messages are plain chatter no handler cares
+about. The :class:`Gate` runs before any other group: it classifies each
+message once, as described in :mod:`korone.utils.kinds`, and, when no
+handler registered afterwards could accept that kind of message, stops
+the propagation right away. Handlers which declared a check with
+:func:`~korone.utils.kinds.kinds` only count once the message passes it,
+so messages from chats such a handler does not care about are dropped
+as well.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import logging
+from typing import Callable
+
+from pyrogram import Client, StopPropagation
+from pyrogram.handlers import MessageHandler, RawUpdateHandler
+from pyrogram.types import Message
+
+from korone.metrics import Metrics
+from korone.utils.kinds import Kind, accepted_by, check_of, kind_of
+
+log = logging.getLogger(__name__)
+
+
+class Gate:
+    """Drops the messages which no handler of a client could accept.
+
+    Args:
+        client (:obj:`~pyrogram.Client`): Client whose handlers are
+            checked.
+        group (:obj:`int`): Group the gate is added to. Only the groups
+            after it are checked.
+    """
+
+    def __init__(self, client: Client, group: int):
+        self.client: Client = client
+        self.group: int = group
+        self._accepted: Kind = Kind.ALL
+        self._checked: list[tuple[Kind, Callable[[Message], bool]]] = []
+        self._handlers: int = -1
+
+    def accepted(self) -> Kind:
+        """Returns the kinds accepted by the handlers after the gate.
+
+        Handlers with a check are left out, and kept along with their
+        check instead. The result is cached until handlers are added or
+        removed.
+
+        Returns:
+            :obj:`Kind`: Accepted kinds.
+        """
+        groups: dict[int, list] = self.client.dispatcher.groups
+        count: int = sum(map(len, groups.values()))
+
+        if count == self._handlers:
+            return self._accepted
+
+        accepted: Kind = Kind.NONE
+        checked: list[tuple[Kind, Callable[[Message], bool]]] = []
+
+        for group, handlers in groups.items():
+            if group <= self.group:
+                continue
+
+            for handler in handlers:
+                # raw handlers run for every update, messages included
+                if isinstance(handler, RawUpdateHandler):
+                    accepted = Kind.ALL
+                elif isinstance(handler, MessageHandler):
+                    kind: Kind = accepted_by(handler.filters)
+                    check = check_of(handler.filters)
+
+                    if check is None:
+                        accepted |= kind
+                    else:
+                        checked.append((kind, check))
+
+        log.debug("Gate accepts %s and %d checked", accepted, len(checked))
+
+        self._accepted, self._checked = accepted, checked
+        self._handlers = count
+        return accepted
+
+    async def handler(self, client: Client, message: Message) -> None:
+        """Message handler which stops the messages nobody handles."""
+        kind: Kind = kind_of(message, client)
+
+        # media captioned with a command is both, and either handler
+        # kind may take it
+        if kind & self.accepted():
+            return
+
+        for accepted, check in self._checked:
+            if kind & accepted and check(message):
+                return
+
+        if Metrics.enabled:
+            kind_name: str = str(kind.name).lower()
+            Metrics.increment(
+                f'korone_gate_dropped_total{{kind="{kind_name}"}}'
+            )
+
+        raise StopPropagation
+
+    def install(self) -> None:
+        """Adds the gate to the client."""
+        self.client.add_handler(MessageHandler(self.handler), self.group)
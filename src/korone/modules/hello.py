@@ -10,30 +10,44 @@ import logging
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
+from korone import constants
 from korone.locale import StringResource
+from korone.utils.scheduler import reply
 from korone.utils.misc import get_language_code
 
 log = logging.getLogger(__name__)
 
 
-@Client.on_message(group=1)
-async def catchall(_a: Client, _b: Message) -> None:
-    log.debug("New message!")
+# a handler accepting every message would keep the gate from dropping
+# any, so this one only exists while debugging
+if log.isEnabledFor(logging.DEBUG):
 
+    @Client.on_message(group=1)
+    async def catchall(_a: Client, _b: Message) -> None:
+        log.debug("New message!")
 
-@Client.on_message(filters.command("greet") & filters.togglable)  # type: ignore
+
+@Client.on_message(
+    filters.command("greet", constants.COMMAND_PREFIXES)
+    & filters.togglable  # type: ignore
+)
 async def command_greet(_: Client, message: Message) -> None:
     language_code: str = get_language_code(message)
 
-    await message.reply(
+    await reply(
+        message,
         StringResource.get(language_code, "strings/greet/message"),
     )
 
 
-@Client.on_message(filters.command("farewell") & filters.togglable)  # type: ignore
+@Client.on_message(
+    filters.command("farewell", constants.COMMAND_PREFIXES)
+    & filters.togglable  # type: ignore
+)
 async def command_farewell(_: Client, message: Message) -> None:
     language_code: str = get_language_code(message)
 
-    await message.reply(
+    await reply(
+        message,
         StringResource.get(language_code, "strings/farewell/message"),
     )
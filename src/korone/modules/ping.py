@@ -5,21 +5,111 @@ The ping module test the Korone's latency with Telegram's servers.
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
+import asyncio
+import math
 import time
 
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
+from korone import constants
+from korone.metrics import Window
 
-@Client.on_message(filters.command("ping"))
+SAMPLES: dict[str, Window] = {
+    "arrival": Window(constants.DEFAULT_PING_WINDOW),
+    "send": Window(constants.DEFAULT_PING_WINDOW),
+    "edit": Window(constants.DEFAULT_PING_WINDOW),
+    "lag": Window(constants.DEFAULT_PING_WINDOW),
+}
+"""Latest latency samples, in milliseconds, indexed by kind."""
+
+
+async def loop_lag() -> float:
+    """Measures how long the event loop takes to resume a coroutine
+    which yields control.
+
+    Returns:
+        :obj:`float`: Event loop lag, in milliseconds.
+    """
+    then: int = time.perf_counter_ns()
+    await asyncio.sleep(0)
+    return (time.perf_counter_ns() - then) / 1e6
+
+
+def format_ms(value: float | None) -> str:
+    """Formats a latency, or ``-`` if it is not known.
+
+    Args:
+        value (:obj:`float` | :obj:`None`): Latency, in milliseconds,
+            which is :obj:`None` or NaN if it was not measured yet.
+
+    Returns:
+        :obj:`str`: Formatted latency.
+    """
+    if value is None or math.isnan(value):
+        return "-"
+
+    return f"{value:.1f}ms"
+
+
+def format_sample(kind: str, value: float | None) -> str:
+    """Formats the latest sample of a kind along with its percentiles.
+
+    Args:
+        kind (:obj:`str`): Sample kind, as in :obj:`SAMPLES`.
+        value (:obj:`float` | :obj:`None`): Latest sample, in
+            milliseconds, or :obj:`None` if it was not measured yet.
+
+    Returns:
+        :obj:`str`: Formatted sample.
+    """
+    window: Window = SAMPLES[kind]
+
+    # windows without samples yet have NaN percentiles
+    return (
+        f"{kind:<8}{format_ms(value):>10}"
+        f"  p50 {format_ms(window.percentile(50))}"
+        f"  p99 {format_ms(window.percentile(99))}"
+    )
+
+
+@Client.on_message(filters.command("ping", constants.COMMAND_PREFIXES))
 async def command_ping(_, message: Message) -> None:
     """Checks the latency between Korone and Telegram's servers.
 
     Send `/ping` in the chat to get the latency.
+
+    The reply shows how long the update took to arrive (with Telegram's
+    one second resolution), how long sending the reply took, the event
+    loop lag and, since a message cannot hold the time it took to edit
+    itself, the percentiles of the previous edits.
     """
 
-    then = time.time()
+    lag: float = await loop_lag()
+    SAMPLES["lag"].add(lag)
+
+    arrival: float | None = None
+    if message.date is not None:
+        arrival = max(time.time() - message.date.timestamp(), 0) * 1e3
+        SAMPLES["arrival"].add(arrival)
+
+    then: int = time.perf_counter_ns()
     msg = await message.reply("Pong!")
-    now = time.time()
+    send: float = (time.perf_counter_ns() - then) / 1e6
+    SAMPLES["send"].add(send)
+
+    lines: list[str] = [
+        format_sample("arrival", arrival),
+        format_sample("send", send),
+        format_sample("edit", None),
+        format_sample("lag", lag),
+    ]
+
+    text: str = "\n".join(lines)
+    count: int = len(SAMPLES["send"])
 
-    await msg.edit_text(f"Pong! <code>{(now - then) * 1e3}ms</code>")
+    then = time.perf_counter_ns()
+    await msg.edit_text(
+        f"Pong! <code>{count} samples</code>\n<pre>{text}</pre>"
+    )
+    SAMPLES["edit"].add((time.perf_counter_ns() - then) / 1e6)
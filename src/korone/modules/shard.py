@@ -0,0 +1,314 @@
+"""
+Spreads update handling across processes.
+
+In sharded mode, the main process only receives updates from Telegram
+and forwards them to worker processes, which load every module and run
+the handlers. Updates are partitioned by chat, so each chat is always
+handled by the same process: updates of a chat keep their order, and
+per chat state, such as the command toggles in
+:obj:`~korone.modules.core.COMMANDS`, only ever lives in one process.
+Whatever state is needed at startup is read from the database, which
+runs in WAL mode and thus allows concurrent readers.
+
+Updates cross the process boundary in Telegram's own binary
+serialization, which every raw Pyrogram object supports.
+
+Each worker sends its replies through its own
+:obj:`~korone.utils.scheduler.SCHEDULER`, whose send rate is divided by
+the amount of shards, so together they never exceed the rate Telegram
+allows the bot. Since a chat is always handled by the same worker, the
+per chat rate is kept as is.
+
+Workers shut down gracefully on ``SIGTERM`` and ``SIGINT``, as the main
+process does: they stop reading updates, wait for the running handlers
+and the queued replies, and only then exit.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import signal
+from io import BytesIO
+from multiprocessing.context import SpawnProcess
+from multiprocessing.queues import Queue
+from typing import Any
+
+from pyrogram import Client, StopPropagation, utils
+from pyrogram.raw.core import TLObject
+
+log = logging.getLogger(__name__)
+
+
+# Represents an update serialized by the main process, along with the
+# users and chats it mentions.
+# For example:
+# >>> packet: Packet = (update.write(), [user.write()], [])
+Packet = tuple[bytes, list[bytes], list[bytes]]
+
+
+def shard_of(update: Any, shards: int) -> int:
+    """Returns the shard an update belongs to.
+
+    Updates which do not refer to any chat all go to the first shard.
+
+    Args:
+        update (:obj:`~typing.Any`): Raw Pyrogram update.
+        shards (:obj:`int`): Amount of shards.
+
+    Returns:
+        :obj:`int`: Shard index.
+    """
+    peer: Any = getattr(update, "peer", None)
+
+    message: Any = getattr(update, "message", None)
+    if message is not None and hasattr(message, "peer_id"):
+        peer = message.peer_id
+
+    peer_id: int | None = utils.get_raw_peer_id(peer)
+
+    if peer_id is None and isinstance(getattr(update, "user_id", None), int):
+        peer_id = update.user_id
+
+    return (peer_id or 0) % shards
+
+
+def pack(update: Any, users: dict, chats: dict) -> Packet:
+    """Serializes an update so it can be sent to another process.
+
+    Args:
+        update (:obj:`~typing.Any`): Raw Pyrogram update.
+        users (:obj:`dict`): Users mentioned by the update.
+        chats (:obj:`dict`): Chats mentioned by the update.
+
+    Returns:
+        :obj:`Packet`: Serialized update.
+    """
+    return (
+        update.write(),
+        [user.write() for user in users.values()],
+        [chat.write() for chat in chats.values()],
+    )
+
+
+def unpack(packet: Packet) -> tuple[Any, dict, dict]:
+    """Deserializes an update packed by :func:`pack`.
+
+    Args:
+        packet (:obj:`Packet`): Serialized update.
+
+    Returns:
+        :obj:`tuple`: The update, its users and its chats, in the same
+        format Pyrogram's dispatcher uses.
+    """
+    data, users, chats = packet
+
+    def read(blob: bytes) -> Any:
+        return TLObject.read(BytesIO(blob))
+
+    return (
+        read(data),
+        {user.id: user for user in map(read, users)},
+        {chat.id: chat for chat in map(read, chats)},
+    )
+
+
+class ShardPool:
+    """Worker processes running the modules' handlers.
+
+    Args:
+        parameters (:obj:`~korone.modules.AppParameters`): Parameters of
+            the main client, reused by the workers.
+        shards (:obj:`int`): Amount of worker processes.
+        cfgpath (:obj:`str`): Path to the configuration file.
+        dbpath (:obj:`str`): Path to the database file.
+    """
+
+    def __init__(
+        self, parameters: Any, shards: int, cfgpath: str, dbpath: str
+    ):
+        self.parameters = parameters
+        self.shards: int = shards
+        self.cfgpath: str = cfgpath
+        self.dbpath: str = dbpath
+
+        self._context = multiprocessing.get_context("spawn")
+        self._queues: list[Queue] = []
+        self._processes: list[SpawnProcess] = []
+
+    def start(self) -> None:
+        """Spawns the worker processes."""
+        level: int = logging.getLogger().getEffectiveLevel()
+
+        for index in range(self.shards):
+            queue: Queue = self._context.Queue()
+            process: SpawnProcess = self._context.Process(
+                target=serve,
+                args=(
+                    self.parameters,
+                    index,
+                    queue,
+                    self.cfgpath,
+                    self.dbpath,
+                    level,
+                ),
+                name=f"korone-shard{index}",
+                daemon=True,
+            )
+            process.start()
+
+            self._queues.append(queue)
+            self._processes.append(process)
+
+        log.info("Started %d shards", self.shards)
+
+    def forward(self, update: Any, users: dict, chats: dict) -> None:
+        """Sends an update to the shard owning its chat.
+
+        Args:
+            update (:obj:`~typing.Any`): Raw Pyrogram update.
+            users (:obj:`dict`): Users mentioned by the update.
+            chats (:obj:`dict`): Chats mentioned by the update.
+        """
+        index: int = shard_of(update, self.shards)
+        self._queues[index].put_nowait(pack(update, users, chats))
+
+    async def handler(self, _, update: Any, users: dict, chats: dict):
+        """Raw update handler which forwards every update."""
+        self.forward(update, users, chats)
+        raise StopPropagation
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Asks every worker to finish and waits for them.
+
+        Args:
+            timeout (:obj:`float`, *optional*): Seconds to wait for each
+                worker before killing it. Defaults to enough time for the
+                worker to drain its handlers and then its replies.
+        """
+        if timeout is None:
+            timeout = 2 * self.parameters.shutdown_timeout + 10.0
+
+        for queue in self._queues:
+            queue.put_nowait(None)
+
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                log.warning("Shard %s did not stop, killing it", process.name)
+                process.kill()
+
+        self._queues.clear()
+        self._processes.clear()
+
+
+def serve(
+    parameters: Any,
+    index: int,
+    queue: Queue,
+    cfgpath: str,
+    dbpath: str,
+    level: int,
+) -> None:
+    """Entry point of the worker processes.
+
+    Args:
+        parameters (:obj:`~korone.modules.AppParameters`): Parameters of
+            the main client.
+        index (:obj:`int`): Shard index.
+        queue (:obj:`~multiprocessing.Queue`): Queue the updates for this
+            shard arrive on.
+        cfgpath (:obj:`str`): Path to the configuration file.
+        dbpath (:obj:`str`): Path to the database file.
+        level (:obj:`int`): Logging level.
+    """
+    # pylint: disable=import-outside-toplevel
+    from korone import config, logger
+    from korone.database import Database
+    from korone.metrics import Metrics
+    from korone.modules import App
+    from korone.modules.shutdown import COORDINATOR
+    from korone.utils.scheduler import SCHEDULER
+
+    logger.setup(level)
+    config.init(cfgpath)
+    Metrics.enabled = config.getbool("metrics", "ENABLED")
+
+    Database.connect(dbpath)
+
+    # the shards share the bot's global send rate
+    SCHEDULER.rate /= max(parameters.shards, 1)
+
+    app: App = App(
+        dataclasses.replace(
+            parameters,
+            name=f"{parameters.name}-shard{index}",
+            no_updates=True,
+            shards=0,
+        )
+    )
+    app.setup()
+
+    async def run(client: Client) -> None:
+        await client.start()
+
+        # no_updates keeps this client from receiving updates of its
+        # own, but it also keeps Pyrogram from starting its handlers
+        dispatcher = client.dispatcher
+        for _ in range(client.workers):
+            dispatcher.locks_list.append(asyncio.Lock())
+            dispatcher.handler_worker_tasks.append(
+                dispatcher.loop.create_task(
+                    dispatcher.handler_worker(dispatcher.locks_list[-1])
+                )
+            )
+
+        loop = asyncio.get_running_loop()
+
+        def stop() -> None:
+            # wakes the read loop up, which stops on the first None
+            queue.put_nowait(None)
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop)
+
+        while True:
+            packet: Packet | None = await loop.run_in_executor(None, queue.get)
+
+            if packet is None:
+                break
+
+            update, users, chats = unpack(packet)
+
+            # peers must be known to reply to them
+            await client.fetch_peers(list(users.values()))
+            await client.fetch_peers(list(chats.values()))
+
+            dispatcher.updates_queue.put_nowait((update, users, chats))
+
+        log.info("Shard %d shutting down", index)
+
+        # updates still queued are dropped once draining begins
+        await COORDINATOR.drain(parameters.shutdown_timeout)
+        await SCHEDULER.drain(parameters.shutdown_timeout)
+
+        for _ in dispatcher.handler_worker_tasks:
+            dispatcher.updates_queue.put_nowait(None)
+
+        # handlers which did not finish in time are cancelled
+        _, pending = await asyncio.wait(
+            dispatcher.handler_worker_tasks, timeout=1.0
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        await client.stop()
+
+    try:
+        app.app.run(run(app.app))  # type: ignore
+    finally:
+        Database.close()
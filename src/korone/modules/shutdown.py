@@ -0,0 +1,91 @@
+"""
+Coordinates a graceful shutdown.
+
+Every handler registered by :func:`~korone.modules.core.register_command`
+is tracked, so that, once shutdown begins, new updates are dropped while
+the handlers already running get the chance to finish their work.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import functools
+import inspect
+import logging
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
+
+
+class ShutdownCoordinator:
+    """Tracks running handlers and drains them on shutdown."""
+
+    def __init__(self):
+        self.accepting: bool = True
+        """:obj:`True` while new updates are handled, otherwise
+        :obj:`False`."""
+
+        self.inflight: int = 0
+        """Amount of handlers currently running."""
+
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+
+    def track(self, callback: Callable) -> Callable:
+        """Wraps a Pyrogram handler callback so it is tracked.
+
+        Callbacks which are not coroutine functions are returned
+        untouched, since Pyrogram runs them on its executor.
+
+        Args:
+            callback (:obj:`~typing.Callable`): Handler callback.
+
+        Returns:
+            :obj:`~typing.Callable`: The wrapped callback.
+        """
+        if not inspect.iscoroutinefunction(callback):
+            return callback
+
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs) -> Any:
+            if not self.accepting:
+                return None
+
+            self.inflight += 1
+            self._idle.clear()
+
+            try:
+                return await callback(*args, **kwargs)
+            finally:
+                self.inflight -= 1
+                if self.inflight == 0:
+                    self._idle.set()
+
+        return wrapper
+
+    async def drain(self, timeout: float) -> bool:
+        """Stops accepting updates and waits for the running handlers.
+
+        Args:
+            timeout (:obj:`float`): Seconds to wait for the handlers.
+
+        Returns:
+            :obj:`bool`: :obj:`True` if every handler finished in time,
+            otherwise :obj:`False`.
+        """
+        self.accepting = False
+
+        log.info("Draining %d running handler(s)", self.inflight)
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("%d handler(s) did not finish in time", self.inflight)
+            return False
+
+        return True
+
+
+COORDINATOR: ShutdownCoordinator = ShutdownCoordinator()
+"""Coordinator shared by all modules."""
@@ -0,0 +1,86 @@
+"""
+The stats module exposes Korone's runtime metrics to its administrators.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from pyrogram import Client, filters
+from pyrogram.types import Message
+
+from korone import config, constants
+from korone.database import Database
+from korone.database.media import MEDIA
+from korone.locale import StringResource
+from korone.metrics import Metrics
+from korone.modules.watchdog import WATCHDOG
+from korone.utils.misc import get_language_code, split_html
+from korone.utils.scheduler import SCHEDULER, reply
+
+
+def get_admins() -> set[int]:
+    """Returns the users allowed to read the metrics, as configured by
+    the ``ADMINS`` option in the ``metrics`` section.
+
+    Returns:
+        :obj:`set`\\[:obj:`int`]: Administrators' user IDs.
+    """
+    admins: str = config.get("metrics", "ADMINS")
+
+    return {int(uid) for uid in admins.split(",") if uid.strip().isdigit()}
+
+
+async def isadmin(_, __, update: Message) -> bool:
+    """Filter to handle only messages sent by metrics administrators.
+
+    Args:
+        update (Message): update
+
+    Returns:
+        bool: True if the sender is an administrator, False otherwise.
+    """
+    if update.from_user is None:
+        return False
+
+    return update.from_user.id in get_admins()
+
+
+@Client.on_message(
+    filters.command("stats", constants.COMMAND_PREFIXES)
+    & filters.create(isadmin)
+)
+async def command_stats(_, message: Message) -> None:
+    """Shows the collected metrics in the Prometheus text format.
+
+    Send `/stats` in the chat to get the metrics, which are split into
+    several messages if they do not fit in one.
+    """
+    if not Metrics.enabled:
+        await reply(
+            message,
+            StringResource.get(
+                get_language_code(message), "strings/stats/message/disabled"
+            ),
+        )
+        return
+
+    for key, value in SCHEDULER.stats().items():
+        Metrics.gauges[f"korone_send_{key}"] = value
+
+    for key, value in MEDIA.stats().items():
+        Metrics.gauges[f"korone_media_{key}"] = value
+
+    if Database.cache is not None:
+        for key, value in Database.cache.stats().items():
+            Metrics.gauges[f"korone_query_cache_{key}"] = value
+
+    Metrics.gauges["korone_loop_lag_seconds"] = WATCHDOG.lag
+    Metrics.gauges["korone_loop_max_lag_seconds"] = WATCHDOG.max_lag
+
+    for name, count in WATCHDOG.incidents.items():
+        Metrics.gauges[f'korone_loop_blocked_total{{handler="{name}"}}'] = count
+
+    limit: int = constants.MESSAGE_LIMIT - len("<pre></pre>")
+
+    for part in split_html(Metrics.render(), limit):
+        await reply(message, f"<pre>{part}</pre>")
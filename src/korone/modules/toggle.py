@@ -8,14 +8,16 @@ The toggle module enables and disables commands on a per chat basis.
 from pyrogram import Client, filters
 from pyrogram.types import Message
 
+from korone import constants
 from korone.modules.hello import get_language_code
 from korone.modules.core import toggle
+from korone.utils.scheduler import reply
 from korone.database.manager import Command
 from korone.locale import StringResource
 from korone.utils.misc import get_command_arg
 
 
-@Client.on_message(filters.command("disable"))
+@Client.on_message(filters.command("disable", constants.COMMAND_PREFIXES))
 async def command_disable(_, message: Message) -> None:
     """Disable a command in the current chat.
 
@@ -28,7 +30,8 @@ async def command_disable(_, message: Message) -> None:
     language_code: str = get_language_code(message)
 
     if command == "":
-        await message.reply(
+        await reply(
+            message,
             StringResource.get(
                 language_code, "strings/enable/message/failure/emptycommand"
             )
@@ -38,19 +41,21 @@ async def command_disable(_, message: Message) -> None:
     try:
         toggle(Command(command=command, chat_id=message.chat.id, state=False))
     except KeyError:
-        await message.reply(
+        await reply(
+            message,
             StringResource.get(
                 language_code, "strings/disable/message/failure/invalidcommand"
             ).format(command)
         )
         return
 
-    await message.reply(
+    await reply(
+        message,
         StringResource.get(language_code, "strings/disable/message/success")
     )
 
 
-@Client.on_message(filters.command("enable"))
+@Client.on_message(filters.command("enable", constants.COMMAND_PREFIXES))
 async def command_enable(_, message: Message) -> None:
     """Enable a command in the current chat.
 
@@ -63,7 +68,8 @@ async def command_enable(_, message: Message) -> None:
     language_code: str = get_language_code(message)
 
     if command == "":
-        await message.reply(
+        await reply(
+            message,
             StringResource.get(
                 language_code, "strings/enable/message/failure/emptycommand"
             )
@@ -73,13 +79,15 @@ async def command_enable(_, message: Message) -> None:
     try:
         toggle(Command(command=command, chat_id=message.chat.id, state=True))
     except KeyError:
-        await message.reply(
+        await reply(
+            message,
             StringResource.get(
                 language_code, "strings/enable/message/failure/invalidcommand"
             ).format(command)
         )
         return
 
-    await message.reply(
+    await reply(
+        message,
         StringResource.get(language_code, "strings/enable/message/success")
     )
@@ -0,0 +1,164 @@
+"""
+Event loop watchdog.
+
+A coroutine measures how late the event loop wakes it up, while a
+separate thread checks that the coroutine keeps running. Whenever the
+loop is stalled for longer than the threshold, the thread logs the stack
+of the loop thread, so the blocking call and the handler which made it
+show up in the logs.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from types import CodeType, FrameType
+from typing import Callable
+
+from korone import constants
+
+log = logging.getLogger(__name__)
+
+
+class Watchdog:
+    """Detects event loop stalls and blames them on handlers.
+
+    Args:
+        threshold (:obj:`float`, *optional*): Seconds the loop may be
+            blocked before an incident is reported. Defaults to
+            :obj:`korone.constants.DEFAULT_WATCHDOG_THRESHOLD`.
+        interval (:obj:`float`, *optional*): Seconds between loop lag
+            measurements. Defaults to
+            :obj:`korone.constants.DEFAULT_WATCHDOG_INTERVAL`.
+    """
+
+    def __init__(
+        self,
+        threshold: float = constants.DEFAULT_WATCHDOG_THRESHOLD,
+        interval: float = constants.DEFAULT_WATCHDOG_INTERVAL,
+    ):
+        self.threshold: float = threshold
+        self.interval: float = interval
+
+        self.lag: float = 0.0
+        """Latest event loop lag, in seconds."""
+
+        self.max_lag: float = 0.0
+        """Highest event loop lag seen, in seconds."""
+
+        self.incidents: dict[str, int] = {}
+        """Amount of stalls, indexed by the name of the blamed handler."""
+
+        self._handlers: dict[CodeType, str] = {}
+        self._heartbeat: float = 0.0
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped: threading.Event = threading.Event()
+
+    def register(self, callback: Callable, name: str) -> None:
+        """Registers a handler callback, so stalls happening inside it are
+        blamed on the given name.
+
+        Args:
+            callback (:obj:`~typing.Callable`): Handler callback.
+            name (:obj:`str`): Handler name.
+        """
+        code: CodeType | None = getattr(callback, "__code__", None)
+
+        if code is not None:
+            self._handlers[code] = name
+
+    def start(self) -> None:
+        """Starts watching the running event loop.
+
+        Raises:
+            RuntimeError: If the watchdog is already running or if there
+                is no running event loop.
+        """
+        if self._task is not None:
+            raise RuntimeError("Watchdog is already running.")
+
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(
+            target=self._watch, name="korone-watchdog", daemon=True
+        )
+        self._thread.start()
+
+        log.info("Watchdog started with a %ss threshold", self.threshold)
+
+    def stop(self) -> None:
+        """Stops watching the event loop."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        self._task = None
+
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _beat(self) -> None:
+        while True:
+            then: float = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+            self._heartbeat = time.monotonic()
+            self.lag = max(self._heartbeat - then - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+
+    def _watch(self) -> None:
+        reported: float = 0.0
+
+        while not self._stopped.wait(self.interval / 2):
+            heartbeat: float = self._heartbeat
+            stalled: float = time.monotonic() - heartbeat - self.interval
+
+            # reports each stall only once
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+
+            reported = heartbeat
+            self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        # pylint: disable=protected-access
+        frame: FrameType | None = sys._current_frames().get(
+            self._loop_thread  # type: ignore
+        )
+
+        if frame is None:
+            return
+
+        name: str = self._blame(frame)
+        self.incidents[name] = self.incidents.get(name, 0) + 1
+
+        log.warning(
+            "Event loop blocked for %.3fs by %s:\n%s",
+            stalled,
+            name,
+            "".join(traceback.format_stack(frame)),
+        )
+
+    def _blame(self, frame: FrameType | None) -> str:
+        while frame is not None:
+            if frame.f_code in self._handlers:
+                return self._handlers[frame.f_code]
+            frame = frame.f_back
+
+        return "unknown"
+
+
+WATCHDOG: Watchdog = Watchdog()
+"""Watchdog shared by all modules."""
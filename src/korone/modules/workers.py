@@ -0,0 +1,237 @@
+"""
+Sizes the concurrency used to handle updates.
+
+Pyrogram handles updates with a fixed amount of worker tasks, each one
+holding on to an update until its handler returns. In ``auto`` mode, the
+initial amount is derived from the CPU count and, once handler latencies
+are known, the :class:`WorkerTuner` grows the pool following Little's
+law: the workers needed equal the update rate times the mean latency.
+
+Blocking work, such as file or CPU heavy operations, should not run on
+those workers at all, but on the bounded :class:`BlockingExecutor`.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import functools
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from pyrogram import Client
+
+from korone import constants
+from korone.metrics import Metrics
+
+log = logging.getLogger(__name__)
+
+
+def auto_workers(cpus: int | None = None) -> int:
+    """Returns the initial amount of workers for the ``auto`` mode.
+
+    Args:
+        cpus (:obj:`int`, *optional*): CPU count. Defaults to
+            :func:`os.cpu_count`.
+
+    Returns:
+        :obj:`int`: Amount of workers.
+    """
+    if cpus is None:
+        cpus = os.cpu_count() or 1
+
+    return max(cpus * constants.DEFAULT_WORKERS_PER_CPU, 1)
+
+
+def resolve_workers(value: str) -> int:
+    """Converts the ``WORKERS`` option to an amount of workers.
+
+    Args:
+        value (:obj:`str`): Either a positive number or ``auto``.
+
+    Returns:
+        :obj:`int`: Amount of workers. Invalid values fall back to
+        :obj:`korone.constants.DEFAULT_WORKERS`.
+    """
+    value = value.strip().lower()
+
+    if value == "auto":
+        return auto_workers()
+
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+
+    if value:
+        log.warning("Invalid amount of workers: %s", value)
+
+    return constants.DEFAULT_WORKERS
+
+
+class WorkerTuner:
+    """Grows Pyrogram's handler workers as handler latency is observed.
+
+    The tuner relies on the handler latencies recorded by
+    :class:`~korone.metrics.Metrics`, thus it does nothing while metrics
+    are disabled. Workers are only ever added, never removed.
+
+    Args:
+        app (:obj:`~pyrogram.Client`): Started Pyrogram Client.
+        max_workers (:obj:`int`): Upper bound on the amount of workers.
+        interval (:obj:`float`, *optional*): Seconds between adjustments.
+            Defaults to :obj:`korone.constants.DEFAULT_TUNER_INTERVAL`.
+    """
+
+    headroom: float = 1.5
+    """Factor applied to the estimated concurrency to absorb bursts."""
+
+    def __init__(
+        self,
+        app: Client,
+        max_workers: int,
+        interval: float = constants.DEFAULT_TUNER_INTERVAL,
+    ):
+        self.app: Client = app
+        self.max_workers: int = max_workers
+        self.interval: float = interval
+        self._task: asyncio.Task | None = None
+        self._count: int = 0
+        self._total: float = 0.0
+
+    def _observe(self) -> tuple[int, float]:
+        count: int = sum(hist.count for hist in Metrics.handlers.values())
+        total: float = sum(hist.total for hist in Metrics.handlers.values())
+
+        delta: tuple[int, float] = (count - self._count, total - self._total)
+        self._count, self._total = count, total
+
+        return delta
+
+    def target(self, count: int, total: float) -> int:
+        """Estimates the amount of workers needed.
+
+        Args:
+            count (:obj:`int`): Handler calls during the last interval.
+            total (:obj:`float`): Seconds spent on those calls.
+
+        Returns:
+            :obj:`int`: Amount of workers, bounded by ``max_workers``.
+        """
+        if count == 0:
+            return 0
+
+        rate: float = count / self.interval
+        latency: float = total / count
+        needed: int = math.ceil(rate * latency * self.headroom)
+
+        return min(needed, self.max_workers)
+
+    def grow(self, workers: int) -> None:
+        """Starts handler workers until there are at least as many as
+        requested.
+
+        Args:
+            workers (:obj:`int`): Amount of workers wanted.
+        """
+        dispatcher = self.app.dispatcher
+
+        while self.app.workers < workers:
+            dispatcher.locks_list.append(asyncio.Lock())
+            dispatcher.handler_worker_tasks.append(
+                dispatcher.loop.create_task(
+                    dispatcher.handler_worker(dispatcher.locks_list[-1])
+                )
+            )
+            # Pyrogram relies on it to stop every worker
+            self.app.workers += 1
+
+    async def _tune(self) -> None:
+        self._observe()
+
+        while True:
+            await asyncio.sleep(self.interval)
+
+            target: int = self.target(*self._observe())
+
+            if target > self.app.workers:
+                log.info(
+                    "Growing handler workers from %d to %d",
+                    self.app.workers,
+                    target,
+                )
+                self.grow(target)
+
+    def start(self) -> None:
+        """Starts tuning in the background."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._tune())
+
+    def stop(self) -> None:
+        """Stops tuning."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class BlockingExecutor:
+    """Bounded thread pool for blocking work.
+
+    At most ``max_workers`` calls run at once; further callers wait for
+    a free thread instead of piling up on an unbounded queue.
+
+    Example:
+        .. code-block:: python
+
+            >>> content = await EXECUTOR.run(yaml.safe_load, stream)
+
+    Args:
+        max_workers (:obj:`int`, *optional*): Amount of threads. Defaults
+            to :obj:`korone.constants.DEFAULT_BLOCKING_WORKERS`.
+    """
+
+    def __init__(self, max_workers: int = constants.DEFAULT_BLOCKING_WORKERS):
+        self.max_workers: int = max_workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def resize(self, max_workers: int) -> None:
+        """Changes the amount of threads, shutting the current pool down.
+
+        Args:
+            max_workers (:obj:`int`): Amount of threads.
+        """
+        self.shutdown()
+        self.max_workers = max(max_workers, 1)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Runs a blocking function on the pool.
+
+        Args:
+            func (:obj:`~typing.Callable`): Blocking function.
+
+        Returns:
+            :obj:`~typing.Any`: Whatever the function returned.
+        """
+        if self._pool is None or self._slots is None:
+            self._pool = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="Blocking"
+            )
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool, functools.partial(func, *args, **kwargs)
+            )
+
+    def shutdown(self) -> None:
+        """Waits for running calls and releases the threads."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._slots = None
+
+
+EXECUTOR: BlockingExecutor = BlockingExecutor()
+"""Executor shared by all modules."""
@@ -0,0 +1,232 @@
+"""
+Module to search many keywords at once.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from collections import deque
+from typing import Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class Automaton(Generic[T]):
+    """Aho-Corasick automaton mapping case folded keywords to values.
+
+    Searching a text costs time proportional to its length plus the
+    matches found, no matter how many keywords there are.
+
+    Keywords are added to and removed from the trie in place. Since the
+    failure links of the whole trie may change with any keyword, they are
+    only recomputed, once, by the next search. Nodes left behind by
+    removed keywords are reclaimed once they outnumber the live ones.
+
+    Example:
+        .. code-block:: python
+
+            >>> automaton = Automaton()
+            >>> automaton.add("Hello", 1)
+            >>> automaton.add("lo", 2)
+            >>> list(automaton.search("hello"))
+            [(0, 'hello', 1), (3, 'lo', 2)]
+            >>> automaton.find("hello")
+            ('hello', 1)
+            >>> automaton.find("Othello!") is None
+            True
+    """
+
+    def __init__(self):
+        self._values: dict[str, T] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._keyword: list[str | None] = [None]
+        # nearest node, following the failure links, ending a keyword
+        self._output: list[int] = [0]
+        self._dirty: bool = False
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword.casefold() in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def get(self, keyword: str) -> T | None:
+        """Returns the value of a keyword.
+
+        Args:
+            keyword (:obj:`str`): Keyword.
+
+        Returns:
+            :obj:`T`, *optional*: The value, or :obj:`None` if the keyword
+            has not been added.
+        """
+        return self._values.get(keyword.casefold())
+
+    def add(self, keyword: str, value: T) -> None:
+        """Adds a keyword, replacing its value if it already exists.
+
+        Args:
+            keyword (:obj:`str`): Keyword, matched regardless of case.
+            value (:obj:`T`): Value returned along with the keyword.
+
+        Raises:
+            ValueError: If the keyword is empty.
+        """
+        keyword = keyword.casefold()
+
+        if not keyword:
+            raise ValueError("Keyword must not be empty.")
+
+        self._values[keyword] = value
+        self._insert(keyword)
+
+    def _insert(self, keyword: str) -> None:
+        node: int = 0
+
+        for char in keyword:
+            child: int | None = self._goto[node].get(char)
+
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._keyword.append(None)
+                self._output.append(0)
+
+            node = child
+
+        self._keyword[node] = keyword
+        self._dirty = True
+
+    def remove(self, keyword: str) -> bool:
+        """Removes a keyword.
+
+        Args:
+            keyword (:obj:`str`): Keyword.
+
+        Returns:
+            :obj:`bool`: :obj:`True` if the keyword was removed,
+            :obj:`False` if it had not been added.
+        """
+        keyword = keyword.casefold()
+
+        if keyword not in self._values:
+            return False
+
+        del self._values[keyword]
+
+        node: int = 0
+        for char in keyword:
+            node = self._goto[node][char]
+
+        self._keyword[node] = None
+        self._dirty = True
+
+        live: int = sum(map(len, self._values)) + 1
+        if len(self._goto) > 2 * live:
+            self._reset()
+            for each in self._values:
+                self._insert(each)
+
+        return True
+
+    def _build(self) -> None:
+        queue: deque[int] = deque()
+
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output[child] = 0
+            queue.append(child)
+
+        while queue:
+            node: int = queue.popleft()
+
+            for char, child in self._goto[node].items():
+                fail: int = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = (
+                    fail if self._keyword[fail] is not None
+                    else self._output[fail]
+                )
+                queue.append(child)
+
+        self._dirty = False
+
+    def search(self, text: str) -> Iterator[tuple[int, str, T]]:
+        """Finds every keyword in a text.
+
+        Args:
+            text (:obj:`str`): Text to search, which must already be case
+                folded.
+
+        Yields:
+            :obj:`tuple`\\[:obj:`int`, :obj:`str`, :obj:`T`]: Where each
+            match starts, the keyword and its value, ordered by where the
+            matches end, longest first.
+        """
+        if self._dirty:
+            self._build()
+
+        goto: list[dict[str, int]] = self._goto
+        fail: list[int] = self._fail
+        keywords: list[str | None] = self._keyword
+        output: list[int] = self._output
+
+        node: int = 0
+
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match: int = node if keywords[node] is not None else output[node]
+
+            while match:
+                keyword: str = keywords[match]  # type: ignore
+                yield end - len(keyword), keyword, self._values[keyword]
+                match = output[match]
+
+    def find(self, text: str) -> tuple[str, T] | None:
+        """Finds the first keyword in a text which stands as a word of its
+        own, that is, which is not part of a longer word.
+
+        Args:
+            text (:obj:`str`): Text to search.
+
+        Returns:
+            :obj:`tuple`\\[:obj:`str`, :obj:`T`], *optional*: The keyword
+            and its value, or :obj:`None` if no keyword was found.
+        """
+        if not self._values:
+            return None
+
+        text = text.casefold()
+
+        for start, keyword, value in self.search(text):
+            end: int = start + len(keyword)
+
+            # a keyword edge which is not a letter or digit, such as the
+            # one in "hi!", does not need a boundary after it
+            if start > 0 and keyword[0].isalnum():
+                if text[start - 1].isalnum():
+                    continue
+
+            if end < len(text) and keyword[-1].isalnum():
+                if text[end].isalnum():
+                    continue
+
+            return keyword, value
+
+        return None
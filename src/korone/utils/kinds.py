@@ -0,0 +1,199 @@
+"""
+Classification of incoming messages.
+
+Messages are told apart by their :class:`Kind`, which the
+:class:`~korone.modules.gate.Gate` uses to drop, before any handler runs,
+the messages no handler could accept. What each handler accepts is
+inferred from its filters. Command filters only accept commands, the
+well known Pyrogram filters map to their kind, and custom filters may
+declare the kinds they accept with :func:`kinds`. Any other filter is
+assumed to accept everything.
+
+A message is classified only once: its kind is kept on the message, so
+the gate and every :func:`kinds` filter share it.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import enum
+from typing import Any, Callable
+
+from pyrogram import Client, filters
+from pyrogram.filters import AndFilter, Filter, InvertFilter, OrFilter
+from pyrogram.types import Message
+
+from korone.utils.misc import PARSER
+
+
+class Kind(enum.Flag):
+    """Kinds of messages told apart by the gate."""
+
+    NONE = 0
+    COMMAND = enum.auto()
+    SERVICE = enum.auto()
+    MEDIA = enum.auto()
+    TEXT = enum.auto()
+    ALL = COMMAND | SERVICE | MEDIA | TEXT
+
+
+# Pyrogram's own filters whose kinds are known beforehand.
+KNOWN: dict[Filter, Kind] = {
+    filters.service: Kind.SERVICE,
+    filters.media: Kind.MEDIA,
+    filters.text: Kind.TEXT | Kind.COMMAND,
+}
+
+
+def kinds(
+    accepted: Kind, check: Callable[[Message], bool] | None = None
+) -> Filter:
+    """Filter which lets the gate know which kinds a handler accepts.
+
+    Handlers which only care about some chats may also give a cheap
+    check, which the gate runs on the messages of those kinds before
+    letting them through, so messages from any other chat are dropped
+    before any handler runs.
+
+    Example:
+        .. code-block:: python
+
+            >>> @Client.on_message(kinds(Kind.MEDIA) & filters.photo)
+
+    Args:
+        accepted (:obj:`Kind`): Kinds accepted by the handler.
+        check (:obj:`~typing.Callable`, *optional*): Function which
+            tells whether the handler may accept a message. Must not
+            block, as the gate runs it for every message of those kinds.
+
+    Returns:
+        :obj:`~pyrogram.filters.Filter`: Filter accepting only messages
+        of those kinds which pass the check.
+    """
+
+    async def func(flt, client: Client, message: Message) -> bool:
+        if kind_of(message, client) not in flt.kinds:
+            return False
+
+        return flt.check is None or flt.check(message)
+
+    # kept static, as filters.create() turns its arguments into class
+    # attributes, which would bind a plain function to the filter
+    return filters.create(
+        func,
+        "KindFilter",
+        kinds=accepted,
+        check=None if check is None else staticmethod(check),
+    )
+
+
+def accepted_by(flt: Any) -> Kind:
+    """Infers the kinds of messages a filter may accept.
+
+    Args:
+        flt (:obj:`~typing.Any`): Pyrogram filter, or :obj:`None`.
+
+    Returns:
+        :obj:`Kind`: Kinds which may pass the filter.
+    """
+    if flt is None or isinstance(flt, InvertFilter):
+        return Kind.ALL
+
+    declared: Any = getattr(flt, "kinds", None)
+    if isinstance(declared, Kind):
+        return declared
+
+    if flt in KNOWN:
+        return KNOWN[flt]
+
+    if hasattr(flt, "commands") and hasattr(flt, "prefixes"):
+        return Kind.COMMAND
+
+    if isinstance(flt, AndFilter):
+        return accepted_by(flt.base) & accepted_by(flt.other)
+
+    if isinstance(flt, OrFilter):
+        return accepted_by(flt.base) | accepted_by(flt.other)
+
+    return Kind.ALL
+
+
+def check_of(flt: Any) -> Callable[[Message], bool] | None:
+    """Finds the check a filter declared with :func:`kinds`.
+
+    Checks only count when every message the filter accepts must pass
+    them, that is, when they are not part of an ``or`` or a ``not``.
+
+    Args:
+        flt (:obj:`~typing.Any`): Pyrogram filter, or :obj:`None`.
+
+    Returns:
+        :obj:`~typing.Callable`: The check, or :obj:`None` if there is
+        none.
+    """
+    declared: Any = getattr(flt, "check", None)
+    if isinstance(getattr(flt, "kinds", None), Kind) and callable(declared):
+        return declared
+
+    if isinstance(flt, AndFilter):
+        return check_of(flt.base) or check_of(flt.other)
+
+    return None
+
+
+def classify(message: Message, client: Client | None = None) -> Kind:
+    """Tells the kind of a message.
+
+    Captions count as text, so a photo whose caption is a command is
+    classified both as a command, just like
+    :func:`pyrogram.filters.command` would accept it, and as media.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
+        client (:obj:`~pyrogram.Client`, *optional*): Client which
+            received the message, used to ignore commands for other bots.
+
+    Returns:
+        :obj:`Kind`: Message kind.
+    """
+    if message.service is not None:
+        return Kind.SERVICE
+
+    me: Any = getattr(client, "me", None)
+    username: str | None = None if me is None else me.username
+
+    kind: Kind = Kind.NONE
+
+    if PARSER.parse(message.text or message.caption, username) is not None:
+        kind |= Kind.COMMAND
+
+    if message.media is not None:
+        kind |= Kind.MEDIA
+
+    if kind:
+        return kind
+
+    return Kind.TEXT
+
+
+def kind_of(message: Message, client: Client | None = None) -> Kind:
+    """Tells the kind of a message, classifying it only the first time.
+
+    The kind is kept in a private attribute of the message, which
+    Pyrogram leaves out when printing it.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
+        client (:obj:`~pyrogram.Client`, *optional*): Client which
+            received the message.
+
+    Returns:
+        :obj:`Kind`: Message kind.
+    """
+    kind: Kind | None = getattr(message, "_kind", None)
+
+    if kind is None:
+        kind = classify(message, client)
+        message._kind = kind  # pylint: disable=protected-access
+
+    return kind
@@ -5,8 +5,127 @@ Module to help managing trees.
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
 
+import re
+from html import escape
+from typing import Iterable, NamedTuple
+
 from pyrogram.types import Message
 
+from korone import constants
+
+
+class ParsedCommand(NamedTuple):
+    """Command parsed from a message text."""
+
+    name: str
+    """Case folded command name, without prefix nor mention."""
+
+    args: str
+    """Everything after the command, with leading whitespace stripped."""
+
+    mention: str | None
+    """Bot username the command was addressed to, if any."""
+
+
+class CommandParser:
+    """Parses commands such as ``/command@KoroneBot arg1 arg2``.
+
+    The prefixes are compiled into a single regular expression, so a
+    command and its arguments are found in one pass over the text, and
+    texts which do not start with any prefix are rejected before the
+    expression even runs. Only the name and the arguments are copied out
+    of the text.
+
+    Example:
+        .. code-block:: python
+
+            >>> parser = CommandParser(["/", "!"])
+            >>> parser.parse("!Ping@KoroneBot\\nnow", "korone_bot")
+            >>> parser.parse("!Ping@KoroneBot\\nnow", "KoroneBot")
+            ParsedCommand(name='ping', args='now', mention='KoroneBot')
+
+    Args:
+        prefixes (:obj:`~typing.Iterable`\\[:obj:`str`], *optional*):
+            Prefixes which start a command. Defaults to
+            :obj:`korone.constants.COMMAND_PREFIXES`.
+    """
+
+    def __init__(self, prefixes: Iterable[str] = constants.COMMAND_PREFIXES):
+        self.prefixes: tuple[str, ...] = tuple(
+            # longer prefixes first, so "!!" is not taken as "!"
+            sorted(set(prefixes), key=len, reverse=True)
+        )
+
+        if not self.prefixes or "" in self.prefixes:
+            raise ValueError("Prefixes must be non-empty strings.")
+
+        self._first: frozenset[str] = frozenset(p[0] for p in self.prefixes)
+        self._pattern: re.Pattern = re.compile(
+            "(?:"
+            + "|".join(map(re.escape, self.prefixes))
+            + r")([^\s@]+)(?:@(\w+))?(?:\s+|$)"
+        )
+
+    def parse(
+        self, text: str | None, username: str | None = None
+    ) -> ParsedCommand | None:
+        """Parses a command.
+
+        Args:
+            text (:obj:`str`, *optional*): Message text.
+            username (:obj:`str`, *optional*): Username of the bot. When
+                given, commands mentioning any other bot are ignored.
+
+        Returns:
+            :obj:`ParsedCommand`, *optional*: The parsed command, or
+            :obj:`None` if the text is not a command for this bot.
+        """
+        if not text or text[0] not in self._first:
+            return None
+
+        match: re.Match | None = self._pattern.match(text)
+        if match is None:
+            return None
+
+        mention: str | None = match[2]
+        if (
+            mention is not None
+            and username is not None
+            and mention.casefold() != username.casefold()
+        ):
+            return None
+
+        return ParsedCommand(match[1].casefold(), text[match.end():], mention)
+
+
+PARSER: CommandParser = CommandParser()
+"""Parser shared by the command helpers."""
+
+
+def _username(message: Message) -> str | None:
+    client = getattr(message, "_client", None)
+    me = getattr(client, "me", None)
+    return None if me is None else me.username
+
+
+def parse_command(message: Message) -> ParsedCommand | None:
+    """Parses the command in a message.
+
+    Commands mentioning a bot other than the client which received the
+    message are ignored.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
+
+    Returns:
+        :obj:`ParsedCommand`, *optional*: The parsed command, or
+        :obj:`None` if the message is not a command.
+    """
+    if message is None:
+        return None
+
+    return PARSER.parse(message.text, _username(message))
+
 
 def get_command_name(message: Message) -> str:
     """Gets command name.
@@ -15,7 +134,7 @@ def get_command_name(message: Message) -> str:
         .. code-block:: python
 
             >>>     # id=0 is required to create the message type
-            >>> m = Message(text="/command arg1 arg2 ... argN", id=0)
+            >>> m = Message(text="/Command@KoroneBot arg1 ... argN", id=0)
             >>> c = get_command_name(m)
             >>> c
             "command"
@@ -24,19 +143,11 @@ def get_command_name(message: Message) -> str:
         message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
 
     Returns:
-        str: Stripped command name
+        str: Stripped and case folded command name
     """
-    if message.text is None:
-        return ""
-
-    if not message.text.startswith("/"):
-        return ""
+    command: ParsedCommand | None = parse_command(message)
 
-    pos: int = message.text.find(" ")
-    if pos == -1:
-        pos = len(message.text)
-
-    return message.text[1:pos]
+    return "" if command is None else command.name
 
 
 def get_command_arg(message: Message) -> str:
@@ -57,15 +168,9 @@ def get_command_arg(message: Message) -> str:
     Returns:
         :obj:`str`: Arguments passed to the command.
     """
-    if message is None or message.text is None:
-        return ""
-
-    pos: int = message.text.find(" ")
+    command: ParsedCommand | None = parse_command(message)
 
-    if pos == -1:
-        return ""
-
-    return message.text[pos + 1:]
+    return "" if command is None else command.args
 
 
 def get_language_code(message: Message) -> str:
@@ -87,3 +192,58 @@ def get_language_code(message: Message) -> str:
     language_code = message.from_user.language_code
 
     return language_code
+
+
+def split_html(text: str, limit: int = constants.MESSAGE_LIMIT) -> list[str]:
+    """Escapes a text as HTML and splits it into parts which fit in a
+    message each.
+
+    Parts end on line boundaries, except for lines too long to fit in
+    a message on their own, which are split between characters, so an
+    escaped character such as ``&quot;`` is never cut in half.
+
+    Example:
+        .. code-block:: python
+
+            >>> split_html('a="1"\nb="2"', limit=16)
+            ['a=&quot;1&quot;', 'b=&quot;2&quot;']
+
+    Args:
+        text (:obj:`str`): Plain text.
+        limit (:obj:`int`, *optional*): Maximum length of each part.
+            Defaults to :obj:`korone.constants.MESSAGE_LIMIT`.
+
+    Returns:
+        :obj:`list`\\[:obj:`str`]: Escaped parts, in order.
+    """
+    parts: list[str] = []
+    lines: list[str] = []
+    length: int = 0
+
+    for line in text.splitlines():
+        escaped: str = escape(line)
+        pieces: list[str] = [escaped]
+
+        if len(escaped) > limit:
+            pieces = [""]
+            for char in line:
+                char = escape(char)
+                if len(pieces[-1]) + len(char) > limit:
+                    pieces.append("")
+                pieces[-1] += char
+
+        for piece in pieces:
+            # lines are joined by a newline, which counts as well
+            added: int = len(piece) + (1 if lines else 0)
+
+            if lines and length + added > limit:
+                parts.append("\n".join(lines))
+                lines, length, added = [], 0, len(piece)
+
+            lines.append(piece)
+            length += added
+
+    if lines:
+        parts.append("\n".join(lines))
+
+    return parts
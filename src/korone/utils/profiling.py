@@ -0,0 +1,82 @@
+"""
+Module to help profiling Korone's startup.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+log = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Measures how long each startup phase takes.
+
+    Example:
+        .. code-block:: python
+
+            >>> profiler = StartupProfiler()
+            >>> profiler.enabled = True
+            >>> with profiler.phase("config"):
+            ...     config.init()
+            >>> profiler.report()
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        """:obj:`True` if phases should be measured, otherwise
+        :obj:`False`."""
+
+        self.phases: list[tuple[str, float]] = []
+        """Measured phases, in order, with their duration in seconds."""
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measures the phase run inside the context.
+
+        Args:
+            name (:obj:`str`): Phase name.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> str:
+        """Logs and returns how long each phase took.
+
+        Returns:
+            :obj:`str`: The report, or an empty string if profiling is
+            disabled.
+        """
+        if not self.enabled:
+            return ""
+
+        total: float = sum(elapsed for _, elapsed in self.phases)
+        width: int = max((len(name) for name, _ in self.phases), default=0)
+
+        lines: list[str] = [
+            f"{name:<{width}}  {elapsed * 1e3:10.1f}ms"
+            f"  {elapsed / total if total else 0:6.1%}"
+            for name, elapsed in self.phases
+        ]
+        lines.append(f"{'total':<{width}}  {total * 1e3:10.1f}ms")
+
+        text: str = "\n".join(lines)
+        log.info("Startup profile:\n%s", text)
+
+        return text
+
+
+PROFILER: StartupProfiler = StartupProfiler()
+"""Profiler used during startup."""
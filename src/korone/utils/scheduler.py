@@ -0,0 +1,372 @@
+"""
+Outbound message scheduler.
+
+Replies are queued per bot and chat, and sent respecting both a per-bot
+and a per-chat send rate, since Telegram limits every bot on its own.
+When Telegram answers with a :obj:`~pyrogram.errors.FloodWait`, only the
+offending chat sleeps, so bursts in one chat do not delay replies
+anywhere else.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+from korone import constants
+
+log = logging.getLogger(__name__)
+
+
+# Represents a function which, once called, performs the actual request
+# to Telegram. It must be a factory rather than a coroutine, since a
+# coroutine cannot be awaited again when the request has to be retried.
+# For example:
+# >>> job: Job = lambda: message.reply("Hello!")
+Job = Callable[[], Awaitable[Any]]
+
+# Bot ID and chat ID, which identify a queue.
+Key = tuple[int, int]
+
+
+class RateLimiter:
+    """Token bucket rate limiter.
+
+    Args:
+        rate (:obj:`float`): Tokens refilled per second.
+        burst (:obj:`int`, *optional*): Maximum amount of tokens which
+            can be accumulated. Defaults to 1.
+        clock (:obj:`~typing.Callable`, *optional*): Returns the current
+            time, in seconds. Defaults to :func:`time.monotonic`.
+        sleep (:obj:`~typing.Callable`, *optional*): Waits for some
+            seconds. Defaults to :func:`asyncio.sleep`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("Rate must be a positive number.")
+
+        self.rate: float = rate
+        self.burst: int = max(burst, 1)
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], Awaitable[Any]] = sleep
+        self._tokens: float = float(self.burst)
+        self._updated: float = clock()
+
+    def _take(self) -> float:
+        now: float = self._clock()
+
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and consumes it."""
+        wait: float = self._take()
+
+        while wait > 0:
+            await self._sleep(wait)
+            wait = self._take()
+
+
+class SendScheduler:
+    """Schedules outbound requests on a per bot and chat basis.
+
+    Each chat of each bot has its own queue, drained by a worker task
+    which is spawned on demand and exits after being idle for a while.
+
+    Example:
+        .. code-block:: python
+
+            >>> scheduler = SendScheduler()
+            >>> await scheduler.send(
+            ...     chat_id, lambda: message.reply("Hi!"), client.me.id
+            ... )
+
+    Args:
+        rate (:obj:`float`, *optional*): Send rate of each bot across all
+            chats, in requests per second. Defaults to
+            :obj:`korone.constants.DEFAULT_SEND_RATE`.
+        chat_rate (:obj:`float`, *optional*): Per chat send rate, in
+            requests per second. Defaults to
+            :obj:`korone.constants.DEFAULT_CHAT_SEND_RATE`.
+        retries (:obj:`int`, *optional*): How many times a request is
+            retried after a FloodWait. Defaults to
+            :obj:`korone.constants.DEFAULT_SEND_RETRIES`.
+        clock (:obj:`~typing.Callable`, *optional*): Returns the current
+            time, in seconds. Defaults to :func:`time.monotonic`.
+        sleep (:obj:`~typing.Callable`, *optional*): Waits for some
+            seconds. Defaults to :func:`asyncio.sleep`.
+    """
+
+    idle_timeout: float = 60.0
+    """Seconds a chat worker waits for new requests before exiting."""
+
+    def __init__(
+        self,
+        rate: float = constants.DEFAULT_SEND_RATE,
+        chat_rate: float = constants.DEFAULT_CHAT_SEND_RATE,
+        retries: int = constants.DEFAULT_SEND_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.rate: float = rate
+        self.chat_rate: float = chat_rate
+        self.retries: int = retries
+
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], Awaitable[Any]] = sleep
+        self._bots: dict[int, RateLimiter] = {}
+        self._queues: dict[Key, asyncio.Queue] = {}
+        self._limiters: dict[Key, RateLimiter] = {}
+        self._workers: dict[Key, asyncio.Task] = {}
+
+        self.sent: int = 0
+        """Number of requests successfully sent."""
+
+        self.retried: int = 0
+        """Number of requests retried due to FloodWait."""
+
+        self.failed: int = 0
+        """Number of requests which raised an exception."""
+
+    def _limiter(self, rate: float, burst: int) -> RateLimiter:
+        return RateLimiter(rate, burst, self._clock, self._sleep)
+
+    def submit(
+        self, chat_id: int, job: Job, bot_id: int = 0
+    ) -> asyncio.Future:
+        """Enqueues a request to the given chat.
+
+        Args:
+            chat_id (:obj:`int`): Chat the request is sent to.
+            job (:obj:`Job`): Factory which performs the request.
+            bot_id (:obj:`int`, *optional*): Bot sending the request.
+                Defaults to 0, which suits a single bot.
+
+        Returns:
+            :obj:`asyncio.Future`: Future holding the request result.
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        key: Key = (bot_id, chat_id)
+
+        if bot_id not in self._bots:
+            self._bots[bot_id] = self._limiter(self.rate, int(self.rate))
+
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+            self._limiters[key] = self._limiter(
+                self.chat_rate, constants.DEFAULT_CHAT_SEND_BURST
+            )
+
+        self._queues[key].put_nowait((job, future))
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._work(key))
+
+        return future
+
+    async def send(self, chat_id: int, job: Job, bot_id: int = 0) -> Any:
+        """Enqueues a request and waits for it to be sent.
+
+        Args:
+            chat_id (:obj:`int`): Chat the request is sent to.
+            job (:obj:`Job`): Factory which performs the request.
+            bot_id (:obj:`int`, *optional*): Bot sending the request.
+                Defaults to 0, which suits a single bot.
+
+        Returns:
+            :obj:`~typing.Any`: Whatever the request returned.
+        """
+        return await self.submit(chat_id, job, bot_id)
+
+    def depth(self, chat_id: int | None = None) -> int:
+        """Returns how many requests are waiting to be sent.
+
+        Args:
+            chat_id (:obj:`int`, *optional*): Only count requests for this
+                chat, from any bot. Defaults to all chats.
+
+        Returns:
+            :obj:`int`: Queue depth.
+        """
+        return sum(
+            queue.qsize()
+            for (_, chat), queue in self._queues.items()
+            if chat_id is None or chat == chat_id
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Returns the scheduler metrics.
+
+        Returns:
+            :obj:`dict`\\[:obj:`str`, :obj:`int`]: Scheduler metrics.
+        """
+        return {
+            "pending": self.depth(),
+            "chats": len(self._workers),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    async def drain(self, timeout: float) -> bool:
+        """Waits until every queued request has been sent.
+
+        Args:
+            timeout (:obj:`float`): Seconds to wait for the requests.
+
+        Returns:
+            :obj:`bool`: :obj:`True` if every request was sent in time,
+            otherwise :obj:`False`.
+        """
+        queues: list[asyncio.Queue] = list(self._queues.values())
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            log.warning("%d request(s) were not sent in time", self.depth())
+            return False
+
+        return True
+
+    async def _work(self, key: Key) -> None:
+        queue: asyncio.Queue = self._queues[key]
+        limiter: RateLimiter = self._limiters[key]
+        bot: RateLimiter = self._bots[key[0]]
+
+        try:
+            while True:
+                try:
+                    job, future = await asyncio.wait_for(
+                        queue.get(), timeout=self.idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        return
+                    continue
+
+                try:
+                    await limiter.acquire()
+                    await bot.acquire()
+                    await self._run(key[1], job, future)
+                finally:
+                    queue.task_done()
+        finally:
+            del self._workers[key]
+
+            if queue.empty():
+                del self._queues[key]
+                del self._limiters[key]
+
+    async def _run(self, chat_id: int, job: Job, future: asyncio.Future):
+        attempt: int = 0
+
+        while True:
+            try:
+                result = await job()
+            except FloodWait as err:
+                if attempt >= self.retries:
+                    log.error("Giving up on chat %d after FloodWait", chat_id)
+                    self.failed += 1
+                    if not future.cancelled():
+                        future.set_exception(err)
+                    return
+
+                attempt += 1
+                self.retried += 1
+
+                log.warning(
+                    "FloodWait on chat %d, sleeping for %ss",
+                    chat_id,
+                    err.value,
+                )
+                await self._sleep(err.value)  # type: ignore
+                continue
+            except Exception as err:  # pylint: disable=broad-except
+                self.failed += 1
+                if not future.cancelled():
+                    future.set_exception(err)
+                return
+
+            self.sent += 1
+            if not future.cancelled():
+                future.set_result(result)
+            return
+
+
+SCHEDULER: SendScheduler = SendScheduler()
+"""Scheduler shared by all modules."""
+
+
+def bot_id_of(message: Message) -> int:
+    """Returns the ID of the bot which received a message.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Pyrogram Message.
+
+    Returns:
+        :obj:`int`: Bot ID, or 0 if the message is not bound to a
+        started client.
+    """
+    client: Any = getattr(message, "_client", None)
+    me: Any = getattr(client, "me", None)
+
+    return 0 if me is None else me.id
+
+
+async def reply(message: Message, *args, **kwargs) -> Message:
+    """Replies to a message through the shared scheduler.
+
+    Takes the same arguments as :meth:`~pyrogram.types.Message.reply`.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Message to reply to.
+
+    Returns:
+        :obj:`~pyrogram.types.Message`: The sent message.
+    """
+    return await SCHEDULER.send(
+        message.chat.id,
+        lambda: message.reply(*args, **kwargs),
+        bot_id_of(message),
+    )
+
+
+async def edit_text(message: Message, *args, **kwargs) -> Message:
+    """Edits a message through the shared scheduler.
+
+    Takes the same arguments as :meth:`~pyrogram.types.Message.edit_text`.
+
+    Args:
+        message (:obj:`~pyrogram.types.Message`): Message to edit.
+
+    Returns:
+        :obj:`~pyrogram.types.Message`: The edited message.
+    """
+    return await SCHEDULER.send(
+        message.chat.id,
+        lambda: message.edit_text(*args, **kwargs),
+        bot_id_of(message),
+    )
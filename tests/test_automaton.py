@@ -0,0 +1,68 @@
+"""
+Tests for the keyword automaton.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from pytest import raises
+
+from korone.utils.automaton import Automaton
+
+
+class TestAutomaton:
+    """Tests adding, removing and searching keywords"""
+
+    def test_search(self):
+        """Every occurrence of every keyword is found"""
+        automaton: Automaton[int] = Automaton()
+        automaton.add("he", 1)
+        automaton.add("She", 2)
+        automaton.add("his", 3)
+        automaton.add("hers", 4)
+
+        assert list(automaton.search("ushers")) == [
+            (1, "she", 2),
+            (2, "he", 1),
+            (2, "hers", 4),
+        ]
+
+    def test_find(self):
+        """Only keywords standing as words of their own are found"""
+        automaton: Automaton[int] = Automaton()
+        automaton.add("hello", 1)
+        automaton.add("good morning", 2)
+        automaton.add("hi!", 3)
+
+        assert automaton.find("Othello") is None
+        assert automaton.find("oh, HELLO there") == ("hello", 1)
+        assert automaton.find("Good Morning, folks") == ("good morning", 2)
+        assert automaton.find("ahi!!") is None
+        assert automaton.find("well, hi!x") == ("hi!", 3)
+
+    def test_update(self):
+        """Keywords can be replaced and removed after searching"""
+        automaton: Automaton[int] = Automaton()
+        automaton.add("cat", 1)
+        automaton.add("category", 2)
+
+        assert automaton.find("a category") == ("category", 2)
+
+        automaton.add("CAT", 3)
+        assert automaton.remove("category")
+        assert not automaton.remove("category")
+
+        assert len(automaton) == 1
+        assert automaton.find("a category") is None
+        assert automaton.find("a cat") == ("cat", 3)
+
+        for i in range(100):
+            automaton.add(f"dog{i}", i)
+            automaton.remove(f"dog{i}")
+
+        assert automaton.find("a cat, dog1") == ("cat", 3)
+
+    def test_empty_keyword(self):
+        """Empty keywords are rejected"""
+        with raises(ValueError):
+            Automaton().add("", 0)
@@ -0,0 +1,72 @@
+"""
+Tests for the database backups.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import os
+import sqlite3
+
+from pytest import raises
+
+from korone.database.backup import Backup, BackupAborted
+
+
+def database(path: str) -> str:
+    """Creates a small database."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Numbers (n INTEGER)")
+    conn.executemany(
+        "INSERT INTO Numbers VALUES (?)", ((n,) for n in range(1000))
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestBackup:
+    """Tests taking and rotating snapshots"""
+
+    def test_run(self, tmp_path):
+        """Snapshots hold the whole database"""
+        source = database(str(tmp_path / "korone.db"))
+        backup = Backup(str(tmp_path / "backups"), pages=1, pause=0)
+
+        snapshot = backup.run(source)
+
+        assert backup.snapshots() == [snapshot]
+        assert not os.path.exists(f"{snapshot}.part")
+
+        conn = sqlite3.connect(snapshot)
+        assert conn.execute("SELECT COUNT(*) FROM Numbers").fetchone() == (
+            1000,
+        )
+        conn.close()
+
+    def test_rotate(self, tmp_path):
+        """Only the newest snapshots are kept"""
+        directory = tmp_path / "backups"
+        directory.mkdir()
+
+        for day in range(1, 5):
+            (directory / f"korone-2022100{day}-120000.db").touch()
+
+        backup = Backup(str(directory), keep=2)
+        backup.rotate()
+
+        assert [os.path.basename(path) for path in backup.snapshots()] == [
+            "korone-20221003-120000.db",
+            "korone-20221004-120000.db",
+        ]
+
+    def test_abort(self, tmp_path):
+        """Aborted backups leave nothing behind"""
+        source = database(str(tmp_path / "korone.db"))
+        backup = Backup(str(tmp_path / "backups"), pages=1, pause=0)
+        backup.stop()
+
+        with raises(BackupAborted):
+            backup.run(source)
+
+        assert not os.listdir(tmp_path / "backups")
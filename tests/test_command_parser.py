@@ -0,0 +1,49 @@
+"""
+Tests for the command parser.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from pytest import raises
+
+from korone.utils.misc import CommandParser, ParsedCommand
+
+
+class TestCommandParser:
+    """Tests the parsing of commands and their arguments"""
+
+    parser = CommandParser(["/", "!", "!!"])
+
+    def test_prefixes(self):
+        """Every prefix starts a command, longer prefixes first"""
+        assert self.parser.parse("/ping") == ParsedCommand("ping", "", None)
+        assert self.parser.parse("!ping") == ParsedCommand("ping", "", None)
+        assert self.parser.parse("!!ping") == ParsedCommand("ping", "", None)
+        assert self.parser.parse(".ping") is None
+        assert self.parser.parse("/") is None
+        assert self.parser.parse("") is None
+        assert self.parser.parse(None) is None
+
+    def test_arguments(self):
+        """Arguments start after any whitespace and are kept verbatim"""
+        command = self.parser.parse("/Disable\n  greet  farewell ")
+
+        assert command == ParsedCommand("disable", "greet  farewell ", None)
+
+    def test_mentions(self):
+        """Commands addressed to other bots are ignored"""
+        command = self.parser.parse("/ping@KoroneBot now", "koronebot")
+
+        assert command == ParsedCommand("ping", "now", "KoroneBot")
+        assert self.parser.parse("/ping@OtherBot", "KoroneBot") is None
+        assert self.parser.parse("/ping@OtherBot") is not None
+        assert self.parser.parse("/ping@Korone-Bot") is None
+
+    def test_invalid_prefixes(self):
+        """Empty prefixes are rejected"""
+        with raises(ValueError):
+            CommandParser([])
+
+        with raises(ValueError):
+            CommandParser(["/", ""])
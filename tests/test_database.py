@@ -0,0 +1,117 @@
+"""
+Tests for the database connection.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import sqlite3
+import threading
+
+from pytest import fixture
+
+from korone.database import Database
+
+
+@fixture
+def database(tmp_path) -> type[Database]:
+    """Connects to a new database with a few hundred filters."""
+    Database.connect(str(tmp_path / "korone.db"))
+    Database.setup()
+
+    with Database.transaction():
+        for n in range(500):
+            Database.execute(
+                "INSERT INTO Filters (chat_uuid, handler, data) "
+                "VALUES (?, ?, ?)",
+                (n, f"keyword{n}", "reply " * 50),
+            )
+
+    yield Database
+    Database.close()
+    del Database.conn
+
+
+def pages() -> int:
+    """Returns the size of the database, in pages."""
+    return Database.execute("PRAGMA page_count").fetchone()[0]
+
+
+class TestMaintenance:
+    """Tests the maintenance run once Korone is online"""
+
+    def test_vacuum(self, database: type[Database]):
+        """The database is only rewritten once enough pages are free"""
+        before: int = pages()
+
+        database.execute("DELETE FROM Filters WHERE chat_uuid < 10")
+        database.maintain()
+        assert pages() == before
+
+        database.execute("DELETE FROM Filters WHERE chat_uuid < 400")
+        database.maintain()
+        assert pages() < before
+
+        # the full-text index still matches the remaining rows
+        assert len(database.table("Filters").search("keyword450")) == 1
+
+        database.execute("DELETE FROM Filters WHERE chat_uuid = 450")
+        assert len(database.table("Filters").search("keyword450")) == 0
+        assert len(database.table("Filters").search("keyword451")) == 1
+
+    def test_interrupt(self, database: type[Database]):
+        """Interrupted maintenance leaves the database intact"""
+        database.interrupt()
+        database.execute("DELETE FROM Filters WHERE chat_uuid < 400")
+
+        thread = threading.Thread(target=database.maintain)
+        thread.start()
+
+        while thread.is_alive():
+            database.interrupt()
+
+        thread.join()
+
+        count = database.execute("SELECT COUNT(*) FROM Filters").fetchone()
+        assert count[0] == 100
+
+
+class TestSetup:
+    """Tests setting up existing databases"""
+
+    def test_migration(self, tmp_path):
+        """Filters without IDs get them, and are indexed once"""
+        path: str = str(tmp_path / "korone.db")
+
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE Filters (chat_uuid INTEGER, handler TEXT, "
+            "data TEXT, file_id TEXT, filter_type TEXT);"
+            "CREATE VIRTUAL TABLE FiltersSearch USING fts5 "
+            "(handler, data, content = 'Filters');"
+            "INSERT INTO Filters VALUES (1, 'hello', 'world', NULL, 'text');"
+            "INSERT INTO Filters VALUES (2, 'bye', 'moon', NULL, 'text');"
+        )
+        conn.close()
+
+        Database.connect(path)
+
+        try:
+            Database.setup()
+
+            assert [
+                tuple(row)
+                for row in Database.execute(
+                    "SELECT id, handler FROM Filters ORDER BY id"
+                )
+            ] == [(1, "hello"), (2, "bye")]
+            assert len(Database.table("Filters").search("world")) == 1
+
+            Database.execute("DELETE FROM Filters WHERE handler = 'hello'")
+            Database.setup()
+
+            assert len(Database.table("Filters").search("world")) == 0
+            assert len(Database.table("Filters").search("moon")) == 1
+        finally:
+            Database.close()
+            del Database.conn
@@ -0,0 +1,87 @@
+"""
+Tests for exporting and importing the database.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import gzip
+import sqlite3
+
+from pytest import raises
+
+from korone import constants
+from korone.database import DatabaseError
+from korone.database.dump import BATCH_SIZE, dump, load, tables
+
+
+def database(path: str) -> str:
+    """Creates a database with a few users and filters."""
+    conn = sqlite3.connect(path)
+    conn.executescript(constants.DATABASE_SETUP)
+    conn.executemany(
+        "INSERT INTO Users VALUES (?, ?, ?)",
+        ((uuid, "en", 1664625600) for uuid in range(BATCH_SIZE + 1)),
+    )
+    conn.execute(
+        "INSERT INTO Filters "
+        "(chat_uuid, handler, data, file_id, filter_type) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (1, "olá", 'Olá, "mundo"\n', None, "text"),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestDump:
+    """Tests round trips through dumps"""
+
+    def test_tables(self):
+        """Virtual tables are not exported"""
+        assert "Users" in tables()
+        assert "FiltersSearch" not in tables()
+
+    def test_round_trip(self, tmp_path):
+        """Imports restore what was exported"""
+        source = database(str(tmp_path / "source.db"))
+        target = str(tmp_path / "target.db")
+        path = str(tmp_path / "dump.jsonl.gz")
+
+        exported = dump(source, path)
+        assert exported["Users"] == BATCH_SIZE + 1
+        assert exported["Media"] == 0
+
+        # importing twice replaces, instead of duplicating, the rows
+        load(target, path)
+        assert load(target, path) == exported
+
+        conn = sqlite3.connect(target)
+        assert conn.execute("SELECT COUNT(*) FROM Users").fetchone() == (
+            BATCH_SIZE + 1,
+        )
+        assert conn.execute(
+            "SELECT Filters.data FROM Filters JOIN FiltersSearch "
+            "ON Filters.rowid = FiltersSearch.rowid "
+            "WHERE FiltersSearch MATCH 'mundo'"
+        ).fetchone() == ('Olá, "mundo"\n',)
+        conn.close()
+
+    def test_unknown_table(self, tmp_path):
+        """Dumps naming tables outside the schema are rejected"""
+        target = database(str(tmp_path / "target.db"))
+        path = str(tmp_path / "dump.jsonl.gz")
+
+        with gzip.open(path, "wt") as stream:
+            stream.write('{"table":"Users","columns":["uuid"],"rows":[]}\n')
+            stream.write('{"table":"Secret","columns":[],"rows":[]}\n')
+
+        with raises(DatabaseError):
+            load(target, path)
+
+        # nothing was changed
+        conn = sqlite3.connect(target)
+        assert conn.execute("SELECT COUNT(*) FROM Users").fetchone() == (
+            BATCH_SIZE + 1,
+        )
+        conn.close()
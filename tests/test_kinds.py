@@ -0,0 +1,75 @@
+"""
+Tests for the classification of messages.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from pyrogram import filters
+from pyrogram.enums import MessageMediaType, MessageServiceType
+from pyrogram.types import Message
+
+from korone.utils.kinds import (
+    Kind,
+    accepted_by,
+    check_of,
+    classify,
+    kind_of,
+    kinds,
+)
+
+
+class TestKinds:
+    """Tests the classification of messages and filters"""
+
+    def test_classify(self):
+        """Messages are classified by their contents"""
+        photo = MessageMediaType.PHOTO
+        joined = MessageServiceType.NEW_CHAT_MEMBERS
+
+        assert classify(Message(id=0, text="hello there")) == Kind.TEXT
+        assert classify(Message(id=0, text="/ping now")) == Kind.COMMAND
+        assert classify(Message(id=0, media=photo)) == Kind.MEDIA
+        assert classify(Message(id=0, media=photo, caption="!ping")) == (
+            Kind.COMMAND | Kind.MEDIA
+        )
+        assert classify(Message(id=0, service=joined)) == Kind.SERVICE
+
+    def test_accepted_by(self):
+        """Filters accept the kinds they may let through"""
+        command = filters.command("ping")
+
+        assert accepted_by(None) == Kind.ALL
+        assert accepted_by(command) == Kind.COMMAND
+        assert accepted_by(command & filters.private) == Kind.COMMAND
+        assert accepted_by(command | filters.media) == (
+            Kind.COMMAND | Kind.MEDIA
+        )
+        assert accepted_by(~command) == Kind.ALL
+        assert accepted_by(filters.private) == Kind.ALL
+        assert accepted_by(kinds(Kind.SERVICE)) == Kind.SERVICE
+
+    def test_check_of(self):
+        """Checks are found only where every message must pass them"""
+        def check(message: Message) -> bool:
+            return message.text == "hello"
+
+        checked = kinds(Kind.TEXT, check)
+
+        assert check_of(checked) is check
+        assert check_of(checked & filters.group) is check
+        assert check_of(filters.group & checked) is check
+        assert check_of(checked | filters.media) is None
+        assert check_of(~checked) is None
+        assert check_of(kinds(Kind.TEXT)) is None
+        assert check_of(None) is None
+
+    def test_kind_of(self):
+        """Messages are classified only once"""
+        message = Message(id=0, text="/ping now")
+
+        assert kind_of(message) == Kind.COMMAND
+
+        message.text = "hello there"
+        assert kind_of(message) == Kind.COMMAND
+        assert "_kind" not in str(message)
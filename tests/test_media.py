@@ -0,0 +1,75 @@
+"""
+Tests for the media registry.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from pyrogram.enums import MessageMediaType
+from pyrogram.types import Message, Sticker
+from pytest import fixture
+
+from korone.database import Database
+from korone.database.media import MediaRegistry
+
+
+def sticker(file_id: str, unique_id: str) -> Message:
+    """Creates a message holding a sticker."""
+    return Message(
+        id=0,
+        media=MessageMediaType.STICKER,
+        sticker=Sticker(
+            file_id=file_id,
+            file_unique_id=unique_id,
+            width=512,
+            height=512,
+            is_animated=False,
+            is_video=False,
+        ),
+    )
+
+
+@fixture
+def registry() -> MediaRegistry:
+    """Creates a registry backed by an in-memory database."""
+    Database.connect(":memory:")
+    Database.setup()
+    yield MediaRegistry(size=2)
+    Database.close()
+    del Database.conn
+
+
+class TestMediaRegistry:
+    """Tests the registration and resolution of media"""
+
+    def test_register_and_resolve(self, registry: MediaRegistry):
+        """Each file is stored once per bot, keeping its newest file_id"""
+        assert registry.register(1, Message(id=0, text="hi")) is None
+        assert registry.register(1, sticker("old", "AgADa")) == "AgADa"
+        assert registry.register(1, sticker("new", "AgADa")) == "AgADa"
+        registry.register(2, sticker("other", "AgADa"))
+
+        assert registry.resolve(1, "AgADa") == "new"
+        assert registry.resolve(2, "AgADa") == "other"
+        assert registry.resolve(3, "AgADa") is None
+
+        count = Database.execute("SELECT COUNT(*) FROM Media").fetchone()[0]
+        assert count == 2
+
+    def test_hot_entries(self, registry: MediaRegistry):
+        """Only the most recently used entries are kept in memory"""
+        for unique_id in ("a", "b", "c"):
+            registry.register(1, sticker(f"id-{unique_id}", unique_id))
+
+        assert registry.resolve(1, "c") == "id-c"
+        assert registry.resolve(1, "a") == "id-a"
+        assert registry.stats() == {"cached": 2, "hits": 1, "misses": 1}
+
+    def test_known(self, registry: MediaRegistry):
+        """Files registered by any bot are known, whether in memory or not"""
+        for unique_id in ("a", "b", "c"):
+            registry.register(1, sticker(f"id-{unique_id}", unique_id))
+
+        assert registry.known("a")
+        assert registry.known("c")
+        assert not registry.known("id-a")
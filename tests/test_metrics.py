@@ -0,0 +1,91 @@
+"""
+Tests for the metrics registry.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+
+from pytest import fixture, raises
+
+from korone.metrics import Histogram, Metrics, Window
+
+
+@fixture(autouse=True)
+def reset():
+    """Starts every test with an empty registry."""
+    Metrics.reset()
+    yield
+    Metrics.enabled = False
+    Metrics.reset()
+
+
+class TestMetrics:
+    """Tests the collection and rendering of metrics"""
+
+    def test_histogram_buckets(self):
+        """Observations land on the first bucket not smaller than them"""
+        hist = Histogram(buckets=(0.1, 1.0))
+
+        hist.observe(0.05)
+        hist.observe(0.1)
+        hist.observe(0.5)
+        hist.observe(5.0, error=True)
+
+        assert hist.counts == [2, 1, 1]
+        assert hist.count == 4
+        assert hist.errors == 1
+        assert hist.quantile(0.5) == 0.1
+        assert hist.quantile(0.99) == float("inf")
+
+    def test_instrument_disabled(self):
+        """Callbacks are not wrapped while metrics are disabled"""
+
+        async def callback():
+            pass
+
+        assert Metrics.instrument(callback, "callback") is callback
+
+    def test_instrument_enabled(self):
+        """Wrapped callbacks record both successes and errors"""
+        Metrics.enabled = True
+
+        async def callback(fail: bool):
+            if fail:
+                raise ValueError
+
+        wrapped = Metrics.instrument(callback, "callback")
+
+        asyncio.run(wrapped(False))
+        with raises(ValueError):
+            asyncio.run(wrapped(True))
+
+        assert Metrics.handlers["callback"].count == 2
+        assert Metrics.handlers["callback"].errors == 1
+
+    def test_render(self):
+        """Rendered output follows the Prometheus text format"""
+        Metrics.observe_query("  select * from Users", 0.002, False)
+        Metrics.gauges["korone_send_pending"] = 3
+        Metrics.increment('korone_gate_dropped_total{kind="text"}')
+        Metrics.increment('korone_gate_dropped_total{kind="text"}')
+
+        text = Metrics.render()
+
+        assert 'korone_database_seconds_count{statement="SELECT"} 1' in text
+        assert 'korone_database_errors_total{statement="SELECT"} 0' in text
+        assert "korone_send_pending 3" in text
+        assert "# TYPE korone_gate_dropped_total counter" in text
+        assert 'korone_gate_dropped_total{kind="text"} 2' in text
+
+    def test_window(self):
+        """Windows keep only the latest samples"""
+        window = Window(4)
+
+        for value in (100, 1, 2, 3, 4):
+            window.add(value)
+
+        assert len(window) == 4
+        assert window.percentile(50) == 2
+        assert window.percentile(99) == 4
@@ -0,0 +1,31 @@
+"""
+Tests for the miscellaneous helpers.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from korone.utils.misc import split_html
+
+
+class TestSplitHtml:
+    """Tests splitting escaped texts into messages"""
+
+    def test_lines(self):
+        """Parts hold as many whole lines as fit"""
+        text: str = "\n".join(f'metric{{handler="{n}"}} 1' for n in range(9))
+        parts: list[str] = split_html(text, limit=80)
+
+        assert len(parts) > 1
+        assert all(len(part) <= 80 for part in parts)
+        assert "\n".join(parts) == text.replace('"', "&quot;")
+
+    def test_long_lines(self):
+        """Lines too long for a message never cut escaped characters"""
+        parts: list[str] = split_html('<"">' * 4, limit=13)
+
+        assert parts == [
+            "&lt;&quot;",
+            "&quot;&gt;",
+        ] * 4
+        assert split_html("") == []
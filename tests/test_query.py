@@ -0,0 +1,67 @@
+"""
+Tests for the database queries.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+from dataclasses import FrozenInstanceError
+
+from pytest import raises
+
+from korone.database.query import MalformedQuery, Query, Row
+
+
+class TestCondition:
+    """Tests immutable query expressions"""
+
+    row = Row()
+
+    def test_compile(self):
+        """Conditions compile as queries do"""
+        query = Query()
+        condition = (self.row.chat_uuid == 1) & (self.row.command != "ping")
+
+        assert condition.compile() == (
+            (query.chat_uuid == 1) & (query.command != "ping")
+        ).compile()
+        assert (~(self.row.state >= 1) | (self.row["uuid"] < 2)).compile() == (
+            "((NOT (state >= ?)) OR (uuid < ?))",
+            (1, 2),
+        )
+
+    def test_structural_equality(self):
+        """Conditions are equal and hash alike by structure"""
+        first = (self.row.chat_uuid == 1) & (self.row.command == "ping")
+        second = (self.row.chat_uuid == 1) & (self.row.command == "ping")
+
+        assert first == second
+        assert first != (self.row.chat_uuid == 1) | (self.row.command == "")
+        assert {first: "cached"}[second] == "cached"
+
+    def test_immutable(self):
+        """Building conditions changes nothing already built"""
+        chat = self.row.chat_uuid == 1
+        both = chat & (self.row.command == "ping")
+
+        assert chat.compile() == ("(chat_uuid == ?)", (1,))
+        assert both.lhs is chat
+
+        with raises(FrozenInstanceError):
+            chat.value = 2  # type: ignore
+
+        with raises(MalformedQuery):
+            _ = chat & Query()  # type: ignore
+
+    def test_json_path(self):
+        """JSON paths are quoted into the clause"""
+        assert (self.row.settings.json("$.it's") == 1).compile() == (
+            "(json_extract(settings, '$.it''s') == ?)",
+            (1,),
+        )
+
+        with raises(MalformedQuery):
+            self.row.settings.json("admins")
+
+        with raises(MalformedQuery):
+            self.row.settings.json("$.a").json("$.b")
@@ -0,0 +1,203 @@
+"""
+Tests for the outbound message scheduler.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import heapq
+from typing import Any, Awaitable
+
+from pyrogram.errors import FloodWait
+from pytest import raises
+
+from korone import constants
+from korone.utils.scheduler import SendScheduler
+
+
+class FakeClock:
+    """Clock whose time only passes when every task is sleeping."""
+
+    def __init__(self):
+        self.now: float = 0.0
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._count: int = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleeps until the clock reaches the wake up time."""
+        future = asyncio.get_running_loop().create_future()
+        self._count += 1
+        heapq.heappush(
+            self._sleepers, (self.now + seconds, self._count, future)
+        )
+        await future
+
+    async def run(self, awaitable: Awaitable) -> Any:
+        """Runs an awaitable, moving the clock forward whenever no other
+        task can run."""
+        task = asyncio.ensure_future(awaitable)
+
+        while True:
+            # lets every task run until it sleeps or waits
+            for _ in range(20):
+                await asyncio.sleep(0)
+
+            if task.done():
+                return task.result()
+
+            when, _, future = heapq.heappop(self._sleepers)
+            self.now = max(self.now, when)
+            future.set_result(None)
+
+
+class FakeChat:
+    """Records when each request to a chat was sent."""
+
+    def __init__(self, clock: FakeClock, floods: int = 0):
+        self.clock: FakeClock = clock
+        self.floods: int = floods
+        self.sent: list[float] = []
+
+    def job(self):
+        """Returns a job sending a request to this chat."""
+        async def send():
+            if self.floods:
+                self.floods -= 1
+                raise FloodWait(value=10)
+
+            self.sent.append(self.clock.now)
+            return len(self.sent)
+
+        return send
+
+
+class TestSendScheduler:
+    """Tests the rate limits, FloodWait handling and draining"""
+
+    @staticmethod
+    def scheduler(clock: FakeClock, **kwargs) -> SendScheduler:
+        """Creates a scheduler running on a fake clock."""
+        return SendScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_chat_rate(self):
+        """Each chat is limited on its own, after a burst"""
+        clock = FakeClock()
+        burst: int = constants.DEFAULT_CHAT_SEND_BURST
+
+        async def main():
+            scheduler = self.scheduler(clock, rate=100, chat_rate=1)
+            first, second = FakeChat(clock), FakeChat(clock)
+
+            await clock.run(
+                asyncio.gather(
+                    *(scheduler.send(1, first.job()) for _ in range(5)),
+                    scheduler.send(2, second.job()),
+                )
+            )
+
+            return first.sent, second.sent
+
+        first, second = asyncio.run(main())
+
+        assert first == [0.0] * burst + [
+            float(index) for index in range(1, 6 - burst)
+        ]
+        assert second == [0.0]
+
+    def test_bot_rate(self):
+        """Bots have their own limits, even within the same chat"""
+        clock = FakeClock()
+
+        async def main():
+            scheduler = self.scheduler(clock, rate=1, chat_rate=100)
+            first, second = FakeChat(clock), FakeChat(clock)
+
+            await clock.run(
+                asyncio.gather(
+                    *(scheduler.send(1, first.job(), 1) for _ in range(2)),
+                    *(scheduler.send(1, second.job(), 2) for _ in range(2)),
+                )
+            )
+
+            return first.sent, second.sent
+
+        assert asyncio.run(main()) == ([0.0, 1.0], [0.0, 1.0])
+
+    def test_flood_wait(self):
+        """A FloodWait only pauses the chat it was raised for"""
+        clock = FakeClock()
+
+        async def main():
+            scheduler = self.scheduler(clock, rate=100, chat_rate=100)
+            flooded, other = FakeChat(clock, floods=1), FakeChat(clock)
+
+            await clock.run(
+                asyncio.gather(
+                    scheduler.send(1, flooded.job()),
+                    scheduler.send(2, other.job()),
+                )
+            )
+
+            return flooded.sent, other.sent, scheduler.stats()["retried"]
+
+        assert asyncio.run(main()) == ([10.0], [0.0], 1)
+
+    def test_give_up(self):
+        """Requests fail once their retries are spent"""
+        clock = FakeClock()
+
+        async def main():
+            scheduler = self.scheduler(clock, retries=1)
+            chat = FakeChat(clock, floods=2)
+
+            with raises(FloodWait):
+                await clock.run(scheduler.send(1, chat.job()))
+
+            return scheduler.stats()["failed"]
+
+        assert asyncio.run(main()) == 1
+
+    def test_cancel(self):
+        """Cancelled requests do not stop the queue of their chat"""
+        clock = FakeClock()
+
+        async def main():
+            scheduler = self.scheduler(clock, retries=0, chat_rate=1)
+            flooded, chat = FakeChat(clock, floods=1), FakeChat(clock)
+
+            scheduler.submit(1, flooded.job()).cancel()
+            for _ in range(constants.DEFAULT_CHAT_SEND_BURST):
+                scheduler.submit(1, chat.job())
+            scheduler.submit(1, chat.job()).cancel()
+
+            result = await clock.run(scheduler.send(1, chat.job()))
+
+            return result, scheduler.stats()
+
+        result, stats = asyncio.run(main())
+
+        assert result == constants.DEFAULT_CHAT_SEND_BURST + 2
+        assert stats["failed"] == 1
+        assert stats["sent"] == constants.DEFAULT_CHAT_SEND_BURST + 2
+
+    def test_drain(self):
+        """Draining waits for queued requests, up to a timeout"""
+        async def main():
+            scheduler = SendScheduler()
+            blocked = asyncio.Event()
+
+            scheduler.submit(1, blocked.wait)
+            scheduler.submit(1, lambda: asyncio.sleep(0))
+
+            assert not await scheduler.drain(0.01)
+            assert scheduler.depth(1) == 1
+
+            blocked.set()
+            assert await scheduler.drain(1)
+            assert scheduler.depth() == 0
+
+        asyncio.run(main())
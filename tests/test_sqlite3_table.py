@@ -0,0 +1,400 @@
+"""
+Tests for the SQLite3 Table implementation.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import asyncio
+import sqlite3
+
+from pytest import fixture, raises
+
+from korone.database.cache import QueryCache
+from korone.database.impl.sqlite3_impl import SQLite3Connection
+from korone.database.query import Query, Row
+from korone.database.table import Document, Record, Table
+
+
+@fixture
+def table() -> Table:
+    """Creates an in-memory table of commands."""
+    conn = SQLite3Connection(path=":memory:")
+
+    with conn:
+        conn.execute(
+            "CREATE TABLE Commands (chat_uuid INTEGER, command TEXT, state BIT)"
+        )
+        yield conn.table("Commands")
+
+
+class TestSQLite3Table:
+    """Tests the operations of SQLite3 tables"""
+
+    command = Query()
+
+    def test_insert_and_query(self, table: Table):
+        """Inserts a few documents and queries one of them"""
+        table.insert(Document(chat_uuid=1, command="greet", state=0))
+        table.insert(Document(chat_uuid=2, command="greet", state=1))
+
+        result = table.query(self.command.chat_uuid == 2)
+
+        assert result == [{"chat_uuid": 2, "command": "greet", "state": 1}]
+
+    def test_insert_object(self, table: Table):
+        """Inserts an object, ignoring its private attributes"""
+
+        class Toggle:  # pylint: disable=too-few-public-methods
+            def __init__(self):
+                self.chat_uuid = 3
+                self.command = "ping"
+                self._cache = object()
+
+        table.insert(Toggle())
+
+        result = table.query(self.command.command == "ping")
+
+        assert result == [{"chat_uuid": 3, "command": "ping", "state": None}]
+
+    def test_update_and_delete(self, table: Table):
+        """Updates and deletes the matching documents only"""
+        table.insert(Document(chat_uuid=1, command="greet", state=0))
+        table.insert(Document(chat_uuid=2, command="greet", state=0))
+
+        table.update(Document(state=1), self.command.chat_uuid == 1)
+        table.delete(self.command.chat_uuid == 2)
+
+        result = table.query(self.command.command == "greet")
+
+        assert result == [{"chat_uuid": 1, "command": "greet", "state": 1}]
+
+    def test_update_record(self):
+        """Records only write the fields changed since they were read"""
+        conn = SQLite3Connection(path=":memory:")
+        statements: list[str] = []
+
+        with conn:
+            conn.execute(
+                "CREATE TABLE Commands "
+                "(chat_uuid INTEGER, command TEXT, state BIT)"
+            )
+            table = conn.table("Commands")
+            table.insert(Document(chat_uuid=1, command="greet", state=0))
+
+            conn._conn.set_trace_callback(statements.append)  # type: ignore
+
+            record = table.query(self.command.chat_uuid == 1)[0]
+            assert isinstance(record, Record)
+
+            record["state"] = 0
+            record["command"] = "ping"
+            record["command"] = "greet"
+            table.update(record, self.command.chat_uuid == 1)
+
+            record.update(state=1)
+            table.update(record, self.command.chat_uuid == 1)
+            assert not record.changes()
+
+            assert [
+                statement
+                for statement in statements
+                if statement.startswith("UPDATE")
+            ] == ["UPDATE Commands SET state = 1 WHERE (chat_uuid == 1)"]
+            assert table.query(self.command.chat_uuid == 1) == [
+                {"chat_uuid": 1, "command": "greet", "state": 1}
+            ]
+
+
+class TestSQLite3Search:
+    """Tests the full-text search of SQLite3 tables"""
+
+    row = Query()
+
+    def test_search(self):
+        """Only rows with every word are found, best matches first"""
+        conn = SQLite3Connection(path=":memory:")
+
+        with conn:
+            conn.execute("CREATE TABLE Notes (chat_uuid INTEGER, data TEXT)")
+            conn.execute(
+                "CREATE VIRTUAL TABLE NotesSearch USING fts5 "
+                "(data, content='Notes')"
+            )
+
+            table = conn.table("Notes")
+            notes = [
+                (1, "good morning everyone"),
+                (1, "morning"),
+                (1, "good night"),
+                (2, "good morning"),
+            ]
+
+            for chat_uuid, data in notes:
+                table.insert(Document(chat_uuid=chat_uuid, data=data))
+
+            conn.execute(
+                "INSERT INTO NotesSearch (NotesSearch) VALUES ('rebuild')"
+            )
+
+            result = table.search("MORNING", self.row.chat_uuid == 1)
+
+            assert result == [
+                {"chat_uuid": 1, "data": "morning"},
+                {"chat_uuid": 1, "data": "good morning everyone"},
+            ]
+            assert len(table.search("goo* morning")) == 2
+            assert table.search('"night" OR', limit=1) == []
+            assert table.search(" * ") == []
+
+
+class TestSQLite3Transactions:
+    """Tests transactions and savepoints of SQLite3 connections"""
+
+    command = Query()
+
+    @fixture
+    def conn(self) -> SQLite3Connection:
+        """Creates an in-memory connection with a table of commands."""
+        conn = SQLite3Connection(path=":memory:")
+
+        with conn:
+            conn.execute(
+                "CREATE TABLE Commands "
+                "(chat_uuid INTEGER, command TEXT, state BIT)"
+            )
+            yield conn
+
+    def test_transaction(self, conn: SQLite3Connection):
+        """Transactions are committed or rolled back as a whole"""
+        table = conn.table("Commands")
+
+        with conn.transaction():
+            table.insert(Document(chat_uuid=1, command="greet", state=0))
+            table.insert(Document(chat_uuid=1, command="ping", state=0))
+
+        with raises(ValueError):
+            with conn.transaction():
+                table.delete(self.command.chat_uuid == 1)
+                raise ValueError
+
+        assert len(table.query(self.command.chat_uuid == 1)) == 2
+
+    def test_savepoint(self, conn: SQLite3Connection):
+        """Savepoints roll back only their own statements"""
+        table = conn.table("Commands")
+
+        with raises(RuntimeError):
+            with conn.savepoint():
+                pass
+
+        with conn.transaction():
+            table.insert(Document(chat_uuid=1, command="greet", state=0))
+
+            with raises(ValueError):
+                with conn.savepoint():
+                    table.insert(Document(chat_uuid=2, command="greet"))
+                    raise ValueError
+
+            # nested transactions are savepoints as well
+            with conn.transaction():
+                table.insert(Document(chat_uuid=3, command="greet"))
+
+        result = table.query(self.command.command == "greet")
+
+        assert [each["chat_uuid"] for each in result] == [1, 3]
+
+    def test_atransaction(self, conn: SQLite3Connection):
+        """Async transactions of different tasks do not interleave"""
+        table = conn.table("Commands")
+        order: list[int] = []
+
+        async def toggle(chat_uuid: int):
+            async with conn.atransaction():
+                order.append(chat_uuid)
+                table.insert(Document(chat_uuid=chat_uuid, command="ping"))
+                await asyncio.sleep(0)
+
+                async with conn.asavepoint():
+                    table.update(
+                        Document(state=1),
+                        self.command.chat_uuid == chat_uuid,
+                    )
+                order.append(chat_uuid)
+
+        async def main():
+            await asyncio.gather(toggle(1), toggle(2))
+
+        asyncio.run(main())
+
+        assert order == [1, 1, 2, 2]
+        assert len(table.query(self.command.state == 1)) == 2
+
+    def test_atransaction_isolation(self, conn: SQLite3Connection):
+        """Other tasks cannot use the connection within async transactions"""
+        table = conn.table("Commands")
+        started = asyncio.Event()
+        done = asyncio.Event()
+
+        async def owner():
+            async with conn.atransaction():
+                table.insert(Document(chat_uuid=1, command="ping"))
+
+                # tasks started within the transaction are part of it
+                await asyncio.create_task(child())
+
+                started.set()
+                await done.wait()
+                raise ValueError
+
+        async def child():
+            table.insert(Document(chat_uuid=2, command="ping"))
+
+            with raises(RuntimeError):
+                async with conn.atransaction():
+                    pass
+
+        async def other():
+            await started.wait()
+
+            with raises(RuntimeError):
+                table.insert(Document(chat_uuid=3, command="ping"))
+            with raises(RuntimeError):
+                with conn.transaction():
+                    pass
+
+            done.set()
+
+        async def main():
+            results = await asyncio.gather(
+                owner(), other(), return_exceptions=True
+            )
+            assert isinstance(results[0], ValueError)
+            assert results[1] is None
+
+        asyncio.run(main())
+
+        assert table.query(self.command.command == "ping") == []
+
+
+class TestSQLite3Cache:
+    """Tests the query cache of SQLite3 connections"""
+
+    command = Query()
+
+    def test_cache(self):
+        """Results are cached until their table is written to"""
+        cache = QueryCache(size=2)
+        conn = SQLite3Connection(path=":memory:", cache=cache)
+
+        with conn:
+            conn.execute(
+                "CREATE TABLE Commands "
+                "(chat_uuid INTEGER, command TEXT, state BIT)"
+            )
+            table = conn.table("Commands")
+            table.insert(Document(chat_uuid=1, command="greet", state=0))
+
+            first = table.query(self.command.chat_uuid == 1)
+            first[0]["state"] = 1
+
+            # copies are handed out, so changing them changes nothing
+            assert table.query(self.command.chat_uuid == 1) == [
+                {"chat_uuid": 1, "command": "greet", "state": 0}
+            ]
+            assert cache.stats()["hits"] == 1
+
+            # tables are read anew by other Table objects too
+            conn.table("Commands").update(
+                Document(state=1), self.command.chat_uuid == 1
+            )
+            assert len(cache) == 0
+            assert table.query(self.command.state == 1) == [
+                {"chat_uuid": 1, "command": "greet", "state": 1}
+            ]
+
+            table.query(self.command.chat_uuid == 1)
+            table.query(self.command.chat_uuid == 2)
+            assert len(cache) == 2
+
+            with conn.transaction():
+                table.query(self.command.chat_uuid == 3)
+            assert len(cache) == 2
+
+            assert cache.stats()["hit_ratio"] == 1 / 6
+
+    def test_cache_nested(self):
+        """Nested values are never shared with the cache"""
+        conn = SQLite3Connection(path=":memory:", cache=QueryCache())
+
+        with conn:
+            conn.execute("CREATE TABLE Chats (uuid INTEGER, settings JSON)")
+
+            table = conn.table("Chats")
+            table.insert(Document(uuid=1, settings={"admins": [1]}))
+
+            # both the stored result and the cached one are changed
+            for _ in range(2):
+                result = table.query(self.command.uuid == 1)
+                result[0]["settings"]["admins"].append(2)
+
+            assert table.query(self.command.uuid == 1) == [
+                {"uuid": 1, "settings": {"admins": [1]}}
+            ]
+
+
+class TestSQLite3Json:
+    """Tests JSON columns of SQLite3 tables"""
+
+    row = Row()
+
+    def test_json(self):
+        """Nested values round trip and their paths can be indexed"""
+        conn = SQLite3Connection(path=":memory:")
+
+        with conn:
+            conn.execute("CREATE TABLE Chats (uuid INTEGER, settings JSON)")
+
+            table = conn.table("Chats")
+            table.insert(
+                Document(uuid=1, settings={"lang": "pt", "admins": [1, 2]})
+            )
+            table.insert(Document(uuid=2, settings={"lang": "en"}))
+
+            language = self.row.settings.json("$.lang")
+            table.index("ChatsLanguage", language)
+
+            assert table.query(language == "pt") == [
+                {"uuid": 1, "settings": {"lang": "pt", "admins": [1, 2]}}
+            ]
+            assert table.query(Query().settings.json("$.admins[1]") == 2)
+
+            clause, data = (language == "en").compile()
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM Chats WHERE {clause}", data
+            ).fetchall()
+
+            assert "ChatsLanguage" in plan[0]["detail"]
+
+    def test_json_is_local(self):
+        """Other sqlite3 connections keep their own adapters and types"""
+        with SQLite3Connection(path=":memory:") as conn:
+            conn.execute("CREATE TABLE Chats (uuid INTEGER, settings JSON)")
+            conn.table("Chats").insert(Document(uuid=1, settings=[1]))
+
+        other = sqlite3.connect(":memory:")
+
+        with raises(sqlite3.ProgrammingError):
+            other.execute("SELECT ?", ([1],))
+
+        other.close()
+
+        with SQLite3Connection(path=":memory:") as conn:
+            conn.execute("CREATE TABLE Chats (uuid INTEGER, created DATE)")
+
+            table = conn.table("Chats")
+            table.insert(Document(uuid=1, created="2022-10-01"))
+
+            assert table.query(self.row.uuid == 1)[0]["created"] == (
+                "2022-10-01"
+            )
@@ -0,0 +1,71 @@
+"""
+Tests for the documents of database tables.
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2022 Victor Cebarros <https://github.com/victorcebarros>
+
+import copy
+import pickle
+
+from pytest import raises
+
+from korone.database.table import Record
+
+
+class TestRecord:
+    """Tests the change tracking of records"""
+
+    def test_changes(self):
+        """Every way of setting keys is tracked"""
+        record = Record(uuid=1, language="en", registrydate=0)
+
+        record["language"] = "pt"
+        record.update(registrydate=1)
+        record |= {"uuid": 2}
+        record.setdefault("uuid", 3)
+
+        assert record.changes() == {
+            "language": "pt",
+            "registrydate": 1,
+            "uuid": 2,
+        }
+
+        record["language"] = "en"
+        assert "language" not in record.changes()
+
+    def test_delete(self):
+        """Keys cannot be deleted"""
+        record = Record(uuid=1, language="en")
+
+        for delete in (
+            lambda: record.pop("language"),
+            record.popitem,
+            record.clear,
+        ):
+            with raises(TypeError):
+                delete()
+
+        with raises(TypeError):
+            del record["language"]
+
+        assert record == {"uuid": 1, "language": "en"}
+
+    def test_copy(self):
+        """Copies keep the changes, but track their own"""
+        record = Record(uuid=1, language="en", chats=[1])
+        record["language"] = "pt"
+
+        for other in (
+            copy.copy(record),
+            copy.deepcopy(record),
+            pickle.loads(pickle.dumps(record)),
+        ):
+            assert isinstance(other, Record)
+            assert other == record
+            assert other.changes() == {"language": "pt"}
+
+            other["uuid"] = 2
+            assert record.changes() == {"language": "pt"}
+
+        assert copy.deepcopy(record)["chats"] is not record["chats"]